@@ -28,6 +28,233 @@ SECRET_KEY = os.getenv('SECRET_KEY')
 AI_API_KEY = os.getenv('AI_API_KEY')
 HUGGINGFACE_API_KEY = os.getenv('HUGGINGFACE_API_KEY')
 
+# Fournisseurs IA : 'groq' / 'huggingface' en production, 'fake' pour les tests
+# de charge hors ligne (ou chemin pointé vers une classe de games.providers)
+AI_LLM_PROVIDER = os.getenv('AI_LLM_PROVIDER', 'groq')
+AI_IMAGE_PROVIDER = os.getenv('AI_IMAGE_PROVIDER', 'huggingface')
+
+# Comportement des fournisseurs simulés (latences en secondes)
+AI_FAKE_PROVIDER = {
+    'llm_latency': {'distribution': 'lognormal', 'median': 0.8, 'sigma': 0.4},
+    'image_latency': {'distribution': 'lognormal', 'median': 4.0, 'sigma': 0.3},
+    'draft_latency': {'distribution': 'lognormal', 'median': 0.8, 'sigma': 0.3},
+    'error_rate': float(os.getenv('AI_FAKE_ERROR_RATE', '0')),
+    'seed': None,
+    'stream_chunk_size': 16,
+    'stream_chunk_delay': 0.02,
+    'size': (512, 512),
+    'draft_size': (256, 256),
+}
+
+# Concept art progressif : un aperçu rapide (basse résolution, peu d'étapes) est
+# attaché tout de suite, le rendu complet est fait en arrière-plan puis échangé.
+# 'local' ou 'fake' ; vide = désactivé
+AI_DRAFT_IMAGE_PROVIDER = os.getenv('AI_DRAFT_IMAGE_PROVIDER', '')
+
+# Profil de modèle par étape de génération (model_name, max_tokens, temperature,
+# timeout en secondes). Chaque étape complète le profil 'default' : les étapes
+# courtes passent sur un petit modèle rapide avec un plafond de tokens serré.
+AI_LLM_STAGE_PROFILES = {
+    'default': {
+        'model_name': os.getenv('AI_LLM_MODEL', 'llama-3.1-8b-instant'),
+        'max_tokens': 1500,
+        'temperature': 0.8,
+    },
+    'concept': {},
+    'characters': {'max_tokens': 800},
+    'locations': {'max_tokens': 600},
+    'art_prompts': {'max_tokens': 200, 'temperature': 0.6, 'timeout': 10},
+    'probe': {'max_tokens': 5, 'temperature': 0.0},
+}
+
+# Génération d'images locale sur CPU (AI_IMAGE_PROVIDER=local) : le modèle est
+# chargé une fois par la commande run_image_worker, qui rend les demandes par lots
+# de max_batch (attente de batch_window secondes pour compléter un lot)
+AI_LOCAL_DIFFUSION = {
+    'model': os.getenv('AI_LOCAL_DIFFUSION_MODEL', 'stabilityai/sd-turbo'),
+    'mode': os.getenv('AI_LOCAL_DIFFUSION_MODE', 'full'),
+    'modes': {
+        'draft': {'steps': 1, 'size': (256, 256), 'guidance_scale': 0.0},
+        'full': {'steps': 4, 'size': (512, 512), 'guidance_scale': 0.0},
+    },
+    'max_batch': 4,
+    'batch_window': 0.5,
+    'poll_interval': 0.1,
+    'heartbeat_timeout': 120,
+    'threads': None,
+}
+
+# Enregistrement / rejeu des réponses : 'off', 'record' ou 'replay'. Les réponses
+# LLM sont rangées par modèle de l'étape (AI_LLM_STAGE_PROFILES), en rejeu comme en
+# enregistrement : changer AI_LLM_MODEL impose de réenregistrer.
+AI_CASSETTE_MODE = os.getenv('AI_CASSETTE_MODE', 'off')
+AI_CASSETTE_DIR = BASE_DIR / 'cassettes'
+AI_CASSETTE_IMAGE_MODEL = ''
+
+# Plafonds partagés par tous les workers (par nom de fournisseur). Au-delà,
+# les appels patientent jusqu'à max_wait secondes avant d'abandonner.
+AI_PROVIDER_LIMITS = {
+    'groq': {'requests_per_minute': 30, 'tokens_per_minute': 20000, 'max_in_flight': 8, 'max_wait': 10},
+    'huggingface': {'requests_per_minute': 60, 'max_in_flight': 4, 'max_wait': 20},
+}
+
+# Disjoncteur par fournisseur : ouvert après failure_threshold échecs en
+# failure_window secondes, sonde de reprise en arrière-plan après reset_timeout
+AI_CIRCUIT_BREAKER = {
+    'enabled': True,
+    'failure_threshold': 3,
+    'failure_window': 60,
+    'reset_timeout': 30,
+}
+
+# Regroupement des appels LLM identiques simultanés (secondes)
+AI_SINGLE_FLIGHT = {
+    'enabled': True,
+    'wait': 60,
+    'result_ttl': 5,
+    'lease_timeout': 120,
+    'poll_interval': 0.1,
+}
+
+# Budget de temps d'une génération (secondes) : échéance globale par profil,
+# part de ce budget accordée à chaque appel et budget minimal pour lancer une étape
+AI_GENERATION_DEADLINES = {
+    'quick': 8,
+    'standard': 15,
+    'interactive': 20,
+    'batch': 300,
+}
+AI_STAGE_TIMEOUT_SHARES = {
+    'concept': 0.4,
+    'characters': 0.3,
+    'locations': 0.3,
+    'art_prompts': 0.15,
+    'image': 0.5,
+    'image_draft': 0.25,
+}
+AI_STAGE_MIN_BUDGET = {
+    'image': 4,
+    'image_draft': 1,
+}
+# Timeout par appel quand aucune échéance n'est fixée (scripts, démo)
+AI_CALL_TIMEOUT = 60
+
+# Cache des images de concept art, clé (modèle, hash du prompt, taille)
+# mode "reference" : le jeu pointe vers le fichier du cache ; "copy" : copie dédiée
+# policies : "always" / "never" par type de prompt ("fallback" = prompts par défaut
+# déterministes, "generated" = prompts écrits par le LLM pour un jeu précis)
+AI_IMAGE_CACHE = {
+    'enabled': os.getenv('AI_IMAGE_CACHE', 'true').lower() == 'true',
+    'mode': os.getenv('AI_IMAGE_CACHE_MODE', 'reference'),
+    'policies': {
+        'fallback': 'always',
+        'generated': 'never',
+    },
+}
+
+# Profondeur de génération choisie à la création : étapes lancées après le concept,
+# coût en crédits du quota quotidien et profil d'échéance (AI_GENERATION_DEADLINES)
+GAME_GENERATION_DEPTHS = {
+    'quick': {'stages': [], 'cost': 1, 'deadline': 'quick'},
+    'standard': {'stages': ['characters', 'locations'], 'cost': 2, 'deadline': 'standard'},
+    'full': {'stages': ['characters', 'locations', 'concept_art'], 'cost': 3, 'deadline': 'interactive'},
+}
+# Coût en crédits de la régénération d'une seule partie d'un jeu existant
+GAME_REGENERATION_COSTS = {
+    'characters': 1,
+    'locations': 1,
+    'concept_art_character': 1,
+    'concept_art_environment': 1,
+}
+
+# Concepts quasi identiques proposés avant de lancer une génération (MinHash + LSH)
+# bands × rows valeurs par signature ; rows élevé = seaux plus sélectifs.
+# threshold : similarité de Jaccard estimée minimale pour proposer un jeu existant.
+# Après un changement de bands/rows : python manage.py rebuild_concept_index
+GAME_NEAR_DUPLICATES = {
+    'enabled': os.getenv('GAME_NEAR_DUPLICATES', 'true').lower() == 'true',
+    'bands': 16,
+    'rows': 4,
+    'threshold': 0.5,
+    'limit': 3,
+    'max_candidates': 50,
+}
+
+# « Jeux similaires » calculés à partir des favoris (commande refresh_recommendations)
+# top_k : jeux affichés par page ; min_common : favoris en commun minimum pour recommander
+GAME_RECOMMENDATIONS = {
+    'top_k': 6,
+    'min_common': 1,
+}
+
+# Tendances (page d'accueil, tri « Plus populaire ») : vues et favoris pondérés,
+# décroissance exponentielle de demi-vie half_life_hours (commande process_trending_events).
+# Changer la demi-vie ne s'applique qu'aux nouveaux événements (--seed pour repartir des compteurs)
+GAME_TRENDING = {
+    'half_life_hours': 48,
+    'weights': {'view': 1.0, 'favorite': 5.0},
+    'batch_size': 5000,
+    'home_count': 6,
+}
+
+# API publique en lecture seule (/api/v1/) : requêtes par minute et par client
+# (utilisateur connecté, sinon adresse IP) et taille des pages de la liste
+PUBLIC_API = {
+    'requests_per_minute': int(os.getenv('PUBLIC_API_REQUESTS_PER_MINUTE', '60')),
+    'default_page_size': 20,
+    'max_page_size': 100,
+}
+
+# Cache HTTP des pages de jeux : version à changer à chaque déploiement modifiant les
+# templates (invalide tous les ETag) et durée de cache des listes pour les visiteurs anonymes
+GAMEFORGE_PAGE_CACHE = {
+    'version': os.getenv('GAMEFORGE_PAGE_VERSION', '1'),
+    'list_max_age': 60,
+}
+
+# Export du catalogue (commande export_games, /exports/games/) : jeux lus par lots
+GAME_EXPORT = {
+    'chunk_size': 500,
+}
+
+# Documents de conception PDF : cache disque (hors MEDIA, servi par la vue qui vérifie
+# l'accès), durée au-delà de laquelle un rendu est considéré perdu et délai de rechargement
+GAME_PDF = {
+    'cache_dir': BASE_DIR / 'design_docs',
+    'render_timeout': 120,
+    'retry_after': 3,
+}
+
+# Profil SQLite « production » (GAMEFORGE_SQLITE_PROFILE=production) : pragmas posés à
+# chaque nouvelle connexion (games.sqlite) et connexions gardées entre les requêtes.
+# WAL laisse les lectures passer pendant une écriture ; busy_timeout (ms) fait attendre
+# un écrivain concurrent au lieu d'échouer ; cache_size négatif = taille en Kio.
+SQLITE_PROFILE = os.getenv('GAMEFORGE_SQLITE_PROFILE', 'default')
+SQLITE_PRODUCTION_PRAGMAS = {
+    'journal_mode': 'wal',
+    'synchronous': 'normal',
+    'busy_timeout': int(os.getenv('SQLITE_BUSY_TIMEOUT_MS', '5000')),
+    'mmap_size': 256 * 1024 * 1024,
+    'cache_size': -64 * 1024,
+    'temp_store': 'memory',
+}
+
+# Réserve de concepts pour le bouton « aléatoire » (commande refill_game_pool)
+GAME_POOL_TARGET_DEPTH = 2
+GAME_POOL_QUIET_HOURS = (1, 7)
+# Les concepts réservés restent visibles dans l'admin ce nombre de jours, puis sont purgés
+GAME_POOL_CLAIMED_RETENTION_DAYS = 7
+
+# Threads dédiés aux tâches d'arrière-plan du processus web
+GAMEFORGE_BACKGROUND_WORKERS = 4
+
+# Base SQLite locale partagée entre workers (limiteurs, disjoncteurs...)
+GAMEFORGE_SHARED_STATE_DB = BASE_DIR / 'shared_state.sqlite3'
+GAMEFORGE_SHARED_STATE_TIMEOUT = 5
+
+# Les tests utilisent leur propre base d'état partagé (temporaire)
+TEST_RUNNER = 'games.tests.runner.SharedStateTestRunner'
+
 # SECURITY WARNING: don't run with debug turned on in production!
 DEBUG = True
 
@@ -47,6 +274,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'games.db_router.ReplicaRoutingMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -83,9 +311,34 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # Connexions persistantes en production (secondes), vérifiées avant réutilisation
+        'CONN_MAX_AGE': int(os.getenv('DB_CONN_MAX_AGE', '600' if SQLITE_PROFILE == 'production' else '0')),
+        'CONN_HEALTH_CHECKS': True,
     }
 }
 
+# Réplicas en lecture (DB_REPLICAS=chemin1,chemin2) : copies SQLite de la base principale
+# tenues à jour par la commande sync_replicas. Les lectures des pages y sont envoyées
+# (games.db_router), sauf pendant DB_REPLICA_PIN_SECONDS après une écriture du même
+# navigateur : à garder au-dessus de l'intervalle de synchronisation. La recopie se fait
+# en place (les connexions persistantes voient la nouvelle version) : pendant qu'elle écrit,
+# les lecteurs patientent jusqu'à DB_REPLICA_TIMEOUT secondes au lieu d'échouer (SQLITE_BUSY).
+DATABASE_REPLICA_TIMEOUT = int(os.getenv('DB_REPLICA_TIMEOUT', '20'))
+DATABASE_REPLICAS = {}
+for index, replica_path in enumerate(filter(None, os.getenv('DB_REPLICAS', '').split(','))):
+    alias = f'replica{index + 1}'
+    DATABASE_REPLICAS[alias] = Path(replica_path).resolve()
+    DATABASES[alias] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': f"{DATABASE_REPLICAS[alias].as_uri()}?mode=ro",
+        'OPTIONS': {'timeout': DATABASE_REPLICA_TIMEOUT},
+        'CONN_MAX_AGE': DATABASES['default']['CONN_MAX_AGE'],
+        'CONN_HEALTH_CHECKS': True,
+        'TEST': {'MIRROR': 'default'},
+    }
+DATABASE_ROUTERS = ['games.db_router.PrimaryReplicaRouter']
+DATABASE_REPLICA_PIN_SECONDS = int(os.getenv('DB_REPLICA_PIN_SECONDS', '10'))
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
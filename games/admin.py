@@ -1,7 +1,7 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 from django.contrib.auth.models import User
-from .models import Game, Character, Location, Favorite, UserProfile
+from .models import Game, GameContent, Character, Location, Favorite, UserProfile, PooledConcept, ConceptArtCache
 
 
 class UserProfileInline(admin.StackedInline):
@@ -14,6 +14,13 @@ class UserAdmin(BaseUserAdmin):
     inlines = (UserProfileInline,)
 
 
+class GameContentInline(admin.StackedInline):
+    model = GameContent
+    can_delete = False
+    verbose_name = 'Contenu généré'
+    fields = ('cultural_references', 'universe_description', 'main_story', 'gameplay_mechanics')
+
+
 class CharacterInline(admin.TabularInline):
     model = Character
     extra = 1
@@ -30,17 +37,14 @@ class GameAdmin(admin.ModelAdmin):
     list_filter = ('genre', 'ambiance', 'is_public', 'created_at')
     search_fields = ('title', 'description', 'keywords')
     readonly_fields = ('created_at', 'updated_at', 'views_count')
-    inlines = [CharacterInline, LocationInline]
+    inlines = [GameContentInline, CharacterInline, LocationInline]
     
     fieldsets = (
         ('Informations de base', {
             'fields': ('title', 'description', 'creator', 'is_public')
         }),
         ('Paramètres de génération', {
-            'fields': ('genre', 'ambiance', 'keywords', 'cultural_references')
-        }),
-        ('Contenu généré', {
-            'fields': ('universe_description', 'main_story', 'gameplay_mechanics')
+            'fields': ('genre', 'ambiance', 'keywords')
         }),
         ('Images conceptuelles', {
             'fields': ('concept_art_character', 'concept_art_environment')
@@ -78,6 +82,20 @@ class UserProfileAdmin(admin.ModelAdmin):
     search_fields = ('user__username', 'user__email')
 
 
+@admin.register(PooledConcept)
+class PooledConceptAdmin(admin.ModelAdmin):
+    list_display = ('__str__', 'genre', 'ambiance', 'created_at', 'claimed_by', 'claimed_at')
+    list_filter = ('genre', 'ambiance', 'claimed_at')
+    readonly_fields = ('claim_token',)
+
+
+@admin.register(ConceptArtCache)
+class ConceptArtCacheAdmin(admin.ModelAdmin):
+    list_display = ('__str__', 'model_name', 'size', 'hits', 'last_used_at')
+    search_fields = ('prompt',)
+    readonly_fields = ('prompt_hash', 'hits', 'created_at', 'last_used_at')
+
+
 # Re-register UserAdmin
 admin.site.unregister(User)
 admin.site.register(User, UserAdmin)
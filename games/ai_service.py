@@ -1,60 +1,112 @@
+import asyncio
 import json
+import random
 import re
 import traceback
+from asgiref.sync import sync_to_async
 from django.conf import settings
 from django.core.files.base import ContentFile
-from .models import Game, Character, Location
-from langchain_groq import ChatGroq
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from .models import Game, GameContent, Character, Location, PooledConcept, ConceptArtCache
+from .circuit_breaker import CircuitOpen
+from .deadline import Deadline
+from . import singleflight, tasks
+from .providers import get_llm_provider, get_image_provider, get_draft_image_provider, stage_timeout
 from langchain.prompts import PromptTemplate
-from langchain.chains import LLMChain
 from io import BytesIO
-from PIL import Image
-from huggingface_hub import InferenceClient
 
 class AIGameGenerator:
     """Générateur IA simplifié pour GameForge"""
 
-    def __init__(self):
-        api_key = settings.AI_API_KEY
-        if api_key:
-            self.llm = ChatGroq(
-                api_key=api_key,
-                model_name="llama-3.1-8b-instant",
-                temperature=0.8,
-                max_tokens=1500,
-            )
-        else:
-            self.llm = None
+    def __init__(self, llm=None, image_provider=None, deadline=None, defer_images=False, progressive=False):
+        # Les fournisseurs sont choisis dans les settings (voir games.providers)
+        self.llm = llm if llm is not None else get_llm_provider()
+        self.image_provider = image_provider if image_provider is not None else get_image_provider()
+        # Échéance globale (games.deadline) ; sans elle chaque appel est borné par AI_CALL_TIMEOUT
+        self.deadline = deadline
+        # Si le budget ne suffit plus pour les images : rendu en arrière-plan plutôt qu'abandon
+        self.defer_images = defer_images
+        # Concept art progressif : aperçu rapide tout de suite, rendu complet échangé en arrière-plan
+        self.draft_image_provider = get_draft_image_provider() if progressive else None
+
+    def _timeout(self, stage):
+        timeout = settings.AI_CALL_TIMEOUT if self.deadline is None else self.deadline.timeout_for(stage)
+        # Le profil de l'étape peut imposer un plafond plus serré (voir AI_LLM_STAGE_PROFILES)
+        limit = stage_timeout(stage)
+        return timeout if limit is None else min(timeout, limit)
+
+    def _budget_exhausted(self, stage):
+        if self.deadline is not None and not self.deadline.allows(stage):
+            print(f"[IA] Budget de génération épuisé, étape {stage} ignorée")
+            return True
+        return False
 
     # --------------------
     # Méthode utilitaire LangChain
     # --------------------
-    def _generate_with_chain(self, template, variables):
-        if not self.llm:
+    def _generate_with_chain(self, template, variables, stage=None):
+        if not self.llm or self._budget_exhausted(stage):
+            return None
+        try:
+            prompt = PromptTemplate(input_variables=list(variables.keys()), template=template)
+            text = prompt.format(**variables)
+            timeout = self._timeout(stage)
+            # Les demandes identiques simultanées partagent un seul appel au fournisseur
+            result = singleflight.do(
+                self._flight_key(stage, text),
+                lambda: self.llm.generate(text, stage=stage, timeout=timeout),
+                wait=timeout,
+            )
+            return str(result).strip()
+        except CircuitOpen:
+            # Fournisseur en panne connue : bascule immédiate vers les templates
+            return None
+        except Exception as e:
+            print(f"[IA ERROR] {e}")
+            return None
+
+    async def _agenerate_with_chain(self, template, variables, stage=None):
+        if not self.llm or self._budget_exhausted(stage):
             return None
         try:
             prompt = PromptTemplate(input_variables=list(variables.keys()), template=template)
-            chain = LLMChain(llm=self.llm, prompt=prompt)
-            result = chain.invoke(variables)
-            if isinstance(result, dict):
-                return result.get("text", "").strip()
+            text = prompt.format(**variables)
+            timeout = self._timeout(stage)
+            # wait_for garantit la borne même si le client ignore son timeout
+            result = await asyncio.wait_for(
+                singleflight.ado(
+                    self._flight_key(stage, text),
+                    lambda: self.llm.agenerate(text, stage=stage, timeout=timeout),
+                    wait=timeout,
+                ),
+                timeout,
+            )
             return str(result).strip()
+        except CircuitOpen:
+            return None
         except Exception as e:
             print(f"[IA ERROR] {e}")
             return None
 
+    def _flight_key(self, stage, prompt_text):
+        return singleflight.make_key(stage, self.llm.model_for(stage), prompt_text)
+
+    @staticmethod
+    def _parse_json_list(result, limit=3):
+        if result:
+            try:
+                start, end = result.find("["), result.rfind("]") + 1
+                return json.loads(result[start:end])[:limit]
+            except:
+                pass
+        return None
+
     # --------------------
     # Génération principale du jeu
     # --------------------
-    def generate_game(self, genre, ambiance, keywords, cultural_references=""):
-        if self.llm:
-            game_data = self._generate_game_with_ai(genre, ambiance, keywords, cultural_references)
-            if game_data:
-                return game_data
-        return self._generate_game_with_templates(genre, ambiance, keywords, cultural_references)
-
-    def _generate_game_with_ai(self, genre, ambiance, keywords, cultural_references):
-        template = """
+    CONCEPT_TEMPLATE = """
 Tu es un expert en game design. Crée un concept complet de jeu vidéo.
 
 Genre: {genre}
@@ -70,16 +122,46 @@ UNIVERS:
 HISTOIRE:
 MECANIQUES:
 """
+
+    def generate_game(self, genre, ambiance, keywords, cultural_references=""):
+        if self.llm:
+            game_data = self._generate_game_with_ai(genre, ambiance, keywords, cultural_references)
+            if game_data:
+                return game_data
+        return self._generate_game_with_templates(genre, ambiance, keywords, cultural_references)
+
+    async def agenerate_game(self, genre, ambiance, keywords, cultural_references=""):
+        if self.llm:
+            result = await self._agenerate_with_chain(
+                self.CONCEPT_TEMPLATE,
+                self._concept_variables(genre, ambiance, keywords, cultural_references),
+                stage="concept",
+            )
+            if result:
+                return self._parse_game(result, genre, ambiance, keywords, cultural_references)
+        return self._generate_game_with_templates(genre, ambiance, keywords, cultural_references)
+
+    @staticmethod
+    def _concept_variables(genre, ambiance, keywords, cultural_references):
         cultural_ref = f"Références culturelles: {cultural_references}" if cultural_references else ""
-        result = self._generate_with_chain(template, {
+        return {
             "genre": genre,
             "ambiance": ambiance,
             "keywords": keywords,
             "cultural_ref": cultural_ref
-        })
+        }
+
+    def _generate_game_with_ai(self, genre, ambiance, keywords, cultural_references):
+        result = self._generate_with_chain(
+            self.CONCEPT_TEMPLATE,
+            self._concept_variables(genre, ambiance, keywords, cultural_references),
+            stage="concept",
+        )
         if not result:
             return None
+        return self._parse_game(result, genre, ambiance, keywords, cultural_references)
 
+    def _parse_game(self, result, genre, ambiance, keywords, cultural_references):
         # Regex pour extraire les sections
         pattern = r'\**\s*(TITRE|DESCRIPTION|UNIVERS|HISTOIRE|MECANIQUES)\s*:*\**\s*(.*?)(?=(\**\s*(TITRE|DESCRIPTION|UNIVERS|HISTOIRE|MECANIQUES)\s*:)|\Z)'
         matches = re.findall(pattern, result, flags=re.DOTALL | re.IGNORECASE)
@@ -107,19 +189,26 @@ MECANIQUES:
             "gameplay_mechanics": parsed_data.get("gameplay_mechanics", ""),
         }
 
+    def _generate_game_with_templates(self, genre, ambiance, keywords, cultural_references=""):
+        genre_label = dict(Game.GENRE_CHOICES).get(genre, genre)
+        ambiance_label = dict(Game.AMBIANCE_CHOICES).get(ambiance, ambiance)
+        first_keyword = next((k.strip() for k in keywords.split(",") if k.strip()), "l'inconnu")
+        return {
+            "title": f"{genre_label} : {first_keyword.capitalize()}",
+            "description": f"Un jeu {genre_label} à l'ambiance {ambiance_label.lower()} autour de : {keywords}.",
+            "genre": genre,
+            "ambiance": ambiance,
+            "keywords": keywords,
+            "cultural_references": cultural_references,
+            "universe_description": f"Un univers {ambiance_label.lower()} façonné par {first_keyword}.",
+            "main_story": "Un héros improbable se lève pour changer le destin de son monde.",
+            "gameplay_mechanics": f"Les mécaniques classiques du {genre_label}, revisitées autour de {first_keyword}.",
+        }
+
     # --------------------
     # Génération de personnages
     # --------------------
-    def create_characters_for_game(self, game):
-        if self.llm:
-            characters_data = self._generate_characters_with_ai(game)
-        else:
-            characters_data = self._generate_characters_template(game)
-        characters = [Character.objects.create(game=game, **c) for c in characters_data]
-        return characters
-
-    def _generate_characters_with_ai(self, game):
-        template = """
+    CHARACTERS_TEMPLATE = """
 Crée 3 personnages pour le jeu "{title}".
 Genre: {genre}
 Ambiance: {ambiance}
@@ -137,18 +226,39 @@ Format JSON strict:
   }}
 ]
 """
-        result = self._generate_with_chain(template, {
+
+    @staticmethod
+    def _game_variables(game):
+        return {
             "title": game.title,
             "genre": game.genre,
             "ambiance": game.ambiance
-        })
-        if result:
-            try:
-                start, end = result.find("["), result.rfind("]") + 1
-                return json.loads(result[start:end])[:3]
-            except:
-                pass
-        return self._generate_characters_template(game)
+        }
+
+    def create_characters_for_game(self, game):
+        if self.llm:
+            characters_data = self._generate_characters_with_ai(game)
+        else:
+            characters_data = self._generate_characters_template(game)
+        characters = [Character.objects.create(game=game, **c) for c in characters_data]
+        return characters
+
+    async def acreate_characters_for_game(self, game):
+        characters_data = await self._agenerate_characters_data(game)
+        return await Character.objects.abulk_create([Character(game=game, **c) for c in characters_data])
+
+    async def _agenerate_characters_data(self, game):
+        characters_data = None
+        if self.llm:
+            result = await self._agenerate_with_chain(
+                self.CHARACTERS_TEMPLATE, self._game_variables(game), stage="characters"
+            )
+            characters_data = self._parse_json_list(result)
+        return characters_data or self._generate_characters_template(game)
+
+    def _generate_characters_with_ai(self, game):
+        result = self._generate_with_chain(self.CHARACTERS_TEMPLATE, self._game_variables(game), stage="characters")
+        return self._parse_json_list(result) or self._generate_characters_template(game)
 
     def _generate_characters_template(self, game):
         return [{
@@ -164,16 +274,7 @@ Format JSON strict:
     # --------------------
     # Génération de lieux
     # --------------------
-    def create_locations_for_game(self, game):
-        if self.llm:
-            locations_data = self._generate_locations_with_ai(game)
-        else:
-            locations_data = self._generate_locations_template(game)
-        locations = [Location.objects.create(game=game, **l) for l in locations_data]
-        return locations
-
-    def _generate_locations_with_ai(self, game):
-        template = """
+    LOCATIONS_TEMPLATE = """
 Crée 3 lieux pour le jeu "{title}".
 Genre: {genre}
 Ambiance: {ambiance}
@@ -188,18 +289,31 @@ Format JSON strict:
   }}
 ]
 """
-        result = self._generate_with_chain(template, {
-            "title": game.title,
-            "genre": game.genre,
-            "ambiance": game.ambiance
-        })
-        if result:
-            try:
-                start, end = result.find("["), result.rfind("]") + 1
-                return json.loads(result[start:end])[:3]
-            except:
-                pass
-        return self._generate_locations_template(game)
+
+    def create_locations_for_game(self, game):
+        if self.llm:
+            locations_data = self._generate_locations_with_ai(game)
+        else:
+            locations_data = self._generate_locations_template(game)
+        locations = [Location.objects.create(game=game, **l) for l in locations_data]
+        return locations
+
+    async def acreate_locations_for_game(self, game):
+        locations_data = await self._agenerate_locations_data(game)
+        return await Location.objects.abulk_create([Location(game=game, **l) for l in locations_data])
+
+    async def _agenerate_locations_data(self, game):
+        locations_data = None
+        if self.llm:
+            result = await self._agenerate_with_chain(
+                self.LOCATIONS_TEMPLATE, self._game_variables(game), stage="locations"
+            )
+            locations_data = self._parse_json_list(result)
+        return locations_data or self._generate_locations_template(game)
+
+    def _generate_locations_with_ai(self, game):
+        result = self._generate_with_chain(self.LOCATIONS_TEMPLATE, self._game_variables(game), stage="locations")
+        return self._parse_json_list(result) or self._generate_locations_template(game)
 
     def _generate_locations_template(self, game):
         return [{
@@ -212,69 +326,464 @@ Format JSON strict:
     # --------------------
     # Génération des prompts d'images
     # --------------------
-    
-    def create_concept_art_for_game(self, game):
-        if not self.llm:
-            character_prompt = f"Illustration d'un héros {game.genre} en {game.ambiance.lower()}"
-            environment_prompt = f"Paysage {game.ambiance.lower()} pour un jeu {game.genre}"
-        else:
-            template = """
+    ART_PROMPTS_TEMPLATE = """
     Crée deux prompts textuels courts pour générer du concept art IA pour le jeu "{title}":
+    Genre: {genre}
+    Ambiance: {ambiance}
     1. Un personnage principal
     2. Un environnement clé
 
     Retourne un JSON strict :
-    [{"type": "CHARACTER", "prompt": "..."}, {"type": "ENVIRONMENT", "prompt": "..."}]
+    [{{"type": "CHARACTER", "prompt": "..."}}, {{"type": "ENVIRONMENT", "prompt": "..."}}]
     """
-            result = self._generate_with_chain(template, {"title": game.title})
-            import json
-            try:
-                start = result.find('[')
-                end = result.rfind(']') + 1
-                prompts = json.loads(result[start:end])
-                character_prompt = next(p['prompt'] for p in prompts if p['type'] == "CHARACTER")
-                environment_prompt = next(p['prompt'] for p in prompts if p['type'] == "ENVIRONMENT")
-            except Exception:
-                character_prompt = f"Illustration d'un héros {game.genre} en {game.ambiance.lower()}"
-                environment_prompt = f"Paysage {game.ambiance.lower()} pour un jeu {game.genre}"
 
+    @staticmethod
+    def _fallback_art_prompts(game):
+        character_prompt = f"Illustration d'un héros {game.genre} en {game.ambiance.lower()}"
+        environment_prompt = f"Paysage {game.ambiance.lower()} pour un jeu {game.genre}"
+        return character_prompt, environment_prompt
+
+    def _parse_art_prompts(self, game, result):
+        try:
+            start = result.find('[')
+            end = result.rfind(']') + 1
+            prompts = json.loads(result[start:end])
+            character_prompt = next(p['prompt'] for p in prompts if p['type'] == "CHARACTER")
+            environment_prompt = next(p['prompt'] for p in prompts if p['type'] == "ENVIRONMENT")
+            return character_prompt, environment_prompt
+        except Exception:
+            return self._fallback_art_prompts(game)
+
+    @staticmethod
+    def _print_art_prompts(character_prompt, environment_prompt):
         # 🔹 Affichage des prompts pour debug
         print("=== Prompts pour génération d'images ===")
         print(f"Prompt personnage : {character_prompt}")
         print(f"Prompt environnement : {environment_prompt}")
         print("========================================")
-        
-        hf_token = settings.HUGGINGFACE_API_KEY
-        # ✅ CORRECTION : Ne pas spécifier de provider
-        client = InferenceClient(token=hf_token)
-
-        for prompt, field_name, filename in [
-            (character_prompt, "concept_art_character", "character.png"),
-            (environment_prompt, "concept_art_environment", "environment.png")
-        ]:
+
+    ART_FILENAMES = {
+        "concept_art_character": "character.png",
+        "concept_art_environment": "environment.png",
+    }
+
+    @classmethod
+    def _art_targets(cls, character_prompt, environment_prompt):
+        return [
+            (character_prompt, "concept_art_character", cls.ART_FILENAMES["concept_art_character"]),
+            (environment_prompt, "concept_art_environment", cls.ART_FILENAMES["concept_art_environment"])
+        ]
+
+    @staticmethod
+    def _png_bytes(image):
+        buffer = BytesIO()
+        image.save(buffer, format="PNG")
+        return buffer.getvalue()
+
+    def _store_image(self, game, field_name, filename, image, prompt, use_cache=True):
+        content = ContentFile(self._png_bytes(image))
+
+        if use_cache and self._cacheable(game, prompt):
+            entry = ConceptArtCache.remember(
+                self.image_provider.model_name, prompt, self.image_provider.size, content
+            )
+            self._attach_cached_image(game, field_name, filename, entry)
+            return
+
+        getattr(game, field_name).save(filename, content, save=False)
+
+    # --------------------
+    # Cache des images (clé : modèle, hash du prompt, taille)
+    # --------------------
+    def _cacheable(self, game, prompt):
+        """Vrai si la politique de réutilisation s'applique à ce prompt"""
+        options = settings.AI_IMAGE_CACHE
+        if not options.get("enabled", True):
+            return False
+        kind = "fallback" if prompt in self._fallback_art_prompts(game) else "generated"
+        return options["policies"].get(kind, "never") == "always"
+
+    @staticmethod
+    def _attach_cached_image(game, field_name, filename, entry):
+        field = getattr(game, field_name)
+        if settings.AI_IMAGE_CACHE.get("mode", "reference") == "copy":
+            with entry.image.open("rb") as cached:
+                field.save(filename, ContentFile(cached.read()), save=False)
+        else:
+            # Le jeu pointe vers le fichier du cache : aucun octet dupliqué
+            field.name = entry.image.name
+
+    def _reuse_cached_art(self, game, targets):
+        """Réutilise les images déjà en cache ; renvoie les cibles restant à générer"""
+        pending = []
+        for prompt, field_name, filename in targets:
+            entry = None
+            if self._cacheable(game, prompt):
+                entry = ConceptArtCache.lookup(self.image_provider.model_name, prompt, self.image_provider.size)
+            if entry is None:
+                pending.append((prompt, field_name, filename))
+                continue
+            self._attach_cached_image(game, field_name, filename, entry)
+            print(f"♻️ {field_name} réutilisé depuis le cache d'images")
+        return pending
+
+    def _concept_art_prompts(self, game):
+        if not self.llm:
+            return self._fallback_art_prompts(game)
+        result = self._generate_with_chain(self.ART_PROMPTS_TEMPLATE, self._game_variables(game), stage="art_prompts")
+        return self._parse_art_prompts(game, result)
+
+    async def _aconcept_art_prompts(self, game):
+        if not self.llm:
+            return self._fallback_art_prompts(game)
+        result = await self._agenerate_with_chain(
+            self.ART_PROMPTS_TEMPLATE, self._game_variables(game), stage="art_prompts"
+        )
+        return self._parse_art_prompts(game, result)
+
+    def _skip_images(self, game, targets, available):
+        """Vrai si les images ne doivent pas être rendues dans cette requête"""
+        if not available:
+            print("⏭️ Fournisseur d'images indisponible, concept art ignoré")
+            return True
+        stage = "image_draft" if self.draft_image_provider is not None else "image"
+        if self.deadline is None or self.deadline.allows(stage):
+            return False
+        if self.defer_images:
+            print("⏳ Budget interactif épuisé, concept art différé en arrière-plan")
+            self._defer_concept_art(game, targets)
+        else:
+            print("⏭️ Budget de génération épuisé, concept art ignoré")
+        return True
+
+    def _background_generator(self):
+        return AIGameGenerator(
+            llm=self.llm, image_provider=self.image_provider, deadline=Deadline.for_profile("batch")
+        )
+
+    def _defer_concept_art(self, game, targets):
+        tasks.submit(self._background_generator()._render_deferred_concept_art, game.pk, targets)
+
+    def _render_concept_art(self, game, targets):
+        for prompt, field_name, filename in targets:
+            if self._budget_exhausted("image"):
+                break
             try:
                 print(f"⏳ Génération de {field_name} en cours...")
                 
-                # ✅ CORRECTION : Sans spécifier de modèle (utilise le modèle par défaut)
                 # text_to_image retourne directement un objet PIL Image
-                image = client.text_to_image(prompt)
-                
-                # ✅ Plus besoin de decoder - on a directement l'image PIL
-                buffer = BytesIO()
-                image.save(buffer, format="PNG")
-                buffer.seek(0)
-                
-                getattr(game, field_name).save(
-                    filename,
-                    ContentFile(buffer.getvalue()),
-                    save=False
-                )
+                image = self.image_provider.text_to_image(prompt, timeout=self._timeout("image"))
+                self._store_image(game, field_name, filename, image, prompt)
                 print(f"✅ Génération {field_name} réussie !")
                 
+            except CircuitOpen:
+                print(f"⏭️ Fournisseur d'images indisponible, {field_name} ignoré")
+                break
             except Exception as e:
                 print(f"❌ Erreur génération image {field_name}: {e}")
                 traceback.print_exc()
 
+    def _render_deferred_concept_art(self, game_id, targets):
+        game = Game.objects.get(pk=game_id)
+        self._render_concept_art(game, self._reuse_cached_art(game, targets))
+        game.save(update_fields=["concept_art_character", "concept_art_environment", "updated_at"])
+
+    # --------------------
+    # Concept art progressif (aperçu puis rendu complet)
+    # --------------------
+    @staticmethod
+    def _release_art_file(storage, name):
+        """Supprime un fichier d'image qui n'est plus référencé (ni par le cache, ni par un jeu)"""
+        if not name:
+            return
+        referenced = (
+            ConceptArtCache.objects.filter(image=name).exists()
+            or Game.objects.filter(Q(concept_art_character=name) | Q(concept_art_environment=name)).exists()
+        )
+        if not referenced:
+            storage.delete(name)
+
+    @staticmethod
+    def _draft_filename(filename):
+        stem, _, extension = filename.rpartition(".")
+        return f"{stem}_draft.{extension}"
+
+    def _drafts_enabled(self, available):
+        return available and not self._budget_exhausted("image_draft")
+
+    def _attach_draft(self, game, field_name, filename, image):
+        getattr(game, field_name).save(
+            self._draft_filename(filename), ContentFile(self._png_bytes(image)), save=False
+        )
+        print(f"🖼️ Aperçu {field_name} attaché, rendu complet en arrière-plan")
+
+    def _render_drafts(self, game, targets):
+        """Attache un aperçu à chaque cible ; renvoie celles qui restent à affiner"""
+        if self.draft_image_provider is None or not targets:
+            return []
+        if not self._drafts_enabled(self.draft_image_provider.is_available()):
+            return []
+        drafted = []
+        for prompt, field_name, filename in targets:
+            try:
+                image = self.draft_image_provider.text_to_image(prompt, timeout=self._timeout("image_draft"))
+            except Exception as e:
+                print(f"❌ Erreur aperçu {field_name}: {e}")
+                continue
+            self._attach_draft(game, field_name, filename, image)
+            drafted.append((prompt, field_name, filename))
+        return drafted
+
+    async def _arender_drafts(self, game, targets):
+        if self.draft_image_provider is None or not targets:
+            return []
+        available = await sync_to_async(self.draft_image_provider.is_available, thread_sensitive=False)()
+        if not self._drafts_enabled(available):
+            return []
+        timeout = self._timeout("image_draft")
+        images = await asyncio.gather(
+            *(
+                asyncio.wait_for(self.draft_image_provider.atext_to_image(prompt, timeout=timeout), timeout)
+                for prompt, _, _ in targets
+            ),
+            return_exceptions=True,
+        )
+        drafted = []
+        for (prompt, field_name, filename), image in zip(targets, images):
+            if isinstance(image, BaseException):
+                print(f"❌ Erreur aperçu {field_name}: {image!r}")
+                continue
+            await sync_to_async(self._attach_draft)(game, field_name, filename, image)
+            drafted.append((prompt, field_name, filename))
+        return drafted
+
+    def _schedule_refinement(self, game, drafted):
+        """À appeler une fois les aperçus enregistrés en base"""
+        if not drafted:
+            return
+        refinements = [
+            (prompt, field_name, filename, getattr(game, field_name).name)
+            for prompt, field_name, filename in drafted
+        ]
+        tasks.submit(self._background_generator()._refine_concept_art, game.pk, refinements)
+
+    def _refine_concept_art(self, game_id, refinements):
+        """Rend les images complètes et remplace chaque aperçu par un UPDATE conditionnel"""
+        game = Game.objects.get(pk=game_id)
+        for prompt, field_name, filename, draft_name in refinements:
+            if self._budget_exhausted("image"):
+                break
+            try:
+                image = self.image_provider.text_to_image(prompt, timeout=self._timeout("image"))
+            except Exception as e:
+                print(f"❌ Rendu complet de {field_name} impossible, aperçu conservé : {e}")
+                continue
+            self._store_image(game, field_name, filename, image, prompt)
+            final = getattr(game, field_name)
+            # L'échange n'a lieu que si l'aperçu est toujours en place (image non remplacée entre-temps)
+            swapped = Game.objects.filter(pk=game_id, **{field_name: draft_name}).update(
+                **{field_name: final.name, "updated_at": timezone.now()}
+            )
+            self._release_art_file(final.storage, draft_name if swapped else final.name)
+            if swapped:
+                print(f"✅ {field_name} remplacé par le rendu complet")
+
+    @staticmethod
+    def _remember_art_prompts(game, character_prompt, environment_prompt):
+        # Gardés avec le jeu : une image seule peut être régénérée sans rappeler le LLM
+        content = game.get_content()
+        content.concept_art_character_prompt = character_prompt
+        content.concept_art_environment_prompt = environment_prompt
+
+    def create_concept_art_for_game(self, game):
+        character_prompt, environment_prompt = self._concept_art_prompts(game)
+        self._print_art_prompts(character_prompt, environment_prompt)
+        self._remember_art_prompts(game, character_prompt, environment_prompt)
+
+        targets = self._art_targets(character_prompt, environment_prompt)
+        pending = self._reuse_cached_art(game, targets)
+        drafted = []
+        if pending and not self._skip_images(game, pending, self.image_provider.is_available()):
+            drafted = self._render_drafts(game, pending)
+            self._render_concept_art(game, [target for target in pending if target not in drafted])
+        elif len(pending) == len(targets):
+            # Aucune image à enregistrer, mais les prompts servent à la génération différée ou à la régénération
+            game.get_content().save()
+            return game
+
         game.save()
+        game.get_content().save()
+        self._schedule_refinement(game, drafted)
+        return game
+
+    async def acreate_concept_art_for_game(self, game):
+        character_prompt, environment_prompt = await self._aconcept_art_prompts(game)
+        self._print_art_prompts(character_prompt, environment_prompt)
+        self._remember_art_prompts(game, character_prompt, environment_prompt)
+
+        targets = self._art_targets(character_prompt, environment_prompt)
+        pending = await sync_to_async(self._reuse_cached_art)(game, targets)
+        drafted = []
+        if pending:
+            available = await sync_to_async(self.image_provider.is_available, thread_sensitive=False)()
+            if self._skip_images(game, pending, available):
+                if len(pending) == len(targets):
+                    await game.get_content().asave()
+                    return game
+                pending = []
+            drafted = await self._arender_drafts(game, pending)
+            pending = [target for target in pending if target not in drafted]
+
+        # Les images restantes sont demandées en parallèle, bornées par le budget
+        timeout = self._timeout("image")
+        images = await asyncio.gather(
+            *(
+                asyncio.wait_for(self.image_provider.atext_to_image(prompt, timeout=timeout), timeout)
+                for prompt, _, _ in pending
+            ),
+            return_exceptions=True,
+        )
+        for (prompt, field_name, filename), image in zip(pending, images):
+            if isinstance(image, BaseException):
+                print(f"❌ Erreur génération image {field_name}: {image!r}")
+                continue
+            await sync_to_async(self._store_image)(game, field_name, filename, image, prompt)
+            print(f"✅ Génération {field_name} réussie !")
+
+        await game.asave()
+        await game.get_content().asave()
+        self._schedule_refinement(game, drafted)
+        return game
+
+    # --------------------
+    # Étapes selon la profondeur de génération
+    # --------------------
+    @staticmethod
+    def depth_preset(depth):
+        return settings.GAME_GENERATION_DEPTHS[depth]
+
+    def complete_game(self, game):
+        """Lance les étapes qui suivent le concept, selon ``game.generation_depth``"""
+        steps = {
+            "characters": self.create_characters_for_game,
+            "locations": self.create_locations_for_game,
+            "concept_art": self.create_concept_art_for_game,
+        }
+        for stage in self.depth_preset(game.generation_depth)["stages"]:
+            steps[stage](game)
+        return game
+
+    async def acomplete_game(self, game):
+        steps = {
+            "characters": self.acreate_characters_for_game,
+            "locations": self.acreate_locations_for_game,
+            "concept_art": self.acreate_concept_art_for_game,
+        }
+        # Ces étapes ne dépendent que du concept : en parallèle
+        await asyncio.gather(*(steps[stage](game) for stage in self.depth_preset(game.generation_depth)["stages"]))
+        return game
+
+    # --------------------
+    # Régénération partielle d'un jeu existant
+    # --------------------
+    REGENERABLE_SECTIONS = ("characters", "locations", "concept_art_character", "concept_art_environment")
+
+    async def aregenerate_section(self, game, section):
+        """Régénère une seule partie du jeu ; l'ancienne n'est remplacée qu'une fois la nouvelle prête"""
+        if section == "characters":
+            rows = await self._agenerate_characters_data(game)
+            await sync_to_async(self._replace_rows)(game, section, Character, rows)
+        elif section == "locations":
+            rows = await self._agenerate_locations_data(game)
+            await sync_to_async(self._replace_rows)(game, section, Location, rows)
+        elif section in ("concept_art_character", "concept_art_environment"):
+            await self._aregenerate_art(game, section)
+        else:
+            raise ValueError(f"Section inconnue : {section}")
+        return game
+
+    @staticmethod
+    def _replace_rows(game, section, model, rows):
+        with transaction.atomic():
+            # Les remix qui affichent encore ces lignes gardent l'ancienne version
+            game.materialize_remixes(section)
+            model.objects.filter(game=game).delete()
+            model.objects.bulk_create([model(game=game, **row) for row in rows])
+            # Un remix cesse de partager la section avec son jeu source (rien à recopier)
+            Game.objects.filter(pk=game.pk).update(**{f"{section}_source": None, "updated_at": timezone.now()})
+
+    async def _aregenerate_art(self, game, field_name):
+        prompt_field = f"{field_name}_prompt"
+        if not getattr(game.get_content(), prompt_field):
+            # Jeu antérieur au stockage des prompts : on les recrée une fois
+            self._remember_art_prompts(game, *await self._aconcept_art_prompts(game))
+        prompt = getattr(game.get_content(), prompt_field)
+
+        timeout = self._timeout("image")
+        image = await asyncio.wait_for(self.image_provider.atext_to_image(prompt, timeout=timeout), timeout)
+        await sync_to_async(self._swap_art)(game, field_name, image, prompt)
+
+    def _swap_art(self, game, field_name, image, prompt):
+        """Écrit la nouvelle image puis la substitue à l'ancienne en un seul UPDATE"""
+        previous = getattr(game, field_name).name
+        # Une nouvelle image est voulue : le cache d'images est contourné
+        self._store_image(game, field_name, self.ART_FILENAMES[field_name], image, prompt, use_cache=False)
+        field = getattr(game, field_name)
+        with transaction.atomic():
+            swapped = Game.objects.filter(pk=game.pk).update(**{field_name: field.name, "updated_at": timezone.now()})
+            if swapped:
+                GameContent.objects.update_or_create(game_id=game.pk, defaults={f"{field_name}_prompt": prompt})
+        self._release_art_file(field.storage, previous if swapped else field.name)
+
+    # --------------------
+    # Génération aléatoire (réserve pré-générée)
+    # --------------------
+    RANDOM_KEYWORDS = [
+        "boucle temporelle", "vengeance", "IA rebelle", "royaume englouti", "dernier survivant",
+        "prophétie", "rêves partagés", "mémoire perdue", "exploration spatiale", "malédiction",
+        "révolution", "artefact ancien", "amitié improbable", "invasion", "monde miroir",
+    ]
+
+    def generate_random_game(self, genre=None, ambiance=None):
+        """Concept complet sans saisie utilisateur : jeu, personnages, lieux et prompts d'images"""
+        genre = genre or random.choice([value for value, _ in Game.GENRE_CHOICES])
+        ambiance = ambiance or random.choice([value for value, _ in Game.AMBIANCE_CHOICES])
+        keywords = ", ".join(random.sample(self.RANDOM_KEYWORDS, 3))
+
+        game_data = self.generate_game(genre, ambiance, keywords)
+        game = Game(**GameContent.split(game_data)[0])
+        character_prompt, environment_prompt = self._concept_art_prompts(game)
+        game_data["concept_art_character_prompt"] = character_prompt
+        game_data["concept_art_environment_prompt"] = environment_prompt
+        return {
+            "game": game_data,
+            "characters": self._generate_characters_with_ai(game) if self.llm else self._generate_characters_template(game),
+            "locations": self._generate_locations_with_ai(game) if self.llm else self._generate_locations_template(game),
+        }
+
+    @staticmethod
+    def _create_game_from_concept(user, concept):
+        with transaction.atomic():
+            game = Game.objects.create(creator=user, **concept["game"])
+            Character.objects.bulk_create([Character(game=game, **c) for c in concept["characters"]])
+            Location.objects.bulk_create([Location(game=game, **l) for l in concept["locations"]])
+        return game
+
+    def create_random_game(self, user, genre=None, ambiance=None):
+        """Crée un jeu aléatoire depuis la réserve (génération complète si elle est vide)"""
+        pooled = PooledConcept.claim(user, genre, ambiance)
+        if pooled is not None:
+            concept = pooled.concept
+        else:
+            print("[IA] Réserve vide, génération aléatoire à la demande")
+            concept = self.generate_random_game(genre, ambiance)
+        game = self._create_game_from_concept(user, concept)
+        # Le concept art est rendu après la réponse pour garder le clic instantané
+        content = game.get_content()
+        self._defer_concept_art(
+            game, self._art_targets(content.concept_art_character_prompt, content.concept_art_environment_prompt)
+        )
         return game
 
+    async def acreate_random_game(self, user, genre=None, ambiance=None):
+        return await sync_to_async(self.create_random_game)(user, genre, ambiance)
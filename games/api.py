@@ -0,0 +1,311 @@
+"""
+API publique en lecture seule (v1) : jeux publics, personnages et lieux.
+
+- ``fields=id,title,...`` ne charge que les colonnes demandées (``only``) ;
+- la liste est paginée par curseur opaque (identifiants décroissants), sans
+  ``OFFSET`` ni ``COUNT`` ;
+- ``ETag`` et ``Last-Modified`` sont dérivés de ``Game.updated_at`` et
+  calculés avant de charger les objets : un client à jour reçoit un 304 ;
+- chaque client (utilisateur connecté, sinon adresse IP) a son propre seau
+  de requêtes, via le ``ProviderLimiter`` partagé entre workers ; les seaux
+  des clients inactifs sont supprimés par la commande ``prune_rate_limits``.
+"""
+import base64
+import binascii
+import hashlib
+import math
+from functools import wraps
+
+from django.conf import settings
+from django.db.models import Count, Max, Sum
+from django.http import Http404, JsonResponse
+from django.urls import reverse
+from django.views.decorators.http import condition, require_GET
+
+from .models import Game
+from .ratelimit import ProviderLimiter, RateLimitExceeded
+
+
+def _options():
+    return settings.PUBLIC_API
+
+
+# --------------------
+# Champs exposés : nom public -> colonnes à charger, valeur
+# --------------------
+def _file_url(field):
+    return field.url if field else None
+
+
+GAME_FIELDS = {
+    'id': (['id'], lambda game: game.pk),
+    'title': (['title'], lambda game: game.title),
+    'description': (['description'], lambda game: game.description),
+    'genre': (['genre'], lambda game: game.genre),
+    'ambiance': (['ambiance'], lambda game: game.ambiance),
+    'keywords': (['keywords'], lambda game: game.get_keywords_list()),
+    'cultural_references': (['content__cultural_references'], lambda game: game.get_content().cultural_references),
+    'universe_description': (['content__universe_description'], lambda game: game.get_content().universe_description),
+    'main_story': (['content__main_story'], lambda game: game.get_content().main_story),
+    'gameplay_mechanics': (['content__gameplay_mechanics'], lambda game: game.get_content().gameplay_mechanics),
+    'generation_depth': (['generation_depth'], lambda game: game.generation_depth),
+    'creator': (['creator__username'], lambda game: game.creator.username),
+    'remixed_from': (['remixed_from_id'], lambda game: game.remixed_from_id),
+    'views_count': (['views_count'], lambda game: game.views_count),
+    'concept_art_character': (['concept_art_character'], lambda game: _file_url(game.concept_art_character)),
+    'concept_art_environment': (['concept_art_environment'], lambda game: _file_url(game.concept_art_environment)),
+    'created_at': (['created_at'], lambda game: game.created_at.isoformat()),
+    'updated_at': (['updated_at'], lambda game: game.updated_at.isoformat()),
+}
+# Champs renvoyés par la liste quand ``fields`` est absent : pas de longs textes
+GAME_LIST_FIELDS = ['id', 'title', 'genre', 'ambiance', 'creator', 'created_at', 'updated_at']
+
+CHARACTER_FIELDS = ['id', 'name', 'role', 'character_class', 'background', 'abilities', 'motivations', 'appearance']
+LOCATION_FIELDS = ['id', 'name', 'description', 'atmosphere', 'gameplay_significance']
+
+
+class ApiError(Exception):
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+def _requested_fields(request, available, default):
+    raw = request.GET.get('fields')
+    if not raw:
+        return list(default)
+    fields = [field.strip() for field in raw.split(',') if field.strip()]
+    unknown = [field for field in fields if field not in available]
+    if unknown:
+        raise ApiError(f"Champs inconnus : {', '.join(unknown)}")
+    return fields
+
+
+def _game_columns(fields):
+    return sorted({'id', 'updated_at'} | {column for field in fields for column in GAME_FIELDS[field][0]})
+
+
+def _with_relations(queryset, columns):
+    """Jointures nécessaires aux colonnes ``relation__champ`` demandées (créateur, contenu)"""
+    relations = sorted({column.split('__')[0] for column in columns if '__' in column})
+    return queryset.select_related(*relations) if relations else queryset
+
+
+def _serialize_game(game, fields):
+    return {field: GAME_FIELDS[field][1](game) for field in fields}
+
+
+def _public_games():
+    return Game.objects.filter(is_public=True)
+
+
+# --------------------
+# Curseur et filtres de la liste
+# --------------------
+def _encode_cursor(pk):
+    return base64.urlsafe_b64encode(str(pk).encode()).decode().rstrip('=')
+
+
+def _decode_cursor(cursor):
+    try:
+        return int(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode())
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise ApiError("Curseur invalide")
+
+
+def _page_size(request):
+    try:
+        size = int(request.GET.get('limit', _options()['default_page_size']))
+    except ValueError:
+        raise ApiError("limit doit être un entier")
+    return max(1, min(size, _options()['max_page_size']))
+
+
+def _filtered_games(request):
+    queryset = _public_games()
+    for name, choices in (('genre', Game.GENRE_CHOICES), ('ambiance', Game.AMBIANCE_CHOICES)):
+        value = request.GET.get(name)
+        if value:
+            if value not in dict(choices):
+                raise ApiError(f"{name} inconnu : {value}")
+            queryset = queryset.filter(**{name: value})
+    return queryset
+
+
+# --------------------
+# Validateurs HTTP, calculés sans charger les objets
+# --------------------
+def _validators(request, queryset, source=None, default_fields=None):
+    """(ETag, Last-Modified) d'un ensemble de jeux, mémorisés sur la requête
+
+    ``source`` (``'characters_source'`` ou ``'locations_source'``) ajoute la date du jeu
+    qui possède les lignes d'un remix : elles changent sans toucher le remix lui-même.
+    Le compteur de vues change sans toucher ``updated_at`` : quand il est demandé, leur
+    somme entre dans l'ETag et la réponse n'a pas de Last-Modified.
+    """
+    if not hasattr(request, '_api_validators'):
+        aggregates = {'last_modified': Max('updated_at'), 'total': Count('pk')}
+        if source:
+            aggregates['source_modified'] = Max(f'{source}__updated_at')
+        counted = (default_fields is not None
+                   and 'views_count' in _requested_fields(request, GAME_FIELDS, default_fields))
+        if counted:
+            aggregates['views'] = Sum('views_count')
+        state = queryset.aggregate(**aggregates)
+        dates = [state['last_modified'], state.get('source_modified')]
+        fingerprint = "|".join([request.get_full_path(), str(state['total']), str(state.get('views', '')),
+                                *(date.isoformat() if date else '' for date in dates)])
+        last_modified = None if counted else max((date for date in dates if date), default=None)
+        request._api_validators = (hashlib.sha1(fingerprint.encode()).hexdigest(), last_modified)
+    return request._api_validators
+
+
+def _game_list_validators(request):
+    try:
+        return _validators(request, _filtered_games(request), default_fields=GAME_LIST_FIELDS)
+    except ApiError:
+        return None, None
+
+
+def _game_list_etag(request):
+    return _game_list_validators(request)[0]
+
+
+def _game_list_last_modified(request):
+    return _game_list_validators(request)[1]
+
+
+def _game_validators(request, pk):
+    try:
+        return _validators(request, _public_games().filter(pk=pk), default_fields=GAME_FIELDS)
+    except ApiError:
+        return None, None
+
+
+def _game_etag(request, pk, **kwargs):
+    return _game_validators(request, pk)[0]
+
+
+def _game_last_modified(request, pk, **kwargs):
+    return _game_validators(request, pk)[1]
+
+
+def _section_validators(source):
+    """Fonctions ETag / Last-Modified d'une section, qui suivent aussi le jeu source des lignes"""
+    def etag(request, pk, **kwargs):
+        return _validators(request, _public_games().filter(pk=pk), source)[0]
+
+    def last_modified(request, pk, **kwargs):
+        return _validators(request, _public_games().filter(pk=pk), source)[1]
+    return etag, last_modified
+
+
+_characters_etag, _characters_last_modified = _section_validators('characters_source')
+_locations_etag, _locations_last_modified = _section_validators('locations_source')
+
+
+# --------------------
+# Limitation par client et format des réponses
+# --------------------
+def _client_key(request):
+    if request.user.is_authenticated:
+        return f"user:{request.user.pk}"
+    return f"ip:{request.META.get('REMOTE_ADDR', 'inconnu')}"
+
+
+def api_view(view_func):
+    """GET seulement, limite de débit du client et erreurs au format JSON"""
+    @require_GET
+    @wraps(view_func)
+    def _wrapped_view(request, *args, **kwargs):
+        limiter = ProviderLimiter(
+            f"api:{_client_key(request)}",
+            requests_per_minute=_options()['requests_per_minute'],
+            max_wait=0,
+        )
+        try:
+            with limiter.slot():
+                return view_func(request, *args, **kwargs)
+        except RateLimitExceeded:
+            response = JsonResponse({'error': "Trop de requêtes, réessayez plus tard."}, status=429)
+            response['Retry-After'] = str(math.ceil(60 / _options()['requests_per_minute']))
+            return response
+        except ApiError as e:
+            return JsonResponse({'error': str(e)}, status=e.status)
+        except Http404:
+            return JsonResponse({'error': "Jeu introuvable."}, status=404)
+    return _wrapped_view
+
+
+def _json(data):
+    response = JsonResponse(data, json_dumps_params={'ensure_ascii': False})
+    response['Cache-Control'] = 'public, max-age=0, must-revalidate'
+    return response
+
+
+# --------------------
+# Vues
+# --------------------
+@api_view
+@condition(etag_func=_game_list_etag, last_modified_func=_game_list_last_modified)
+def game_list(request):
+    fields = _requested_fields(request, GAME_FIELDS, GAME_LIST_FIELDS)
+    size = _page_size(request)
+    queryset = _filtered_games(request)
+    cursor = request.GET.get('cursor')
+    if cursor:
+        queryset = queryset.filter(pk__lt=_decode_cursor(cursor))
+    columns = _game_columns(fields)
+    queryset = _with_relations(queryset, columns)
+
+    # Un jeu de plus que la page pour savoir s'il existe une suite
+    games = list(queryset.only(*columns).order_by('-pk')[:size + 1])
+    next_url = None
+    if len(games) > size:
+        games = games[:size]
+        params = request.GET.copy()
+        params['cursor'] = _encode_cursor(games[-1].pk)
+        next_url = request.build_absolute_uri(f"{reverse('api_game_list')}?{params.urlencode()}")
+
+    return _json({'results': [_serialize_game(game, fields) for game in games], 'next': next_url})
+
+
+def _get_public_game(pk, columns):
+    queryset = _with_relations(_public_games(), columns)
+    try:
+        return queryset.only(*columns).get(pk=pk)
+    except Game.DoesNotExist:
+        raise Http404
+
+
+@api_view
+@condition(etag_func=_game_etag, last_modified_func=_game_last_modified)
+def game_detail(request, pk):
+    fields = _requested_fields(request, GAME_FIELDS, GAME_FIELDS)
+    game = _get_public_game(pk, _game_columns(fields))
+    return _json(_serialize_game(game, fields))
+
+
+def _section(request, pk, section, available):
+    fields = _requested_fields(request, available, available)
+    game = _get_public_game(pk, ['id', 'characters_source', 'locations_source'])
+    rows = getattr(game, f"get_{section}")().only(*fields).order_by('pk')
+    items = []
+    for row in rows:
+        item = {field: getattr(row, field) for field in fields}
+        if 'id' in item:
+            item['id'] = row.pk
+        items.append(item)
+    return _json({'game': game.pk, 'results': items})
+
+
+@api_view
+@condition(etag_func=_characters_etag, last_modified_func=_characters_last_modified)
+def game_characters(request, pk):
+    return _section(request, pk, 'characters', CHARACTER_FIELDS)
+
+
+@api_view
+@condition(etag_func=_locations_etag, last_modified_func=_locations_last_modified)
+def game_locations(request, pk):
+    return _section(request, pk, 'locations', LOCATION_FIELDS)
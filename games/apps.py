@@ -6,4 +6,5 @@ class GamesConfig(AppConfig):
     name = 'games'
     
     def ready(self):
-        import games.signals
\ No newline at end of file
+        import games.signals
+        import games.sqlite  # noqa: F401 (pragmas posés à la connexion)
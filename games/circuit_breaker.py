@@ -0,0 +1,133 @@
+"""
+Disjoncteur partagé pour les fournisseurs IA.
+
+Après ``failure_threshold`` échecs en ``failure_window`` secondes, le
+disjoncteur d'un fournisseur s'ouvre : les appels échouent immédiatement
+(``CircuitOpen``) et le générateur passe directement aux templates ou saute
+les images. Une fois ``reset_timeout`` écoulé, un seul worker passe le
+disjoncteur en semi-ouvert et lance une sonde en arrière-plan ; son succès
+referme le circuit, son échec le rouvre. L'état est partagé entre workers
+via ``games.shared_state``.
+"""
+import time
+
+from django.conf import settings
+
+from . import shared_state, tasks
+
+shared_state.register_schema(
+    "CREATE TABLE IF NOT EXISTS circuit_breakers ("
+    " name TEXT PRIMARY KEY, state TEXT NOT NULL, failures INTEGER NOT NULL,"
+    " window_started_at REAL NOT NULL, opened_at REAL NOT NULL)"
+)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpen(Exception):
+    """Le fournisseur est considéré indisponible : appel non tenté"""
+
+
+class CircuitBreaker:
+    def __init__(self, name, probe=None, failure_threshold=3, failure_window=60.0,
+                 reset_timeout=30.0, probe_timeout=120.0):
+        self.name = name
+        self.probe = probe
+        self.failure_threshold = failure_threshold
+        self.failure_window = failure_window
+        self.reset_timeout = reset_timeout
+        self.probe_timeout = probe_timeout
+
+    @classmethod
+    def for_provider(cls, name, probe=None):
+        options = settings.AI_CIRCUIT_BREAKER
+        if not options.get("enabled", True):
+            return None
+        options = {key: value for key, value in options.items() if key != "enabled"}
+        return cls(name, probe=probe, **options)
+
+    def _read(self):
+        row = shared_state.query(
+            "SELECT state, failures, window_started_at, opened_at FROM circuit_breakers WHERE name = ?",
+            (self.name,),
+        )
+        return row or (CLOSED, 0, 0.0, 0.0)
+
+    @staticmethod
+    def _write(conn, name, state, failures, window_started_at, opened_at):
+        conn.execute(
+            "INSERT OR REPLACE INTO circuit_breakers (name, state, failures, window_started_at, opened_at)"
+            " VALUES (?, ?, ?, ?, ?)",
+            (name, state, failures, window_started_at, opened_at),
+        )
+
+    @property
+    def state(self):
+        return self._read()[0]
+
+    def allow_request(self):
+        """Vrai si l'appel peut partir vers le fournisseur"""
+        state, _, _, opened_at = self._read()
+        if state == CLOSED:
+            return True
+        elapsed = time.time() - opened_at
+        if (state == OPEN and elapsed >= self.reset_timeout) or (state == HALF_OPEN and elapsed >= self.probe_timeout):
+            self._start_probe()
+        return False
+
+    def record_success(self):
+        state, failures = self._read()[:2]
+        if (state, failures) == (CLOSED, 0):
+            return
+        with shared_state.transaction() as conn:
+            self._write(conn, self.name, CLOSED, 0, 0.0, 0.0)
+        if state != CLOSED:
+            print(f"[IA] Disjoncteur {self.name} refermé")
+
+    def record_failure(self):
+        now = time.time()
+        with shared_state.transaction() as conn:
+            row = conn.execute(
+                "SELECT state, failures, window_started_at FROM circuit_breakers WHERE name = ?",
+                (self.name,),
+            ).fetchone()
+            state, failures, window_started_at = row or (CLOSED, 0, now)
+            if state != CLOSED:
+                return
+            if now - window_started_at > self.failure_window:
+                failures, window_started_at = 0, now
+            failures += 1
+            if failures >= self.failure_threshold:
+                self._write(conn, self.name, OPEN, failures, window_started_at, now)
+                print(f"[IA] Disjoncteur {self.name} ouvert après {failures} échecs")
+            else:
+                self._write(conn, self.name, CLOSED, failures, window_started_at, 0.0)
+
+    def _start_probe(self):
+        # Un seul worker gagne le passage en semi-ouvert et lance la sonde
+        now = time.time()
+        with shared_state.transaction() as conn:
+            row = conn.execute(
+                "SELECT state, failures, opened_at FROM circuit_breakers WHERE name = ?", (self.name,)
+            ).fetchone()
+            if row is None:
+                return
+            state, failures, opened_at = row
+            stale_probe = state == HALF_OPEN and now - opened_at >= self.probe_timeout
+            if not (state == OPEN and now - opened_at >= self.reset_timeout) and not stale_probe:
+                return
+            self._write(conn, self.name, HALF_OPEN, failures, 0.0, now)
+        if self.probe is not None:
+            tasks.submit(self._run_probe)
+
+    def _run_probe(self):
+        try:
+            self.probe()
+        except Exception as e:
+            print(f"[IA] Sonde {self.name} en échec : {e}")
+            with shared_state.transaction() as conn:
+                self._write(conn, self.name, OPEN, self.failure_threshold, 0.0, time.time())
+        else:
+            self.record_success()
@@ -0,0 +1,96 @@
+"""
+Routage lecture / écriture entre la base principale et ses réplicas.
+
+Les écritures vont toujours sur ``default``. Les lectures faites pendant une
+requête HTTP sont réparties sur ``DATABASE_REPLICAS``, sauf :
+
+- pendant une requête qui écrit (POST, PUT, PATCH, DELETE) ;
+- pendant ``DATABASE_REPLICA_PIN_SECONDS`` après une telle requête du même
+  navigateur (cookie), pour qu'un jeu créé ou modifié soit visible tout de
+  suite malgré le retard de réplication ;
+- dans une transaction ouverte sur ``default`` ;
+- pour les sessions et les comptes : une copie en retard déconnecterait
+  l'utilisateur (session ou mot de passe pas encore répliqués).
+
+Hors requête (commandes, tâches d'arrière-plan), tout reste sur ``default`` :
+ces traitements relisent ce qu'ils vont réécrire.
+"""
+import random
+import time
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+
+PRIMARY = 'default'
+PIN_COOKIE = 'gameforge_primary_until'
+PRIMARY_ONLY_APPS = {'sessions', 'auth'}
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS', 'TRACE')
+
+_use_replicas = ContextVar('gameforge_use_replicas', default=False)
+
+
+class PrimaryReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if not _use_replicas.get() or not settings.DATABASE_REPLICAS:
+            return PRIMARY
+        if model._meta.app_label in PRIMARY_ONLY_APPS or connections[PRIMARY].in_atomic_block:
+            return PRIMARY
+        return random.choice(list(settings.DATABASE_REPLICAS))
+
+    def db_for_write(self, model, **hints):
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Réplicas et base principale contiennent les mêmes lignes
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == PRIMARY
+
+
+def _pinned(request):
+    if request.method not in SAFE_METHODS:
+        return True
+    try:
+        return float(request.COOKIES.get(PIN_COOKIE, 0)) > time.time()
+    except ValueError:
+        return False
+
+
+class ReplicaRoutingMiddleware:
+    """Choisit, pour chaque requête, entre réplicas et base principale"""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        token = _use_replicas.set(not _pinned(request))
+        try:
+            response = self.get_response(request)
+        finally:
+            _use_replicas.reset(token)
+        return self._pin(request, response)
+
+    async def __acall__(self, request):
+        token = _use_replicas.set(not _pinned(request))
+        try:
+            response = await self.get_response(request)
+        finally:
+            _use_replicas.reset(token)
+        return self._pin(request, response)
+
+    def _pin(self, request, response):
+        """Après une écriture, les lectures suivantes de ce navigateur restent sur la base principale"""
+        if request.method not in SAFE_METHODS and settings.DATABASE_REPLICAS:
+            window = settings.DATABASE_REPLICA_PIN_SECONDS
+            response.set_cookie(PIN_COOKIE, f"{time.time() + window:.3f}", max_age=window,
+                                httponly=True, samesite='Lax')
+        return response
@@ -0,0 +1,37 @@
+"""
+Budget de temps d'une génération.
+
+L'appelant fixe une échéance globale (profil ``interactive`` ou ``batch`` de
+``AI_GENERATION_DEADLINES``). Chaque étape reçoit un timeout égal à sa part du
+budget (``AI_STAGE_TIMEOUT_SHARES``), borné par le temps restant. Une étape
+optionnelle n'est lancée que s'il reste au moins ``AI_STAGE_MIN_BUDGET``
+secondes.
+"""
+import time
+
+from django.conf import settings
+
+
+class Deadline:
+    def __init__(self, seconds):
+        self.seconds = seconds
+        self.expires_at = time.monotonic() + seconds
+
+    @classmethod
+    def for_profile(cls, profile):
+        return cls(settings.AI_GENERATION_DEADLINES[profile])
+
+    def remaining(self):
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def expired(self):
+        return self.remaining() <= 0
+
+    def timeout_for(self, stage):
+        """Timeout d'un appel de l'étape ``stage`` (jamais au-delà de l'échéance)"""
+        share = settings.AI_STAGE_TIMEOUT_SHARES.get(stage, 1.0)
+        return min(self.remaining(), self.seconds * share)
+
+    def allows(self, stage):
+        """Vrai s'il reste assez de budget pour lancer l'étape"""
+        return self.remaining() >= settings.AI_STAGE_MIN_BUDGET.get(stage, 0.0)
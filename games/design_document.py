@@ -0,0 +1,188 @@
+"""
+Document de conception PDF d'un jeu (reportlab).
+
+Le PDF est rendu en arrière-plan (``games.tasks``) puis gardé sur disque dans
+``GAME_PDF['cache_dir']``, sous un nom qui contient ``Game.updated_at`` :
+toute modification du jeu donne un nouveau fichier, les téléchargements
+suivants ne coûtent qu'une lecture. Un seul rendu par version est lancé à
+la fois, tous workers confondus (``games.shared_state``).
+"""
+import os
+import tempfile
+import time
+from pathlib import Path
+from xml.sax.saxutils import escape
+
+from django.conf import settings
+
+from . import shared_state, tasks
+from .models import Game
+
+shared_state.register_schema(
+    "CREATE TABLE IF NOT EXISTS pdf_renders (key TEXT PRIMARY KEY, started_at REAL NOT NULL)"
+)
+
+
+def _options():
+    return settings.GAME_PDF
+
+
+def _cache_dir():
+    return Path(_options()['cache_dir'])
+
+
+def cached_path(game):
+    """Emplacement du PDF pour la version actuelle du jeu"""
+    return _cache_dir() / f"game-{game.pk}-{int(game.updated_at.timestamp() * 1_000_000)}.pdf"
+
+
+def discard(game_id):
+    """Supprime toutes les versions en cache d'un jeu"""
+    for path in _cache_dir().glob(f"game-{game_id}-*.pdf"):
+        path.unlink(missing_ok=True)
+
+
+# --------------------
+# Rendu en arrière-plan
+# --------------------
+def _claim(key):
+    """Vrai si ce worker doit lancer le rendu (aucun autre en cours pour cette version)"""
+    now = time.time()
+    with shared_state.transaction() as conn:
+        conn.execute("DELETE FROM pdf_renders WHERE started_at < ?", (now - _options()['render_timeout'],))
+        inserted = conn.execute(
+            "INSERT OR IGNORE INTO pdf_renders (key, started_at) VALUES (?, ?)", (key, now)
+        ).rowcount
+    return bool(inserted)
+
+
+def _release(key):
+    with shared_state.transaction() as conn:
+        conn.execute("DELETE FROM pdf_renders WHERE key = ?", (key,))
+
+
+def schedule(game):
+    """Lance le rendu de la version actuelle si personne ne s'en occupe déjà"""
+    path = cached_path(game)
+    if _claim(path.name):
+        tasks.submit(_render_version, game.pk, path)
+
+
+def _render_version(game_id, path):
+    try:
+        game = Game.objects.select_related('creator', 'content').filter(pk=game_id).first()
+        # Jeu supprimé ou modifié entre-temps : la prochaine demande visera la nouvelle version
+        if game is None or cached_path(game) != path:
+            return
+        started = time.perf_counter()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Écriture dans un fichier temporaire puis renommage : jamais de PDF à moitié écrit servi
+        fd, tmp_name = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as output:
+                build(game, output)
+            os.replace(tmp_name, path)
+        except BaseException:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
+        for previous in path.parent.glob(f"game-{game_id}-*.pdf"):
+            if previous != path:
+                previous.unlink(missing_ok=True)
+        print(f"📄 PDF du jeu {game_id} rendu en {time.perf_counter() - started:.1f}s")
+    finally:
+        _release(path.name)
+
+
+# --------------------
+# Mise en page
+# --------------------
+def _paragraphs(text, style, Paragraph):
+    return [Paragraph(escape(block).replace("\n", "<br/>"), style) for block in text.split("\n\n") if block.strip()]
+
+
+def _image(field, max_width, max_height, Image):
+    if not field or not field.storage.exists(field.name):
+        return None
+    from reportlab.lib.utils import ImageReader
+
+    path = field.path
+    width, height = ImageReader(path).getSize()
+    scale = min(1.0, max_width / width, max_height / height)
+    return Image(path, width=width * scale, height=height * scale)
+
+
+def build(game, output):
+    """Écrit le document de conception complet de ``game`` dans ``output``"""
+    from reportlab.lib import colors
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+    from reportlab.lib.units import cm
+    from reportlab.platypus import Image, KeepTogether, PageBreak, Paragraph, SimpleDocTemplate, Spacer
+
+    styles = getSampleStyleSheet()
+    meta = ParagraphStyle('meta', parent=styles['Normal'], textColor=colors.grey)
+    label = ParagraphStyle('label', parent=styles['Normal'], fontName='Helvetica-Bold', spaceBefore=6)
+
+    document = SimpleDocTemplate(
+        output, pagesize=A4, title=game.title, author=game.creator.username,
+        leftMargin=2 * cm, rightMargin=2 * cm, topMargin=2 * cm, bottomMargin=2 * cm,
+    )
+    story = [
+        Paragraph(escape(game.title), styles['Title']),
+        Paragraph(escape(
+            f"{game.get_genre_display()} · {game.get_ambiance_display()} · par {game.creator.username}"
+            f" · {game.created_at:%d/%m/%Y}"
+        ), meta),
+        Spacer(1, 0.5 * cm),
+    ]
+
+    content = game.get_content()
+    sections = [
+        ("Concept", game.description),
+        ("Mots-clés", ", ".join(game.get_keywords_list())),
+        ("Références culturelles", content.cultural_references),
+        ("Univers", content.universe_description),
+        ("Histoire principale", content.main_story),
+        ("Mécaniques de jeu", content.gameplay_mechanics),
+    ]
+    for heading, text in sections:
+        if text:
+            story.append(Paragraph(heading, styles['Heading2']))
+            story.extend(_paragraphs(text, styles['BodyText'], Paragraph))
+
+    characters = list(game.get_characters())
+    if characters:
+        story.append(Paragraph("Personnages", styles['Heading2']))
+        for character in characters:
+            block = [Paragraph(escape(f"{character.name} — {character.get_role_display()}, {character.character_class}"),
+                               styles['Heading3'])]
+            for heading, text in (("Histoire", character.background), ("Capacités", character.abilities),
+                                  ("Motivations", character.motivations), ("Apparence", character.appearance)):
+                block.append(Paragraph(heading, label))
+                block.extend(_paragraphs(text, styles['BodyText'], Paragraph))
+            story.append(KeepTogether(block))
+
+    locations = list(game.get_locations())
+    if locations:
+        story.append(Paragraph("Lieux", styles['Heading2']))
+        for location in locations:
+            block = [Paragraph(escape(location.name), styles['Heading3'])]
+            block.extend(_paragraphs(location.description, styles['BodyText'], Paragraph))
+            for heading, text in (("Atmosphère", location.atmosphere),
+                                  ("Importance dans le gameplay", location.gameplay_significance)):
+                block.append(Paragraph(heading, label))
+                block.extend(_paragraphs(text, styles['BodyText'], Paragraph))
+            story.append(KeepTogether(block))
+
+    images = [
+        (heading, _image(field, document.width, document.height * 0.8, Image))
+        for heading, field in (("Personnage", game.concept_art_character),
+                               ("Environnement", game.concept_art_environment))
+    ]
+    images = [(heading, image) for heading, image in images if image is not None]
+    if images:
+        story.extend([PageBreak(), Paragraph("Art conceptuel", styles['Heading2'])])
+        for heading, image in images:
+            story.append(KeepTogether([Paragraph(heading, styles['Heading3']), image, Spacer(1, 0.5 * cm)]))
+
+    document.build(story)
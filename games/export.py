@@ -0,0 +1,228 @@
+"""
+Export en flux du catalogue (jeux, personnages, lieux) en JSONL ou Parquet.
+
+Les jeux sont lus par lots (``iterator(chunk_size=...)``) ; les personnages
+et lieux de chaque lot sont chargés en une requête par section, en suivant
+les sources partagées des remix. Rien n'est gardé en mémoire au-delà d'un
+lot : la commande ``export_games`` et la vue réservée au staff produisent
+le fichier au fil de l'eau (sous ASGI, via l'itérateur asynchrone ``aiterate``). Le format Parquet (un groupe de lignes par lot)
+nécessite ``pyarrow``, dépendance optionnelle.
+
+Pour un export incrémental, ``updated_after`` reprend au filigrane de
+l'export précédent ; le filigrane d'un export est fixé à son début (plus
+grand ``updated_at`` des jeux sélectionnés) et les jeux modifiés pendant
+l'export sont laissés au suivant.
+"""
+import io
+import json
+from datetime import datetime
+from itertools import islice
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db.models import Max
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from .models import Character, Game, GameContent, Location
+
+FORMATS = ('jsonl', 'parquet')
+CONTENT_TYPES = {'jsonl': 'application/x-ndjson', 'parquet': 'application/vnd.apache.parquet'}
+
+GAME_COLUMNS = [
+    'id', 'title', 'description', 'genre', 'ambiance', 'keywords', 'cultural_references', 'generation_depth',
+    'universe_description', 'main_story', 'gameplay_mechanics', 'is_public', 'views_count', 'remixed_from_id',
+    'concept_art_character', 'concept_art_environment', 'created_at', 'updated_at',
+]
+CHARACTER_COLUMNS = ['name', 'role', 'character_class', 'background', 'abilities', 'motivations', 'appearance']
+LOCATION_COLUMNS = ['name', 'description', 'atmosphere', 'gameplay_significance']
+
+
+class ExportError(ValueError):
+    """Paramètres d'export invalides ou format indisponible"""
+
+
+def _chunk_size():
+    return settings.GAME_EXPORT['chunk_size']
+
+
+def _parse_moment(value, name):
+    """Date ``AAAA-MM-JJ`` ou date-heure ISO 8601 (fuseau du projet si absent)"""
+    if value in (None, ''):
+        return None
+    moment = parse_datetime(value)
+    if moment is None:
+        day = parse_date(value)
+        if day is None:
+            raise ExportError(f"{name} : date invalide ({value})")
+        moment = datetime.combine(day, datetime.min.time())
+    if timezone.is_naive(moment):
+        moment = timezone.make_aware(moment)
+    return moment
+
+
+# --------------------
+# Sélection
+# --------------------
+def select_games(public_only=False, created_after=None, created_before=None, creator=None, updated_after=None):
+    """Jeux à exporter et filigrane de cet export (``None`` si aucun jeu)"""
+    queryset = Game.objects.all()
+    if public_only:
+        queryset = queryset.filter(is_public=True)
+    created_after = _parse_moment(created_after, 'created_after')
+    if created_after:
+        queryset = queryset.filter(created_at__gte=created_after)
+    created_before = _parse_moment(created_before, 'created_before')
+    if created_before:
+        queryset = queryset.filter(created_at__lt=created_before)
+    if creator:
+        queryset = queryset.filter(creator__username=creator)
+    updated_after = _parse_moment(updated_after, 'updated_after')
+    if updated_after:
+        queryset = queryset.filter(updated_at__gt=updated_after)
+
+    watermark = queryset.aggregate(watermark=Max('updated_at'))['watermark']
+    if watermark is not None:
+        queryset = queryset.filter(updated_at__lte=watermark)
+    return queryset.select_related('creator', 'content').order_by('pk'), watermark
+
+
+# --------------------
+# Lignes
+# --------------------
+def _section_rows(model, columns, source_ids):
+    rows = {}
+    for row in model.objects.filter(game_id__in=source_ids).order_by('pk').values('game_id', *columns):
+        rows.setdefault(row.pop('game_id'), []).append(row)
+    return rows
+
+
+def _game_row(game, characters, locations):
+    content = game.get_content()
+    row = {column: getattr(content if column in GameContent.FIELDS else game, column) for column in GAME_COLUMNS}
+    row['creator'] = game.creator.username
+    row['keywords'] = game.get_keywords_list()
+    row['concept_art_character'] = game.concept_art_character.name or None
+    row['concept_art_environment'] = game.concept_art_environment.name or None
+    row['characters'] = characters.get(game.characters_source_id or game.pk, [])
+    row['locations'] = locations.get(game.locations_source_id or game.pk, [])
+    return row
+
+
+def iter_batches(queryset):
+    """Lots de lignes (dictionnaires) ; personnages et lieux en une requête par lot"""
+    games = queryset.iterator(chunk_size=_chunk_size())
+    while True:
+        batch = list(islice(games, _chunk_size()))
+        if not batch:
+            return
+        characters = _section_rows(Character, CHARACTER_COLUMNS, {g.characters_source_id or g.pk for g in batch})
+        locations = _section_rows(Location, LOCATION_COLUMNS, {g.locations_source_id or g.pk for g in batch})
+        yield [_game_row(game, characters, locations) for game in batch]
+
+
+# --------------------
+# Formats
+# --------------------
+def _json_default(value):
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    raise TypeError(f"Valeur non sérialisable : {value!r}")
+
+
+def iter_jsonl(queryset):
+    for batch in iter_batches(queryset):
+        yield "".join(
+            json.dumps(row, ensure_ascii=False, default=_json_default) + "\n" for row in batch
+        ).encode('utf-8')
+
+
+def _parquet_schema(pa):
+    text = pa.string()
+    return pa.schema(
+        [('id', pa.int64()), ('title', text), ('description', text), ('creator', text), ('genre', text),
+         ('ambiance', text), ('keywords', pa.list_(text)), ('cultural_references', text),
+         ('generation_depth', text), ('universe_description', text), ('main_story', text),
+         ('gameplay_mechanics', text), ('is_public', pa.bool_()), ('views_count', pa.int64()),
+         ('remixed_from_id', pa.int64()), ('concept_art_character', text), ('concept_art_environment', text),
+         ('created_at', pa.timestamp('us', tz='UTC')), ('updated_at', pa.timestamp('us', tz='UTC')),
+         ('characters', pa.list_(pa.struct([(column, text) for column in CHARACTER_COLUMNS]))),
+         ('locations', pa.list_(pa.struct([(column, text) for column in LOCATION_COLUMNS])))]
+    )
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise ExportError("Le format parquet nécessite pyarrow (pip install pyarrow)")
+    return pyarrow, pyarrow.parquet
+
+
+class _DrainableBuffer(io.RawIOBase):
+    """Fichier en écriture seule dont on retire le contenu au fur et à mesure"""
+
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def drain(self):
+        data, self._chunks = b"".join(self._chunks), []
+        return data
+
+
+def iter_parquet(queryset):
+    """Fichier Parquet produit par morceaux : un groupe de lignes par lot"""
+    pa, pq = _require_pyarrow()
+    schema = _parquet_schema(pa)
+    sink = _DrainableBuffer()
+    writer = pq.ParquetWriter(sink, schema, compression='zstd')
+    try:
+        for batch in iter_batches(queryset):
+            writer.write_table(pa.Table.from_pylist(batch, schema=schema))
+            yield sink.drain()
+    finally:
+        writer.close()
+    yield sink.drain()
+
+
+def stream(queryset, fmt):
+    if fmt not in FORMATS:
+        raise ExportError(f"Format inconnu : {fmt} (attendu : {', '.join(FORMATS)})")
+    if fmt == 'parquet':
+        _require_pyarrow()
+        return iter_parquet(queryset)
+    return iter_jsonl(queryset)
+
+
+_END = object()
+
+
+async def aiterate(chunks):
+    """Itérateur asynchrone sur les morceaux de ``stream``, produits un par un dans le thread synchrone
+
+    Sous ASGI, Django matérialiserait un itérateur synchrone (``sync_to_async(list)``)
+    avant d'envoyer le premier octet.
+    """
+    next_chunk = sync_to_async(next)
+    try:
+        while True:
+            chunk = await next_chunk(chunks, _END)
+            if chunk is _END:
+                return
+            yield chunk
+    finally:
+        # Téléchargement interrompu : le curseur du lot en cours est refermé dans son thread
+        await sync_to_async(chunks.close)()
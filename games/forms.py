@@ -1,4 +1,5 @@
 from django import forms
+from django.conf import settings
 from django.contrib.auth.forms import UserCreationForm
 from django.contrib.auth.models import User
 from .models import Game, UserProfile
@@ -32,24 +33,41 @@ class CustomUserCreationForm(UserCreationForm):
 
 
 class GameCreationForm(forms.ModelForm):
+    # Stocké dans GameContent : champ déclaré ici plutôt que tiré du modèle Game
+    cultural_references = forms.CharField(
+        required=False,
+        help_text="Références culturelles (optionnel)",
+        widget=forms.Textarea(attrs={'rows': 2, 'placeholder': 'Ex: Zelda, Hollow Knight, Disco Elysium... (optionnel)'}),
+    )
+
     class Meta:
         model = Game
-        fields = ['genre', 'ambiance', 'keywords', 'cultural_references']
+        fields = ['genre', 'ambiance', 'keywords', 'cultural_references', 'generation_depth']
         widgets = {
             'keywords': forms.Textarea(attrs={'rows': 3, 'placeholder': 'Ex: boucle temporelle, vengeance, IA rebelle...'}),
-            'cultural_references': forms.Textarea(attrs={'rows': 2, 'placeholder': 'Ex: Zelda, Hollow Knight, Disco Elysium... (optionnel)'}),
         }
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
+        # Afficher le coût de chaque profondeur dans la liste
+        self.fields['generation_depth'].choices = [
+            (value, f"{label} — {settings.GAME_GENERATION_DEPTHS[value]['cost']} crédit(s)")
+            for value, label in Game.DEPTH_CHOICES
+        ]
+        self.fields['generation_depth'].required = False
         # Ajouter des classes CSS Bootstrap aux champs
         for field_name, field in self.fields.items():
-            if field_name in ['genre', 'ambiance']:
+            if field_name in ['genre', 'ambiance', 'generation_depth']:
                 field.widget.attrs['class'] = 'form-select'
             else:
                 field.widget.attrs['class'] = 'form-control'
 
 
+    def clean_generation_depth(self):
+        # Sans précision, le jeu est généré en entier (comportement historique)
+        return self.cleaned_data.get('generation_depth') or 'full'
+
+
 class GameUpdateForm(forms.ModelForm):
     class Meta:
         model = Game
@@ -97,7 +115,7 @@ class GameSearchForm(forms.Form):
         ('created_at', 'Plus ancien'),
         ('title', 'Titre A-Z'),
         ('-title', 'Titre Z-A'),
-        ('-views_count', 'Plus populaire'),
+        ('-trending_score', 'Plus populaire'),
     ]
 
     query = forms.CharField(
@@ -0,0 +1,78 @@
+"""
+Validateurs HTTP (ETag / Last-Modified) et en-têtes de cache des pages de jeux.
+
+Les validateurs se calculent sans charger les objets affichés : date de
+modification du jeu (ou des jeux listés), utilisateur courant et une version
+globale du contenu. Cette version (stockée dans ``games.shared_state``) est
+avancée par ce qui change une page sans toucher ``Game.updated_at`` : tendances,
+recommandations, nouveaux comptes... ``GAMEFORGE_PAGE_CACHE['version']``
+s'y ajoute pour invalider toutes les pages lors d'un déploiement.
+"""
+import hashlib
+import time
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.contrib.messages import get_messages
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+
+from . import shared_state
+
+shared_state.register_schema(
+    "CREATE TABLE IF NOT EXISTS content_version (id INTEGER PRIMARY KEY CHECK (id = 1), changed_at REAL NOT NULL)"
+)
+
+
+def _options():
+    return settings.GAMEFORGE_PAGE_CACHE
+
+
+def bump():
+    """Invalide les pages dont le contenu ne dépend pas seulement de ``updated_at``"""
+    with shared_state.transaction() as conn:
+        conn.execute("INSERT OR REPLACE INTO content_version (id, changed_at) VALUES (1, ?)", (time.time(),))
+
+
+def version():
+    row = shared_state.query("SELECT changed_at FROM content_version WHERE id = 1")
+    return row[0] if row else 0.0
+
+
+def validators(request, *parts, updated_at=None):
+    """(ETag, Last-Modified) de la page, ``(None, None)`` si elle ne doit pas être validée"""
+    # Un message flash s'affiche une seule fois : la page n'est pas réutilisable
+    if len(get_messages(request)):
+        return None, None
+    changed_at = version()
+    user = request.user.pk if request.user.is_authenticated else 'anonyme'
+    fingerprint = "|".join(str(part) for part in (_options()['version'], changed_at, user, *parts, updated_at))
+    etag = hashlib.sha1(fingerprint.encode()).hexdigest()
+    last_modified = datetime.fromtimestamp(changed_at, tz=timezone.utc)
+    if updated_at is not None:
+        last_modified = max(last_modified, updated_at)
+    return etag, last_modified
+
+
+def not_modified(request, etag, last_modified):
+    """Réponse 304 si la copie du client est à jour, sinon ``None``"""
+    if etag is None:
+        return None
+    return get_conditional_response(request, etag=quote_etag(etag), last_modified=last_modified.timestamp())
+
+
+def finalize(request, response, etag, last_modified, max_age=0):
+    """Pose validateurs et ``Cache-Control`` ; ``max_age=0`` impose une revalidation à chaque visite
+
+    Une page qui contient un jeton CSRF (propre au visiteur, posé en cookie) reste privée.
+    """
+    if etag is not None and response.status_code in (200, 304):
+        response['ETag'] = quote_etag(etag)
+        response['Last-Modified'] = http_date(last_modified.timestamp())
+    if request.user.is_authenticated or request.META.get('CSRF_COOKIE_NEEDS_UPDATE'):
+        patch_cache_control(response, private=True, no_cache=True)
+    elif max_age:
+        patch_cache_control(response, public=True, max_age=max_age)
+    else:
+        patch_cache_control(response, public=True, no_cache=True)
+    return response
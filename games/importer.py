@@ -0,0 +1,198 @@
+"""
+Import en masse de jeux depuis un fichier JSONL (format de ``games.export``).
+
+Le fichier est lu ligne à ligne. Chaque enregistrement est validé contre les
+contraintes des champs de ``Game``, ``GameContent``, ``Character`` et ``Location`` (longueurs,
+choix de genre, d'ambiance et de rôle, champs obligatoires) sans requête
+SQL ; les lignes invalides sont signalées et ignorées. Les jeux valides sont
+écrits par lots avec ``bulk_create``, un lot par transaction, puis indexés
+pour la détection des doublons (``bulk_create`` n'envoie pas ``post_save``).
+"""
+import json
+from dataclasses import dataclass, field
+
+from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from . import http_cache, near_duplicates
+from .models import Character, Game, GameContent, Location
+
+# Champs repris tels quels d'un enregistrement ; les autres (id, remix...) sont ignorés
+GAME_FIELDS = ['title', 'description', 'genre', 'ambiance', 'generation_depth', 'is_public', 'views_count']
+CONTENT_FIELDS = ['cultural_references', 'universe_description', 'main_story', 'gameplay_mechanics']
+CHARACTER_FIELDS = ['name', 'role', 'character_class', 'background', 'abilities', 'motivations', 'appearance']
+LOCATION_FIELDS = ['name', 'description', 'atmosphere', 'gameplay_significance']
+
+
+class RecordError(ValueError):
+    """Enregistrement rejeté"""
+
+
+@dataclass
+class ImportReport:
+    read: int = 0
+    imported: int = 0
+    characters: int = 0
+    locations: int = 0
+    errors: list = field(default_factory=list)
+
+    def reject(self, line_number, message):
+        self.errors.append((line_number, message))
+
+
+def _messages(error):
+    if hasattr(error, 'message_dict'):
+        return "; ".join(f"{name} : {' '.join(messages)}" for name, messages in error.message_dict.items())
+    return " ".join(error.messages)
+
+
+# --------------------
+# Validation d'un enregistrement
+# --------------------
+class CreatorMap:
+    """Noms de créateurs du fichier -> utilisateurs locaux (mis en cache)"""
+
+    def __init__(self, mapping=None, default=None):
+        self.mapping = mapping or {}
+        self._users = {}
+        self.default = self._lookup(default) if default else None
+        if default and self.default is None:
+            raise RecordError(f"Créateur par défaut inconnu : {default}")
+
+    def _lookup(self, username):
+        if username not in self._users:
+            self._users[username] = User.objects.filter(username=username).only('pk').first()
+        return self._users[username]
+
+    def resolve(self, username):
+        user = self._lookup(self.mapping.get(username, username)) if username else None
+        if user is None:
+            user = self.default
+        if user is None:
+            raise RecordError(f"Créateur inconnu : {username or '(absent)'}")
+        return user
+
+
+def _build_game(record, creators):
+    game = Game()
+    for name in GAME_FIELDS:
+        if name in record and record[name] is not None:
+            setattr(game, name, record[name])
+    keywords = record.get('keywords', '')
+    game.keywords = ", ".join(keywords) if isinstance(keywords, list) else keywords
+    # Images reprises par nom seulement si le fichier est présent dans ce stockage
+    for name in ('concept_art_character', 'concept_art_environment'):
+        image = record.get(name)
+        if image and getattr(game, name).storage.exists(image):
+            setattr(game, name, image)
+    if record.get('created_at'):
+        try:
+            created_at = parse_datetime(record['created_at'])
+        except (TypeError, ValueError):
+            created_at = None
+        if created_at is None:
+            raise RecordError(f"created_at : date invalide ({record['created_at']})")
+        game.created_at = created_at if timezone.is_aware(created_at) else timezone.make_aware(created_at)
+    # Les clés étrangères sont vérifiées à part, sans requête par ligne
+    game.clean_fields(exclude=['creator', 'remixed_from', 'characters_source', 'locations_source'])
+    game.creator = creators.resolve(record.get('creator'))
+    return game
+
+
+def _build_content(record):
+    content = GameContent(**{name: record[name] for name in CONTENT_FIELDS if record.get(name) is not None})
+    content.clean_fields(exclude=['game'])
+    return content
+
+
+def _build_rows(model, names, items, section):
+    rows = []
+    for index, item in enumerate(items or []):
+        if not isinstance(item, dict):
+            raise RecordError(f"{section}[{index}] : objet attendu")
+        row = model(**{name: item[name] for name in names if name in item})
+        try:
+            row.clean_fields(exclude=['game'])
+        except ValidationError as e:
+            raise RecordError(f"{section}[{index}] : {_messages(e)}")
+        rows.append(row)
+    return rows
+
+
+def parse_record(line, creators):
+    """(jeu, contenu, personnages, lieux) non enregistrés ; ``RecordError`` si la ligne est invalide"""
+    try:
+        record = json.loads(line)
+    except json.JSONDecodeError as e:
+        raise RecordError(f"JSON invalide : {e}")
+    if not isinstance(record, dict):
+        raise RecordError("objet JSON attendu")
+    try:
+        game = _build_game(record, creators)
+        content = _build_content(record)
+    except ValidationError as e:
+        raise RecordError(_messages(e))
+    characters = _build_rows(Character, CHARACTER_FIELDS, record.get('characters'), 'characters')
+    locations = _build_rows(Location, LOCATION_FIELDS, record.get('locations'), 'locations')
+    return game, content, characters, locations
+
+
+# --------------------
+# Écriture par lots
+# --------------------
+def _write_batch(batch):
+    with transaction.atomic():
+        games = Game.objects.bulk_create([game for game, _, _, _ in batch])
+        contents, characters, locations = [], [], []
+        for game, content, game_characters, game_locations in batch:
+            content.game_id = game.pk
+            contents.append(content)
+            for row in game_characters:
+                row.game_id = game.pk
+            for row in game_locations:
+                row.game_id = game.pk
+            characters.extend(game_characters)
+            locations.extend(game_locations)
+        GameContent.objects.bulk_create(contents, batch_size=1000)
+        Character.objects.bulk_create(characters, batch_size=1000)
+        Location.objects.bulk_create(locations, batch_size=1000)
+        if near_duplicates.enabled():
+            near_duplicates.index_new_games(games)
+    return len(characters), len(locations)
+
+
+def import_lines(lines, creators, chunk_size=1000, dry_run=False, on_error=None):
+    """Valide et importe un flux de lignes JSONL ; renvoie un ``ImportReport``"""
+    report = ImportReport()
+    batch = []
+
+    def flush():
+        if batch and not dry_run:
+            characters, locations = _write_batch(batch)
+            report.characters += characters
+            report.locations += locations
+        if not dry_run:
+            report.imported += len(batch)
+        batch.clear()
+
+    for line_number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        report.read += 1
+        try:
+            batch.append(parse_record(line, creators))
+        except RecordError as e:
+            report.reject(line_number, str(e))
+            if on_error is not None:
+                on_error(line_number, str(e))
+            continue
+        if len(batch) >= chunk_size:
+            flush()
+    flush()
+
+    if report.imported:
+        http_cache.bump()
+    return report
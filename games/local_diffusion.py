@@ -0,0 +1,213 @@
+"""
+Génération d'images locale sur CPU par un worker résident.
+
+Le modèle diffusers est chargé une seule fois par la commande
+``run_image_worker``, processus dédié qui tourne en continu. Les workers web
+déposent leurs demandes dans une file partagée (``games.shared_state``) puis
+attendent le résultat. Le worker prend jusqu'à ``max_batch`` demandes d'un
+même mode, venant de n'importe quel jeu, et les rend en une seule passe du
+modèle. Le mode ``draft`` (peu d'étapes, basse résolution) sert d'aperçu
+rapide ; le mode ``full`` donne la qualité normale (``AI_LOCAL_DIFFUSION``).
+"""
+import time
+import uuid
+from io import BytesIO
+
+from django.conf import settings
+from PIL import Image
+
+from . import shared_state
+
+shared_state.register_schema(
+    "CREATE TABLE IF NOT EXISTS image_jobs ("
+    " id TEXT PRIMARY KEY, mode TEXT NOT NULL, prompt TEXT NOT NULL, state TEXT NOT NULL,"
+    " result BLOB, error TEXT, created_at REAL NOT NULL, expires_at REAL NOT NULL)"
+)
+shared_state.register_schema(
+    "CREATE TABLE IF NOT EXISTS image_workers ("
+    " name TEXT PRIMARY KEY, model TEXT NOT NULL, heartbeat_at REAL NOT NULL)"
+)
+
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+
+class LocalDiffusionError(Exception):
+    """Le worker local n'a pas pu rendre l'image"""
+
+
+def _options():
+    return settings.AI_LOCAL_DIFFUSION
+
+
+def mode_options(mode):
+    return _options()["modes"][mode]
+
+
+# --------------------
+# Côté web : dépôt des demandes et attente du résultat
+# --------------------
+def worker_alive():
+    """Vrai si un worker a donné signe de vie récemment"""
+    row = shared_state.query("SELECT MAX(heartbeat_at) FROM image_workers")
+    return bool(row and row[0]) and time.time() - row[0] < _options()["heartbeat_timeout"]
+
+
+def submit(prompt, mode, timeout=None):
+    """Dépose une demande ; elle est abandonnée si personne ne la prend avant ``timeout``"""
+    job_id = uuid.uuid4().hex
+    now = time.time()
+    ttl = timeout if timeout is not None else settings.AI_CALL_TIMEOUT
+    with shared_state.transaction() as conn:
+        conn.execute(
+            "INSERT INTO image_jobs (id, mode, prompt, state, created_at, expires_at) VALUES (?, ?, ?, ?, ?, ?)",
+            (job_id, mode, prompt, PENDING, now, now + ttl),
+        )
+    return job_id
+
+
+def _take_result(job_id):
+    with shared_state.transaction() as conn:
+        row = conn.execute("SELECT state, result, error FROM image_jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is not None and row[0] in (DONE, FAILED):
+            conn.execute("DELETE FROM image_jobs WHERE id = ?", (job_id,))
+    return row
+
+
+def cancel(job_id):
+    with shared_state.transaction() as conn:
+        conn.execute("DELETE FROM image_jobs WHERE id = ? AND state = ?", (job_id, PENDING))
+
+
+def wait(job_id, timeout=None):
+    """Image PIL rendue pour ``job_id``, ``None`` si elle n'arrive pas à temps"""
+    deadline = time.monotonic() + (timeout if timeout is not None else settings.AI_CALL_TIMEOUT)
+    while True:
+        row = _take_result(job_id)
+        if row is None:
+            raise LocalDiffusionError("Demande d'image perdue par le worker local")
+        state, result, error = row
+        if state == DONE:
+            return Image.open(BytesIO(result))
+        if state == FAILED:
+            raise LocalDiffusionError(error or "Échec du worker local")
+        if time.monotonic() >= deadline:
+            cancel(job_id)
+            return None
+        time.sleep(_options()["poll_interval"])
+
+
+# --------------------
+# Côté worker : modèle résident et traitement par lots
+# --------------------
+class ResidentPipeline:
+    """Pipeline diffusers chargé une fois pour toute la vie du processus"""
+
+    def __init__(self, model, threads=None):
+        import torch
+        from diffusers import AutoPipelineForText2Image
+
+        if threads:
+            torch.set_num_threads(threads)
+        self.model = model
+        self.pipeline = AutoPipelineForText2Image.from_pretrained(model, torch_dtype=torch.float32).to("cpu")
+        self.pipeline.set_progress_bar_config(disable=True)
+
+    def render(self, prompts, mode):
+        """Rend tous les prompts d'un même mode en une seule passe"""
+        options = mode_options(mode)
+        width, height = options["size"]
+        return self.pipeline(
+            prompt=list(prompts),
+            num_inference_steps=options["steps"],
+            guidance_scale=options.get("guidance_scale", 0.0),
+            width=width,
+            height=height,
+        ).images
+
+
+def heartbeat(name, model):
+    with shared_state.transaction() as conn:
+        conn.execute(
+            "INSERT OR REPLACE INTO image_workers (name, model, heartbeat_at) VALUES (?, ?, ?)",
+            (name, model, time.time()),
+        )
+
+
+def retire(name):
+    with shared_state.transaction() as conn:
+        conn.execute("DELETE FROM image_workers WHERE name = ?", (name,))
+
+
+def claim_batch():
+    """Réserve un lot de demandes du même mode ; ``(None, [])`` s'il faut encore attendre"""
+    options = _options()
+    now = time.time()
+    with shared_state.transaction() as conn:
+        # Demandes abandonnées ou résultats jamais relevés
+        conn.execute("DELETE FROM image_jobs WHERE expires_at < ?", (now - 60,))
+        row = conn.execute(
+            "SELECT mode, MIN(created_at), COUNT(*) FROM image_jobs WHERE state = ? AND expires_at >= ?"
+            " GROUP BY mode ORDER BY MIN(created_at) LIMIT 1",
+            (PENDING, now),
+        ).fetchone()
+        if row is None:
+            return None, []
+        mode, oldest, waiting = row
+        # On laisse quelques instants aux demandes voisines pour remplir le lot
+        if waiting < options["max_batch"] and now - oldest < options["batch_window"]:
+            return None, []
+        jobs = conn.execute(
+            "SELECT id, prompt FROM image_jobs WHERE state = ? AND mode = ? AND expires_at >= ?"
+            " ORDER BY created_at LIMIT ?",
+            (PENDING, mode, now, options["max_batch"]),
+        ).fetchall()
+        conn.executemany("UPDATE image_jobs SET state = ? WHERE id = ?", [(RUNNING, job_id) for job_id, _ in jobs])
+    return mode, jobs
+
+
+def _encode(image):
+    buffer = BytesIO()
+    image.save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def process_batch(pipeline, mode, jobs):
+    try:
+        images = pipeline.render([prompt for _, prompt in jobs], mode)
+    except Exception as e:
+        with shared_state.transaction() as conn:
+            conn.executemany(
+                "UPDATE image_jobs SET state = ?, error = ? WHERE id = ?",
+                [(FAILED, str(e), job_id) for job_id, _ in jobs],
+            )
+        raise
+    results = [(DONE, _encode(image), job_id) for (job_id, _), image in zip(jobs, images)]
+    with shared_state.transaction() as conn:
+        conn.executemany("UPDATE image_jobs SET state = ?, result = ? WHERE id = ?", results)
+
+
+def serve(pipeline, name):
+    """Boucle du worker : traite les lots jusqu'à interruption"""
+    options = _options()
+    last_heartbeat = 0.0
+    try:
+        while True:
+            if time.monotonic() - last_heartbeat >= options["heartbeat_timeout"] / 3:
+                heartbeat(name, pipeline.model)
+                last_heartbeat = time.monotonic()
+            mode, jobs = claim_batch()
+            if not jobs:
+                time.sleep(options["poll_interval"])
+                continue
+            started = time.perf_counter()
+            try:
+                process_batch(pipeline, mode, jobs)
+            except Exception as e:
+                print(f"❌ Worker d'images : échec du lot {mode} ({len(jobs)} image(s)) : {e}")
+                continue
+            print(f"✅ Lot {mode} de {len(jobs)} image(s) rendu en {time.perf_counter() - started:.1f}s")
+    finally:
+        retire(name)
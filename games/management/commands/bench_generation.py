@@ -0,0 +1,64 @@
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from games.ai_service import AIGameGenerator
+from games.models import ConceptArtCache, Game
+from games.providers import get_llm_provider, get_image_provider
+
+
+class Command(BaseCommand):
+    help = "Mesure le débit du pipeline de génération (idéalement avec les fournisseurs 'fake')"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--games', type=int, default=20, help="Nombre de jeux à générer")
+        parser.add_argument('--concurrency', type=int, default=1,
+                            help="Générations simultanées (au-delà de 1 : GAMEFORGE_SQLITE_PROFILE=production, "
+                                 "sinon SQLite renvoie « database is locked »)")
+        parser.add_argument('--fake', action='store_true', help="Force les fournisseurs simulés")
+        parser.add_argument('--skip-images', action='store_true', help="Ne génère pas le concept art")
+        parser.add_argument('--keep', action='store_true', help="Conserve les jeux créés")
+
+    def handle(self, *args, **options):
+        provider_name = 'fake' if options['fake'] else None
+        llm = get_llm_provider(provider_name)
+        image_provider = get_image_provider(provider_name)
+        user, _ = User.objects.get_or_create(username='bench_generation')
+        presets = [(genre, ambiance) for genre, _ in Game.GENRE_CHOICES for ambiance, _ in Game.AMBIANCE_CHOICES]
+
+        def run(index):
+            close_old_connections()
+            genre, ambiance = presets[index % len(presets)]
+            generator = AIGameGenerator(llm=llm, image_provider=image_provider)
+            started = time.perf_counter()
+            game_data = generator.generate_game(genre, ambiance, keywords=f"benchmark, run {index}")
+            game = Game.objects.create(creator=user, **game_data)
+            generator.create_characters_for_game(game)
+            generator.create_locations_for_game(game)
+            if not options['skip_images']:
+                generator.create_concept_art_for_game(game)
+            close_old_connections()
+            return game.pk, time.perf_counter() - started
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options['concurrency']) as executor:
+            results = list(executor.map(run, range(options['games'])))
+        elapsed = time.perf_counter() - started
+
+        durations = sorted(duration for _, duration in results)
+        p95 = durations[max(0, int(len(durations) * 0.95) - 1)]
+        self.stdout.write(f"Fournisseurs : {getattr(llm, 'name', 'templates')} / {image_provider.name}")
+        self.stdout.write(f"{len(results)} jeux en {elapsed:.2f}s ({len(results) / elapsed:.2f} jeux/s)")
+        self.stdout.write(f"Latence médiane {statistics.median(durations):.2f}s, p95 {p95:.2f}s")
+
+        if not options['keep']:
+            for game in Game.objects.filter(pk__in=[pk for pk, _ in results]):
+                for art in (game.concept_art_character, game.concept_art_environment):
+                    # Les fichiers du cache d'images restent partagés avec d'autres jeux
+                    if art and not ConceptArtCache.objects.filter(image=art.name).exists():
+                        art.delete(save=False)
+                game.delete()
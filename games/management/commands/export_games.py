@@ -0,0 +1,55 @@
+import sys
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from games import export
+
+
+class Command(BaseCommand):
+    help = "Exporte jeux, personnages et lieux en JSONL ou Parquet, sans charger tout le catalogue en mémoire"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--format', choices=export.FORMATS, default='jsonl')
+        parser.add_argument('--output', help="Fichier de sortie (défaut : sortie standard, JSONL uniquement)")
+        parser.add_argument('--public-only', action='store_true', help="Seulement les jeux publics")
+        parser.add_argument('--created-after', help="Date (AAAA-MM-JJ) ou date-heure ISO incluse")
+        parser.add_argument('--created-before', help="Date (AAAA-MM-JJ) ou date-heure ISO exclue")
+        parser.add_argument('--creator', help="Nom d'utilisateur du créateur")
+        parser.add_argument('--updated-after', help="Seulement les jeux modifiés après ce filigrane")
+        parser.add_argument('--watermark-file',
+                            help="Export incrémental : lit le filigrane précédent et y écrit le nouveau")
+
+    def handle(self, *args, **options):
+        if options['format'] == 'parquet' and not options['output']:
+            raise CommandError("--output est obligatoire pour le format parquet")
+
+        watermark_file = Path(options['watermark_file']) if options['watermark_file'] else None
+        updated_after = options['updated_after']
+        if updated_after is None and watermark_file is not None and watermark_file.exists():
+            updated_after = watermark_file.read_text().strip() or None
+
+        try:
+            queryset, watermark = export.select_games(
+                public_only=options['public_only'],
+                created_after=options['created_after'],
+                created_before=options['created_before'],
+                creator=options['creator'],
+                updated_after=updated_after,
+            )
+            chunks = export.stream(queryset, options['format'])
+            if options['output']:
+                with open(options['output'], 'wb') as output:
+                    for chunk in chunks:
+                        output.write(chunk)
+            else:
+                for chunk in chunks:
+                    sys.stdout.buffer.write(chunk)
+                sys.stdout.buffer.flush()
+        except export.ExportError as e:
+            raise CommandError(str(e))
+
+        if watermark_file is not None and watermark is not None:
+            watermark_file.write_text(watermark.isoformat())
+        # Sur stderr : la sortie standard peut contenir l'export lui-même
+        self.stderr.write(f"Export terminé, filigrane : {watermark.isoformat() if watermark else 'aucun jeu'}")
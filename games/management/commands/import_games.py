@@ -0,0 +1,53 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from games import importer
+
+
+def _creator_map(pairs):
+    mapping = {}
+    for pair in pairs:
+        source, sep, target = pair.partition('=')
+        if not sep or not source or not target:
+            raise CommandError(f"--creator-map attend ancien=nouveau (reçu : {pair})")
+        mapping[source] = target
+    return mapping
+
+
+class Command(BaseCommand):
+    help = "Importe des jeux depuis un fichier JSONL (format d'export_games), par lots validés"
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="Fichier JSONL produit par export_games")
+        parser.add_argument('--chunk-size', type=int, default=1000, help="Jeux écrits par transaction")
+        parser.add_argument('--dry-run', action='store_true', help="Valide le fichier sans rien écrire")
+        parser.add_argument('--default-creator', help="Utilisateur attribué quand le créateur est inconnu")
+        parser.add_argument('--creator-map', action='append', default=[], metavar='ANCIEN=NOUVEAU',
+                            help="Renomme un créateur du fichier (répétable)")
+
+    def handle(self, *args, **options):
+        if options['chunk_size'] < 1:
+            raise CommandError("--chunk-size doit être positif")
+        try:
+            creators = importer.CreatorMap(_creator_map(options['creator_map']), options['default_creator'])
+        except importer.RecordError as e:
+            raise CommandError(str(e))
+
+        def on_error(line_number, message):
+            self.stderr.write(f"ligne {line_number} : {message}")
+
+        try:
+            with open(options['path'], encoding='utf-8') as lines:
+                report = importer.import_lines(
+                    lines, creators, chunk_size=options['chunk_size'], dry_run=options['dry_run'], on_error=on_error,
+                )
+        except OSError as e:
+            raise CommandError(str(e))
+
+        if options['dry_run']:
+            self.stdout.write(f"🔎 {report.read} lignes lues, {report.read - len(report.errors)} valides, "
+                              f"{len(report.errors)} rejetées (aucune écriture)")
+        else:
+            self.stdout.write(self.style.SUCCESS(
+                f"📥 {report.imported} jeux importés ({report.characters} personnages, {report.locations} lieux), "
+                f"{len(report.errors)} lignes rejetées"
+            ))
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from games import trending
+
+
+class Command(BaseCommand):
+    help = "Ajoute les vues et favoris tamponnés aux scores de tendance des jeux"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seed', action='store_true',
+                            help="Recalcule d'abord tous les scores à partir des vues et favoris existants")
+
+    def handle(self, *args, **options):
+        if options['seed']:
+            seeded = trending.seed()
+            self.stdout.write(f"{seeded} score(s) initialisé(s).")
+        processed = trending.process()
+        self.stdout.write(self.style.SUCCESS(f"{processed} événement(s) de tendance traité(s)."))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from games import ratelimit
+
+
+class Command(BaseCommand):
+    help = "Supprime les seaux de limitation inutilisés (un par client de l'API publique)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--prefix', default='api:', help="Préfixe des seaux à nettoyer ('' : tous)")
+
+    def handle(self, *args, **options):
+        pruned = ratelimit.prune_idle_buckets(options['prefix'])
+        self.stdout.write(self.style.SUCCESS(f"{pruned} seau(x) inutilisé(s) supprimé(s)."))
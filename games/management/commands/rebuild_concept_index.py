@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from games import near_duplicates
+from games.models import ConceptBand, ConceptSignature, Game
+
+
+class Command(BaseCommand):
+    help = "Reconstruit l'index des concepts quasi identiques (après un changement de GAME_NEAR_DUPLICATES)"
+
+    def handle(self, *args, **options):
+        ConceptBand.objects.all().delete()
+        ConceptSignature.objects.all().delete()
+        indexed = 0
+        for game in Game.objects.only(*near_duplicates.INDEXED_FIELDS).iterator(chunk_size=500):
+            near_duplicates.index_game(game)
+            indexed += 1
+        self.stdout.write(self.style.SUCCESS(f"{indexed} jeu(x) indexé(s)."))
@@ -0,0 +1,51 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db.models import Count
+from django.utils import timezone
+
+from games.ai_service import AIGameGenerator
+from games.deadline import Deadline
+from games.models import Game, PooledConcept
+
+
+class Command(BaseCommand):
+    help = "Remplit la réserve de concepts aléatoires jusqu'à la profondeur cible par genre/ambiance"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--depth', type=int, default=settings.GAME_POOL_TARGET_DEPTH,
+                            help="Concepts disponibles visés par couple genre/ambiance")
+        parser.add_argument('--limit', type=int, default=None, help="Nombre maximal de concepts générés")
+        parser.add_argument('--force', action='store_true', help="Ignore la plage horaire creuse")
+
+    def handle(self, *args, **options):
+        start_hour, end_hour = settings.GAME_POOL_QUIET_HOURS
+        hour = timezone.localtime().hour
+        if not options['force'] and not start_hour <= hour < end_hour:
+            self.stdout.write(f"Hors des heures creuses ({start_hour}h-{end_hour}h), rien à faire.")
+            return
+
+        purged = PooledConcept.purge_claimed(settings.GAME_POOL_CLAIMED_RETENTION_DAYS)
+        if purged:
+            self.stdout.write(f"{purged} concept(s) réservé(s) purgé(s).")
+
+        available = {
+            (row['genre'], row['ambiance']): row['total']
+            for row in PooledConcept.available().values('genre', 'ambiance').annotate(total=Count('pk'))
+        }
+        deficits = [
+            (genre, ambiance, options['depth'] - available.get((genre, ambiance), 0))
+            for genre, _ in Game.GENRE_CHOICES
+            for ambiance, _ in Game.AMBIANCE_CHOICES
+        ]
+
+        created = 0
+        for genre, ambiance, missing in deficits:
+            for _ in range(max(missing, 0)):
+                if options['limit'] is not None and created >= options['limit']:
+                    break
+                generator = AIGameGenerator(deadline=Deadline.for_profile('batch'))
+                concept = generator.generate_random_game(genre, ambiance)
+                PooledConcept.objects.create(genre=genre, ambiance=ambiance, concept=concept)
+                created += 1
+
+        self.stdout.write(self.style.SUCCESS(f"{created} concept(s) ajouté(s) à la réserve."))
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from games import recommendations
+
+
+class Command(BaseCommand):
+    help = "Recalcule les recommandations « jeux similaires » des jeux dont les favoris ont changé"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--full', action='store_true', help="Recalcule les recommandations de tous les jeux")
+
+    def handle(self, *args, **options):
+        try:
+            updated = recommendations.refresh(full=options['full'])
+        except ImportError as e:
+            raise CommandError(f"numpy et scipy sont nécessaires pour les recommandations : {e}")
+        self.stdout.write(self.style.SUCCESS(f"Recommandations de {updated} jeu(x) mises à jour."))
@@ -0,0 +1,29 @@
+import os
+import socket
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from games import local_diffusion
+
+
+class Command(BaseCommand):
+    help = "Charge le modèle d'images local une fois et rend les demandes des workers web par lots"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--model', default=settings.AI_LOCAL_DIFFUSION['model'], help="Modèle diffusers à charger")
+        parser.add_argument('--threads', type=int, default=settings.AI_LOCAL_DIFFUSION['threads'],
+                            help="Threads CPU utilisés par torch")
+
+    def handle(self, *args, **options):
+        try:
+            pipeline = local_diffusion.ResidentPipeline(options['model'], threads=options['threads'])
+        except ImportError as e:
+            raise CommandError(f"diffusers et torch sont nécessaires pour le worker local : {e}")
+
+        name = f"{socket.gethostname()}:{os.getpid()}"
+        self.stdout.write(self.style.SUCCESS(f"Modèle {options['model']} chargé, worker {name} prêt."))
+        try:
+            local_diffusion.serve(pipeline, name)
+        except KeyboardInterrupt:
+            self.stdout.write("Worker d'images arrêté.")
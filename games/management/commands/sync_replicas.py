@@ -0,0 +1,47 @@
+import sqlite3
+import time
+from contextlib import closing
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from games.db_router import PRIMARY
+
+
+def _copy(target):
+    """Copie cohérente de la base principale dans le réplica, en place (les lecteurs ouverts la voient)
+
+    La source est la connexion Django ``default`` (mêmes options, base de test comprise).
+    Les lecteurs du réplica attendent la fin de la copie (``OPTIONS['timeout']`` des alias
+    de réplica) ; la copie elle-même patiente tant qu'une lecture y est en cours.
+    """
+    primary = connections[PRIMARY]
+    primary.ensure_connection()
+    with closing(sqlite3.connect(str(target), timeout=settings.DATABASE_REPLICA_TIMEOUT)) as replica:
+        primary.connection.backup(replica)
+
+
+class Command(BaseCommand):
+    help = "Recopie la base principale SQLite dans ses réplicas en lecture (DB_REPLICAS)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--interval', type=float, default=0,
+                            help="Recopie en boucle toutes les N secondes (0 : une seule fois)")
+
+    def handle(self, *args, **options):
+        if not settings.DATABASE_REPLICAS:
+            raise CommandError("Aucun réplica configuré (DB_REPLICAS)")
+        try:
+            while True:
+                started = time.perf_counter()
+                for alias, path in settings.DATABASE_REPLICAS.items():
+                    path.parent.mkdir(parents=True, exist_ok=True)
+                    _copy(path)
+                self.stdout.write(f"🔁 {len(settings.DATABASE_REPLICAS)} réplica(s) synchronisé(s) "
+                                  f"en {time.perf_counter() - started:.2f}s")
+                if not options['interval']:
+                    return
+                time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            self.stdout.write("Synchronisation arrêtée.")
@@ -0,0 +1,45 @@
+# Generated by Django 4.2.30 on 2026-10-19 08:58
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('games', '0003_alter_gamerating_unique_together_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='game',
+            name='concept_art_character_prompt',
+            field=models.TextField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='game',
+            name='concept_art_environment_prompt',
+            field=models.TextField(blank=True, null=True),
+        ),
+        migrations.CreateModel(
+            name='PooledConcept',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('genre', models.CharField(choices=[('RPG', 'RPG'), ('FPS', 'FPS'), ('METROIDVANIA', 'Metroidvania'), ('VISUAL_NOVEL', 'Visual Novel'), ('PLATFORMER', 'Platformer'), ('STRATEGY', 'Strategy'), ('PUZZLE', 'Puzzle'), ('ADVENTURE', 'Adventure'), ('SIMULATION', 'Simulation'), ('RACING', 'Racing')], max_length=20)),
+                ('ambiance', models.CharField(choices=[('POST_APOCALYPTIC', 'Post-apocalyptique'), ('DREAMLIKE', 'Onirique'), ('CYBERPUNK', 'Cyberpunk'), ('DARK_FANTASY', 'Dark Fantasy'), ('MEDIEVAL', 'Médiéval'), ('SCI_FI', 'Science-Fiction'), ('HORROR', 'Horreur'), ('STEAMPUNK', 'Steampunk'), ('MODERN', 'Moderne'), ('FANTASY', 'Fantasy')], max_length=20)),
+                ('concept', models.JSONField()),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('claimed_at', models.DateTimeField(blank=True, null=True)),
+                ('claim_token', models.UUIDField(blank=True, null=True, unique=True)),
+                ('claimed_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Concept en réserve',
+                'verbose_name_plural': 'Concepts en réserve',
+                'indexes': [models.Index(fields=['claimed_at', 'genre', 'ambiance', 'created_at'], name='games_poole_claimed_2c520e_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 4.2.30 on 2026-10-19 09:02
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('games', '0004_game_art_prompts_pooledconcept'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ConceptArtCache',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model_name', models.CharField(blank=True, max_length=200)),
+                ('prompt_hash', models.CharField(max_length=64)),
+                ('size', models.CharField(blank=True, max_length=20)),
+                ('prompt', models.TextField()),
+                ('image', models.ImageField(upload_to='concept_art/cache/')),
+                ('hits', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('last_used_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'verbose_name': 'Image en cache',
+                'verbose_name_plural': 'Images en cache',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='conceptartcache',
+            constraint=models.UniqueConstraint(fields=('model_name', 'prompt_hash', 'size'), name='unique_concept_art_cache_key'),
+        ),
+    ]
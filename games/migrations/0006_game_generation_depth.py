@@ -0,0 +1,42 @@
+# Generated by Django 4.2.30 on 2026-10-19 09:09
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+# Un jeu complet coûte désormais 3 crédits : les limites existantes sont triplées
+def scale_limits(apps, schema_editor):
+    UserProfile = apps.get_model('games', 'UserProfile')
+    UserProfile.objects.update(
+        daily_api_limit=F('daily_api_limit') * 3,
+        api_usage_count=F('api_usage_count') * 3,
+    )
+
+
+def unscale_limits(apps, schema_editor):
+    UserProfile = apps.get_model('games', 'UserProfile')
+    UserProfile.objects.update(
+        daily_api_limit=F('daily_api_limit') / 3,
+        api_usage_count=F('api_usage_count') / 3,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('games', '0005_conceptartcache'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='game',
+            name='generation_depth',
+            field=models.CharField(choices=[('quick', 'Rapide (concept seul)'), ('standard', 'Standard (concept, personnages et lieux)'), ('full', 'Complet (avec concept art)')], default='full', max_length=10, verbose_name='Profondeur de génération'),
+        ),
+        migrations.AlterField(
+            model_name='userprofile',
+            name='daily_api_limit',
+            field=models.PositiveIntegerField(default=30, verbose_name='Limite API quotidienne'),
+        ),
+        migrations.RunPython(scale_limits, unscale_limits),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 4.2.30 on 2026-10-19 09:12
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('games', '0006_game_generation_depth'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='game',
+            name='characters_source',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='games.game'),
+        ),
+        migrations.AddField(
+            model_name='game',
+            name='locations_source',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='games.game'),
+        ),
+        migrations.AddField(
+            model_name='game',
+            name='remixed_from',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='remixes', to='games.game', verbose_name='Remix de'),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 4.2.30 on 2026-10-19 09:15
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('games', '0007_game_remix'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ConceptSignature',
+            fields=[
+                ('game', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='concept_signature', serialize=False, to='games.game')),
+                ('concept', models.BinaryField()),
+                ('full', models.BinaryField()),
+            ],
+            options={
+                'verbose_name': 'Signature de concept',
+                'verbose_name_plural': 'Signatures de concept',
+            },
+        ),
+        migrations.CreateModel(
+            name='ConceptBand',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(db_index=True, max_length=24)),
+                ('game', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='concept_bands', to='games.game')),
+            ],
+            options={
+                'verbose_name': 'Seau de concept',
+                'verbose_name_plural': 'Seaux de concept',
+            },
+        ),
+    ]
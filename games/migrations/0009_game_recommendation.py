@@ -0,0 +1,34 @@
+# Generated by Django 4.2.30 on 2026-10-19 09:18
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('games', '0008_concept_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GameRecommendation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('rank', models.PositiveSmallIntegerField()),
+                ('score', models.FloatField()),
+                ('game', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='recommendations', to='games.game')),
+                ('recommended', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='games.game')),
+            ],
+            options={
+                'verbose_name': 'Recommandation',
+                'verbose_name_plural': 'Recommandations',
+                'ordering': ['game', 'rank'],
+                'indexes': [models.Index(fields=['game', 'rank'], name='games_gamer_game_id_1336db_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='gamerecommendation',
+            constraint=models.UniqueConstraint(fields=('game', 'recommended'), name='unique_game_recommendation'),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 4.2.30 on 2026-10-19 09:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('games', '0009_game_recommendation'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='game',
+            name='trending_score',
+            field=models.FloatField(default=0.0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='game',
+            index=models.Index(fields=['is_public', '-trending_score'], name='game_trending_idx'),
+        ),
+    ]
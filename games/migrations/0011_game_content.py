@@ -0,0 +1,85 @@
+# Generated by Django 4.2.30 on 2026-10-19 09:32
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+CONTENT_FIELDS = [
+    'cultural_references', 'universe_description', 'main_story', 'gameplay_mechanics',
+    'concept_art_character_prompt', 'concept_art_environment_prompt',
+]
+
+
+# Les textes longs passent dans games_gamecontent, une ligne par jeu, par lots
+def move_content(apps, schema_editor):
+    Game = apps.get_model('games', 'Game')
+    GameContent = apps.get_model('games', 'GameContent')
+    batch = []
+    for pk, *values in Game.objects.values_list('pk', *CONTENT_FIELDS).iterator(chunk_size=1000):
+        batch.append(GameContent(game_id=pk, **dict(zip(CONTENT_FIELDS, values))))
+        if len(batch) >= 1000:
+            GameContent.objects.bulk_create(batch)
+            batch = []
+    GameContent.objects.bulk_create(batch)
+
+
+def restore_content(apps, schema_editor):
+    Game = apps.get_model('games', 'Game')
+    GameContent = apps.get_model('games', 'GameContent')
+    games = []
+    for content in GameContent.objects.iterator(chunk_size=1000):
+        games.append(Game(pk=content.game_id, **{name: getattr(content, name) for name in CONTENT_FIELDS}))
+        if len(games) >= 1000:
+            Game.objects.bulk_update(games, CONTENT_FIELDS)
+            games = []
+    Game.objects.bulk_update(games, CONTENT_FIELDS)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('games', '0010_game_trending_score'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GameContent',
+            fields=[
+                ('game', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='content', serialize=False, to='games.game')),
+                ('cultural_references', models.TextField(blank=True, help_text='Références culturelles (optionnel)')),
+                ('universe_description', models.TextField(blank=True, verbose_name="Description de l'univers")),
+                ('main_story', models.TextField(blank=True, verbose_name='Histoire principale')),
+                ('gameplay_mechanics', models.TextField(blank=True, verbose_name='Mécaniques de jeu')),
+                ('concept_art_character_prompt', models.TextField(blank=True, null=True)),
+                ('concept_art_environment_prompt', models.TextField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name': 'Contenu du jeu',
+                'verbose_name_plural': 'Contenus des jeux',
+            },
+        ),
+        migrations.RunPython(move_content, restore_content),
+        migrations.RemoveField(
+            model_name='game',
+            name='concept_art_character_prompt',
+        ),
+        migrations.RemoveField(
+            model_name='game',
+            name='concept_art_environment_prompt',
+        ),
+        migrations.RemoveField(
+            model_name='game',
+            name='cultural_references',
+        ),
+        migrations.RemoveField(
+            model_name='game',
+            name='gameplay_mechanics',
+        ),
+        migrations.RemoveField(
+            model_name='game',
+            name='main_story',
+        ),
+        migrations.RemoveField(
+            model_name='game',
+            name='universe_description',
+        ),
+    ]
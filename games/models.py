@@ -1,9 +1,24 @@
-from django.db import models
+import hashlib
+import uuid
+from datetime import timedelta
+
+from django.db import IntegrityError, models, transaction
+from django.db.models import F, Subquery
 from django.contrib.auth.models import User
 from django.urls import reverse
 from django.utils import timezone
 
 
+class GameQuerySet(models.QuerySet):
+    def create(self, **fields):
+        """Crée le jeu et sa ligne de contenu (champs de ``GameContent.FIELDS`` acceptés ici)"""
+        game_fields, content_fields = GameContent.split(fields)
+        with transaction.atomic(using=self.db):
+            game = super().create(**game_fields)
+            GameContent.objects.using(self.db).create(game=game, **content_fields)
+        return game
+
+
 class Game(models.Model):
     GENRE_CHOICES = [
         ('RPG', 'RPG'),
@@ -30,6 +45,12 @@ class Game(models.Model):
         ('MODERN', 'Moderne'),
         ('FANTASY', 'Fantasy'),
     ]
+
+    DEPTH_CHOICES = [
+        ('quick', 'Rapide (concept seul)'),
+        ('standard', 'Standard (concept, personnages et lieux)'),
+        ('full', 'Complet (avec concept art)'),
+    ]
     
     # Informations de base
     title = models.CharField(max_length=200, verbose_name="Titre du jeu")
@@ -42,12 +63,10 @@ class Game(models.Model):
     genre = models.CharField(max_length=20, choices=GENRE_CHOICES)
     ambiance = models.CharField(max_length=20, choices=AMBIANCE_CHOICES)
     keywords = models.TextField(help_text="Mots-clés séparés par des virgules")
-    cultural_references = models.TextField(blank=True, help_text="Références culturelles (optionnel)")
-    
-    # Contenu généré par IA
-    universe_description = models.TextField(blank=True, verbose_name="Description de l'univers")
-    main_story = models.TextField(blank=True, verbose_name="Histoire principale")
-    gameplay_mechanics = models.TextField(blank=True, verbose_name="Mécaniques de jeu")
+    generation_depth = models.CharField(max_length=10, choices=DEPTH_CHOICES, default='full',
+                                        verbose_name="Profondeur de génération")
+
+    # Contenu généré par IA : dans GameContent, lu seulement par les pages qui l'affichent
     
     # Images générées
     concept_art_character = models.ImageField(upload_to='concept_art/characters/', blank=True, null=True)
@@ -58,15 +77,29 @@ class Game(models.Model):
     
     # Statistiques
     views_count = models.PositiveIntegerField(default=0)
+    # Tendance : log Σ poids·e^(λ·t) des vues et favoris, tenu à jour par process_trending_events
+    trending_score = models.FloatField(default=0.0, editable=False)
+
+    # Remix : personnages et lieux restent ceux du jeu source tant qu'ils ne sont pas
+    # modifiés (copie à la première écriture) ; les images partagent les mêmes fichiers
+    remixed_from = models.ForeignKey('self', on_delete=models.SET_NULL, null=True, blank=True,
+                                     related_name='remixes', verbose_name="Remix de")
+    characters_source = models.ForeignKey('self', on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    locations_source = models.ForeignKey('self', on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
     
-    # Prompts pour la génération d'images
-    concept_art_character_prompt = models.TextField(blank=True, null=True)
-    concept_art_environment_prompt = models.TextField(blank=True, null=True)
-    
+    # Champs recopiés tels quels dans un remix (avec tout le contenu)
+    REMIX_FIELDS = [
+        'description', 'genre', 'ambiance', 'keywords', 'generation_depth',
+        'concept_art_character', 'concept_art_environment',
+    ]
+
+    objects = GameQuerySet.as_manager()
+
     class Meta:
         ordering = ['-created_at']
         verbose_name = "Jeu"
         verbose_name_plural = "Jeux"
+        indexes = [models.Index(fields=['is_public', '-trending_score'], name='game_trending_idx')]
     
     def __str__(self):
         return self.title
@@ -77,6 +110,89 @@ class Game(models.Model):
     def get_keywords_list(self):
         return [keyword.strip() for keyword in self.keywords.split(',') if keyword.strip()]
 
+    def get_content(self):
+        """Textes longs du jeu (contenu vide, non enregistré, si la ligne manque)"""
+        try:
+            return self.content
+        except GameContent.DoesNotExist:
+            return GameContent(game=self)
+
+    def get_characters(self):
+        """Personnages affichés (ceux du jeu source pour un remix non modifié)"""
+        return Character.objects.filter(game_id=self.characters_source_id or self.pk)
+
+    def get_locations(self):
+        return Location.objects.filter(game_id=self.locations_source_id or self.pk)
+
+    def remix(self, user):
+        """Crée une variante possédée par ``user``, sans copier ni personnages, ni lieux, ni images"""
+        content = self.get_content()
+        return Game.objects.create(
+            creator=user,
+            title=f"{self.title} (remix)"[:200],
+            remixed_from=self,
+            # Toujours pointer vers le propriétaire réel des lignes (pas de chaîne de remix)
+            characters_source_id=self.characters_source_id or self.pk,
+            locations_source_id=self.locations_source_id or self.pk,
+            **{field: getattr(self, field) for field in self.REMIX_FIELDS},
+            **{field: getattr(content, field) for field in GameContent.FIELDS}
+        )
+
+    def materialize_remixes(self, section):
+        """Donne leur propre copie de la section aux remix qui la partagent encore (avant de la réécrire)"""
+        for remix in Game.objects.filter(**{f'{section}_source': self}):
+            remix.materialize(section)
+
+    def materialize(self, section):
+        """Copie dans ce jeu les lignes partagées d'une section ('characters' ou 'locations')"""
+        source_field = f'{section}_source'
+        source_id = getattr(self, f'{source_field}_id')
+        if source_id is None:
+            return
+        model = Character if section == 'characters' else Location
+        with transaction.atomic():
+            rows = list(model.objects.filter(game_id=source_id))
+            for row in rows:
+                row.pk = None
+                row.game_id = self.pk
+            model.objects.bulk_create(rows)
+            Game.objects.filter(pk=self.pk).update(**{source_field: None})
+        setattr(self, source_field, None)
+
+
+class GameContent(models.Model):
+    """Textes longs d'un jeu : hors de la table des jeux pour que les listes restent légères"""
+    FIELDS = [
+        'cultural_references', 'universe_description', 'main_story', 'gameplay_mechanics',
+        'concept_art_character_prompt', 'concept_art_environment_prompt',
+    ]
+
+    game = models.OneToOneField(Game, on_delete=models.CASCADE, primary_key=True, related_name='content')
+    cultural_references = models.TextField(blank=True, help_text="Références culturelles (optionnel)")
+
+    # Contenu généré par IA
+    universe_description = models.TextField(blank=True, verbose_name="Description de l'univers")
+    main_story = models.TextField(blank=True, verbose_name="Histoire principale")
+    gameplay_mechanics = models.TextField(blank=True, verbose_name="Mécaniques de jeu")
+
+    # Prompts pour la génération d'images
+    concept_art_character_prompt = models.TextField(blank=True, null=True)
+    concept_art_environment_prompt = models.TextField(blank=True, null=True)
+
+    class Meta:
+        verbose_name = "Contenu du jeu"
+        verbose_name_plural = "Contenus des jeux"
+
+    def __str__(self):
+        return f"Contenu de {self.game_id}"
+
+    @classmethod
+    def split(cls, fields):
+        """Sépare des champs de jeu en (champs de ``Game``, champs de ``GameContent``)"""
+        game_fields = {name: value for name, value in fields.items() if name not in cls.FIELDS}
+        content_fields = {name: value for name, value in fields.items() if name in cls.FIELDS}
+        return game_fields, content_fields
+
 
 class Character(models.Model):
     ROLE_CHOICES = [
@@ -133,12 +249,169 @@ class Favorite(models.Model):
         return f"{self.user.username} - {self.game.title}"
 
 
+class PooledConcept(models.Model):
+    """Concept de jeu pré-généré, réservé aux demandes « aléatoires »"""
+    genre = models.CharField(max_length=20, choices=Game.GENRE_CHOICES)
+    ambiance = models.CharField(max_length=20, choices=Game.AMBIANCE_CHOICES)
+    # {"game": {...}, "characters": [...], "locations": [...]}
+    concept = models.JSONField()
+    created_at = models.DateTimeField(default=timezone.now)
+    claimed_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    claimed_at = models.DateTimeField(null=True, blank=True)
+    claim_token = models.UUIDField(null=True, blank=True, unique=True)
+
+    class Meta:
+        verbose_name = "Concept en réserve"
+        verbose_name_plural = "Concepts en réserve"
+        indexes = [models.Index(fields=['claimed_at', 'genre', 'ambiance', 'created_at'])]
+
+    def __str__(self):
+        return f"{self.concept.get('game', {}).get('title', '?')} ({self.genre} / {self.ambiance})"
+
+    @classmethod
+    def available(cls, genre=None, ambiance=None):
+        queryset = cls.objects.filter(claimed_at__isnull=True)
+        if genre:
+            queryset = queryset.filter(genre=genre)
+        if ambiance:
+            queryset = queryset.filter(ambiance=ambiance)
+        return queryset
+
+    @classmethod
+    def claim(cls, user, genre=None, ambiance=None):
+        """Réserve le plus ancien concept disponible en un seul UPDATE atomique"""
+        oldest = cls.available(genre, ambiance).order_by('created_at').values('pk')[:1]
+        for _ in range(3):
+            token = uuid.uuid4()
+            claimed = cls.objects.filter(pk=Subquery(oldest), claimed_at__isnull=True).update(
+                claimed_by=user, claimed_at=timezone.now(), claim_token=token
+            )
+            if claimed:
+                return cls.objects.get(claim_token=token)
+            if not cls.available(genre, ambiance).exists():
+                return None
+        return None
+
+    @classmethod
+    def purge_claimed(cls, days):
+        """Supprime les concepts réservés depuis plus de ``days`` jours, déjà transformés en jeux"""
+        deleted, _ = cls.objects.filter(claimed_at__lt=timezone.now() - timedelta(days=days)).delete()
+        return deleted
+
+
+class ConceptArtCache(models.Model):
+    """Image de concept art déjà générée, réutilisable pour un même prompt"""
+    model_name = models.CharField(max_length=200, blank=True)
+    prompt_hash = models.CharField(max_length=64)
+    size = models.CharField(max_length=20, blank=True)
+    prompt = models.TextField()
+    image = models.ImageField(upload_to='concept_art/cache/')
+    hits = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(default=timezone.now)
+    last_used_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        verbose_name = "Image en cache"
+        verbose_name_plural = "Images en cache"
+        constraints = [
+            models.UniqueConstraint(fields=['model_name', 'prompt_hash', 'size'], name='unique_concept_art_cache_key'),
+        ]
+
+    def __str__(self):
+        return self.prompt[:80]
+
+    @staticmethod
+    def hash_prompt(prompt):
+        return hashlib.sha256(prompt.strip().encode('utf-8')).hexdigest()
+
+    @classmethod
+    def cache_key(cls, model_name, prompt, size):
+        size_label = "x".join(str(side) for side in size) if size else ""
+        return {'model_name': model_name or "", 'prompt_hash': cls.hash_prompt(prompt), 'size': size_label}
+
+    @classmethod
+    def lookup(cls, model_name, prompt, size=None):
+        """Entrée correspondant au prompt (et compte la réutilisation), ``None`` sinon"""
+        entry = cls.objects.filter(**cls.cache_key(model_name, prompt, size)).first()
+        if entry is None:
+            return None
+        if not entry.image.storage.exists(entry.image.name):
+            # Fichier supprimé à la main : l'entrée ne sert plus à rien
+            entry.delete()
+            return None
+        cls.objects.filter(pk=entry.pk).update(hits=F('hits') + 1, last_used_at=timezone.now())
+        return entry
+
+    @classmethod
+    def remember(cls, model_name, prompt, size, content):
+        """Stocke l'image générée pour ce prompt (ou garde celle d'un worker plus rapide)"""
+        key = cls.cache_key(model_name, prompt, size)
+        entry = cls(prompt=prompt, **key)
+        entry.image.save(f"{key['prompt_hash'][:16]}.png", content, save=False)
+        try:
+            with transaction.atomic():
+                entry.save()
+        except IntegrityError:
+            entry.image.delete(save=False)
+            entry = cls.objects.get(**key)
+        return entry
+
+
+class ConceptSignature(models.Model):
+    """Signatures MinHash d'un jeu pour repérer les concepts quasi identiques"""
+    game = models.OneToOneField(Game, on_delete=models.CASCADE, primary_key=True, related_name='concept_signature')
+    # Genre, ambiance et mots-clés : ce que l'utilisateur saisit avant génération
+    concept = models.BinaryField()
+    # Les mêmes avec la description générée
+    full = models.BinaryField()
+
+    class Meta:
+        verbose_name = "Signature de concept"
+        verbose_name_plural = "Signatures de concept"
+
+    def __str__(self):
+        return f"Signature de {self.game_id}"
+
+
+class ConceptBand(models.Model):
+    """Seau LSH d'une bande de signature : les jeux d'un même seau sont candidats"""
+    game = models.ForeignKey(Game, on_delete=models.CASCADE, related_name='concept_bands')
+    key = models.CharField(max_length=24, db_index=True)
+
+    class Meta:
+        verbose_name = "Seau de concept"
+        verbose_name_plural = "Seaux de concept"
+
+    def __str__(self):
+        return self.key
+
+
+class GameRecommendation(models.Model):
+    """Jeu souvent mis en favori avec ``game`` (précalculé par ``refresh_recommendations``)"""
+    game = models.ForeignKey(Game, on_delete=models.CASCADE, related_name='recommendations')
+    recommended = models.ForeignKey(Game, on_delete=models.CASCADE, related_name='+')
+    rank = models.PositiveSmallIntegerField()
+    score = models.FloatField()
+
+    class Meta:
+        ordering = ['game', 'rank']
+        verbose_name = "Recommandation"
+        verbose_name_plural = "Recommandations"
+        indexes = [models.Index(fields=['game', 'rank'])]
+        constraints = [
+            models.UniqueConstraint(fields=['game', 'recommended'], name='unique_game_recommendation'),
+        ]
+
+    def __str__(self):
+        return f"{self.game_id} → {self.recommended_id}"
+
+
 class UserProfile(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='profile')
     bio = models.TextField(max_length=500, blank=True, verbose_name="Biographie")
     avatar = models.ImageField(upload_to='avatars/', blank=True, null=True)
     api_usage_count = models.PositiveIntegerField(default=0, verbose_name="Utilisation API")
-    daily_api_limit = models.PositiveIntegerField(default=10, verbose_name="Limite API quotidienne")
+    daily_api_limit = models.PositiveIntegerField(default=30, verbose_name="Limite API quotidienne")
     last_api_reset = models.DateField(default=timezone.now)
     
     class Meta:
@@ -148,16 +421,16 @@ class UserProfile(models.Model):
     def __str__(self):
         return f"Profil de {self.user.username}"
     
-    def can_use_api(self):
-        """Vérifie si l'utilisateur peut utiliser l'API aujourd'hui"""
+    def can_use_api(self, cost=1):
+        """Vérifie si l'utilisateur peut encore dépenser ``cost`` crédits aujourd'hui"""
         today = timezone.now().date()
         if self.last_api_reset < today:
             self.api_usage_count = 0
             self.last_api_reset = today
             self.save()
-        return self.api_usage_count < self.daily_api_limit
+        return self.api_usage_count + cost <= self.daily_api_limit
     
-    def increment_api_usage(self):
+    def increment_api_usage(self, cost=1):
         """Incrémente le compteur d'utilisation de l'API"""
-        self.api_usage_count += 1
+        self.api_usage_count += cost
         self.save()
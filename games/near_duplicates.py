@@ -0,0 +1,183 @@
+"""
+Détection des concepts quasi identiques (MinHash + LSH).
+
+Chaque jeu reçoit deux signatures MinHash : l'une sur ce que l'utilisateur
+saisit (genre, ambiance, mots-clés), l'autre y ajoute la description
+générée. Les signatures sont découpées en ``bands`` bandes de ``rows``
+valeurs ; chaque bande donne une clé de seau indexée (``ConceptBand``).
+Deux jeux qui partagent un seau sont candidats, et seuls ces candidats sont
+comparés : la recherche reste une requête indexée quelle que soit la taille
+du catalogue. L'index est mis à jour à chaque enregistrement d'un jeu
+(voir ``games.signals``) ; ``rebuild_concept_index`` le reconstruit après un
+changement de ``GAME_NEAR_DUPLICATES``.
+"""
+import hashlib
+import random
+import re
+import unicodedata
+from array import array
+from functools import lru_cache
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count
+
+from .models import ConceptBand, ConceptSignature, Game
+
+# Champs dont dépendent les signatures
+INDEXED_FIELDS = ('genre', 'ambiance', 'keywords', 'description')
+
+# Nombre premier de Mersenne 2^61 - 1 pour les permutations (a·x + b) mod p
+_PRIME = (1 << 61) - 1
+_SEED = 20240611
+
+STOP_WORDS = {
+    'les', 'des', 'une', 'dans', 'pour', 'par', 'sur', 'avec', 'sans', 'qui', 'que', 'quoi', 'dont',
+    'est', 'sont', 'son', 'ses', 'leur', 'leurs', 'aux', 'ces', 'cette', 'mais', 'elle', 'ils', 'elles',
+    'entre', 'tout', 'tous', 'toute', 'plus', 'comme', 'vous', 'nous', 'votre', 'notre', 'jeu',
+    'the', 'and', 'for', 'with', 'from', 'into', 'game',
+}
+
+
+def _options():
+    return settings.GAME_NEAR_DUPLICATES
+
+
+def enabled():
+    return _options().get('enabled', True)
+
+
+# --------------------
+# Jetons normalisés
+# --------------------
+def _words(text):
+    """Mots en minuscules, sans accents ni mots vides"""
+    text = unicodedata.normalize('NFKD', (text or '').casefold())
+    text = ''.join(char for char in text if not unicodedata.combining(char))
+    return [word for word in re.findall(r'[a-z0-9]+', text) if len(word) > 2 and word not in STOP_WORDS]
+
+
+def concept_tokens(genre, ambiance, keywords):
+    tokens = {f'genre:{genre}', f'ambiance:{ambiance}'}
+    tokens.update(f'kw:{word}' for word in _words(keywords))
+    return tokens
+
+
+def full_tokens(genre, ambiance, keywords, description):
+    tokens = concept_tokens(genre, ambiance, keywords)
+    tokens.update(f'desc:{word}' for word in _words(description))
+    return tokens
+
+
+# --------------------
+# Signatures et bandes
+# --------------------
+@lru_cache(maxsize=4)
+def _permutations(count):
+    rng = random.Random(_SEED)
+    return tuple((rng.randrange(1, _PRIME), rng.randrange(0, _PRIME)) for _ in range(count))
+
+
+def _token_hash(token):
+    return int.from_bytes(hashlib.blake2b(token.encode('utf-8'), digest_size=8).digest(), 'little') % _PRIME
+
+
+def signature(tokens):
+    """Signature MinHash de ``bands × rows`` valeurs"""
+    options = _options()
+    hashes = [_token_hash(token) for token in tokens] or [0]
+    return [
+        min((a * value + b) % _PRIME for value in hashes)
+        for a, b in _permutations(options['bands'] * options['rows'])
+    ]
+
+
+def band_keys(kind, values):
+    """Clés de seau de chaque bande ; ``kind`` sépare les deux signatures"""
+    rows = _options()['rows']
+    keys = []
+    for band in range(len(values) // rows):
+        chunk = array('Q', values[band * rows:(band + 1) * rows]).tobytes()
+        keys.append(f"{kind}{band}:{hashlib.blake2b(chunk, digest_size=8).hexdigest()}")
+    return keys
+
+
+def _pack(values):
+    return array('Q', values).tobytes()
+
+
+def _unpack(data):
+    values = array('Q')
+    values.frombytes(bytes(data))
+    return values
+
+
+def estimated_similarity(first, second):
+    """Similarité de Jaccard estimée : part des valeurs MinHash identiques"""
+    if len(first) != len(second) or not first:
+        return 0.0
+    return sum(1 for x, y in zip(first, second) if x == y) / len(first)
+
+
+# --------------------
+# Index
+# --------------------
+def _signatures(game):
+    concept = signature(concept_tokens(game.genre, game.ambiance, game.keywords))
+    full = signature(full_tokens(game.genre, game.ambiance, game.keywords, game.description))
+    return concept, full, band_keys('c', concept) + band_keys('d', full)
+
+
+def index_game(game):
+    """(Ré)indexe un jeu ; appelé après chaque enregistrement"""
+    concept, full, keys = _signatures(game)
+    with transaction.atomic():
+        ConceptSignature.objects.update_or_create(
+            game_id=game.pk, defaults={'concept': _pack(concept), 'full': _pack(full)}
+        )
+        ConceptBand.objects.filter(game_id=game.pk).delete()
+        ConceptBand.objects.bulk_create(ConceptBand(game_id=game.pk, key=key) for key in keys)
+
+
+def index_new_games(games):
+    """Indexe des jeux tout juste créés par ``bulk_create`` (qui n'envoie pas ``post_save``)"""
+    signatures, bands = [], []
+    for game in games:
+        concept, full, keys = _signatures(game)
+        signatures.append(ConceptSignature(game_id=game.pk, concept=_pack(concept), full=_pack(full)))
+        bands.extend(ConceptBand(game_id=game.pk, key=key) for key in keys)
+    ConceptSignature.objects.bulk_create(signatures, batch_size=500)
+    ConceptBand.objects.bulk_create(bands, batch_size=1000)
+
+
+def find_similar(genre, ambiance, keywords, description=None, limit=None, exclude=None):
+    """Jeux publics les plus proches du concept, sous forme de ``(jeu, similarité)``"""
+    options = _options()
+    if description:
+        kind, field = 'd', 'full'
+        values = signature(full_tokens(genre, ambiance, keywords, description))
+    else:
+        kind, field = 'c', 'concept'
+        values = signature(concept_tokens(genre, ambiance, keywords))
+
+    # Une seule requête indexée : signatures des jeux publics qui partagent au moins un seau
+    candidates = (
+        ConceptSignature.objects.filter(game__concept_bands__key__in=band_keys(kind, values), game__is_public=True)
+        .annotate(shared=Count('game__concept_bands')).order_by('-shared')
+        .values_list('game_id', field)
+    )
+    if exclude is not None:
+        candidates = candidates.exclude(game_id=exclude)
+
+    scored = []
+    for game_id, packed in candidates[:options['max_candidates']]:
+        similarity = estimated_similarity(values, _unpack(packed))
+        if similarity >= options['threshold']:
+            scored.append((game_id, similarity))
+    if not scored:
+        return []
+    scored.sort(key=lambda item: item[1], reverse=True)
+    scored = scored[:limit or options['limit']]
+
+    games = Game.objects.select_related('creator').in_bulk([game_id for game_id, _ in scored])
+    return [(games[game_id], similarity) for game_id, similarity in scored if game_id in games]
@@ -0,0 +1,784 @@
+"""
+Fournisseurs de génération (LLM et images) pour GameForge.
+
+Le backend est choisi dans les settings (``AI_LLM_PROVIDER`` / ``AI_IMAGE_PROVIDER``).
+Les fournisseurs ``fake`` fonctionnent hors ligne : ils renvoient des réponses
+valides pour chaque étape du pipeline avec une latence, un taux d'erreur et un
+streaming configurables (``AI_FAKE_PROVIDER``). ``AI_CASSETTE_MODE`` permet
+d'enregistrer les réponses réelles dans ``AI_CASSETTE_DIR`` puis de les rejouer.
+"""
+import asyncio
+import hashlib
+import json
+import math
+import os
+import random
+import re
+import time
+from io import BytesIO
+from pathlib import Path
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.utils.module_loading import import_string
+from PIL import Image
+
+from . import local_diffusion
+from .circuit_breaker import CircuitBreaker, CircuitOpen
+from .ratelimit import ProviderLimiter, RateLimitExceeded
+
+
+class ProviderError(Exception):
+    """Erreur renvoyée par un fournisseur (réel ou simulé)"""
+
+
+class ProviderTimeout(ProviderError):
+    """L'appel a dépassé le timeout qui lui était alloué"""
+
+
+class CassetteMiss(ProviderError):
+    """Aucune réponse enregistrée pour ce prompt en mode replay"""
+
+
+# --------------------
+# Interfaces
+# --------------------
+class LLMProvider:
+    """Fournisseur de texte : ``generate`` renvoie la réponse complète"""
+
+    name = "llm"
+    model_name = ""
+
+    def generate(self, prompt, stage=None, timeout=None):
+        raise NotImplementedError
+
+    async def agenerate(self, prompt, stage=None, timeout=None):
+        """Version asynchrone ; par défaut l'appel synchrone tourne dans un thread"""
+        return await sync_to_async(self.generate, thread_sensitive=False)(prompt, stage=stage, timeout=timeout)
+
+    def stream(self, prompt, stage=None, timeout=None):
+        """Renvoie la réponse par morceaux (un seul morceau par défaut)"""
+        yield self.generate(prompt, stage=stage, timeout=timeout)
+
+    def is_available(self):
+        """Faux si le fournisseur est connu comme indisponible"""
+        return True
+
+    def model_for(self, stage):
+        """Modèle qui traite l'étape ``stage`` (voir ``AI_LLM_STAGE_PROFILES``)"""
+        return self.model_name
+
+    def max_tokens_for(self, stage):
+        """Longueur maximale de réponse pour l'étape ``stage`` (0 si inconnue)"""
+        return 0
+
+
+class ImageProvider:
+    """Fournisseur d'images : ``text_to_image`` renvoie une image PIL"""
+
+    name = "image"
+    model_name = ""
+    # (largeur, hauteur) produite, None si imposée par le modèle distant
+    size = None
+
+    def text_to_image(self, prompt, timeout=None):
+        raise NotImplementedError
+
+    async def atext_to_image(self, prompt, timeout=None):
+        return await sync_to_async(self.text_to_image, thread_sensitive=False)(prompt, timeout=timeout)
+
+    def is_available(self):
+        return True
+
+
+# --------------------
+# Fournisseurs réels
+# --------------------
+class GroqLLMProvider(LLMProvider):
+    name = "groq"
+
+    def __init__(self, api_key, model_name="llama-3.1-8b-instant", temperature=0.8, max_tokens=1500,
+                 stage_profiles=None):
+        self.api_key = api_key
+        self.stage_profiles = stage_profiles or {}
+        default = self.stage_profiles.get("default", {})
+        self.model_name = default.get("model_name", model_name)
+        self.temperature = default.get("temperature", temperature)
+        self.max_tokens = default.get("max_tokens", max_tokens)
+        self._clients = {}
+
+    def _profile(self, stage):
+        profile = {"model_name": self.model_name, "temperature": self.temperature, "max_tokens": self.max_tokens}
+        profile.update(self.stage_profiles.get(stage, {}))
+        return profile
+
+    def model_for(self, stage):
+        return self._profile(stage)["model_name"]
+
+    def max_tokens_for(self, stage):
+        return self._profile(stage)["max_tokens"]
+
+    def _client(self, stage):
+        # Un client par combinaison (modèle, temperature, max_tokens), créé au premier usage
+        profile = self._profile(stage)
+        key = (profile["model_name"], profile["temperature"], profile["max_tokens"])
+        client = self._clients.get(key)
+        if client is None:
+            from langchain_groq import ChatGroq
+
+            client = self._clients[key] = ChatGroq(
+                api_key=self.api_key,
+                model_name=profile["model_name"],
+                temperature=profile["temperature"],
+                max_tokens=profile["max_tokens"],
+            )
+        return client
+
+    @staticmethod
+    def _call_options(timeout):
+        # Transmis tel quel au client Groq (timeout HTTP de la requête)
+        return {"timeout": timeout} if timeout is not None else {}
+
+    def generate(self, prompt, stage=None, timeout=None):
+        return self._client(stage).invoke(prompt, **self._call_options(timeout)).content
+
+    async def agenerate(self, prompt, stage=None, timeout=None):
+        return (await self._client(stage).ainvoke(prompt, **self._call_options(timeout))).content
+
+    def stream(self, prompt, stage=None, timeout=None):
+        for chunk in self._client(stage).stream(prompt, **self._call_options(timeout)):
+            yield chunk.content
+
+
+class HuggingFaceImageProvider(ImageProvider):
+    name = "huggingface"
+
+    def __init__(self, token, model_name=None):
+        self.model_name = model_name or ""
+        self.token = token
+
+    def _options(self):
+        return {"model": self.model_name} if self.model_name else {}
+
+    def text_to_image(self, prompt, timeout=None):
+        from huggingface_hub import InferenceClient
+
+        # Le timeout se règle à la construction du client (objet léger, sans connexion)
+        client = InferenceClient(token=self.token, timeout=timeout)
+        return client.text_to_image(prompt, **self._options())
+
+    async def atext_to_image(self, prompt, timeout=None):
+        from huggingface_hub import AsyncInferenceClient
+
+        client = AsyncInferenceClient(token=self.token, timeout=timeout)
+        return await client.text_to_image(prompt, **self._options())
+
+
+class LocalDiffusionImageProvider(ImageProvider):
+    """Modèle diffusers local, servi par la commande ``run_image_worker``"""
+
+    name = "local"
+
+    def __init__(self, model_name=None, mode="full"):
+        self.mode = mode
+        self.size = tuple(local_diffusion.mode_options(mode)["size"])
+        model_name = model_name or settings.AI_LOCAL_DIFFUSION["model"]
+        # Le mode brouillon ne doit pas partager ses images avec le mode complet (cache, cassettes)
+        self.model_name = model_name if mode == "full" else f"{model_name}:{mode}"
+
+    def text_to_image(self, prompt, timeout=None):
+        job_id = local_diffusion.submit(prompt, self.mode, timeout=timeout)
+        try:
+            image = local_diffusion.wait(job_id, timeout=timeout)
+        except local_diffusion.LocalDiffusionError as e:
+            raise ProviderError(str(e)) from e
+        if image is None:
+            raise ProviderTimeout(f"Image locale non rendue en {timeout}s")
+        return image
+
+    def is_available(self):
+        return local_diffusion.worker_alive()
+
+
+# --------------------
+# Fournisseurs simulés
+# --------------------
+def sample_latency(rng, spec):
+    """Tire une latence (en secondes) selon la distribution décrite par ``spec``"""
+    if not spec:
+        return 0.0
+    if isinstance(spec, (int, float)):
+        return float(spec)
+    distribution = spec.get("distribution", "constant")
+    if distribution == "constant":
+        value = spec.get("value", 0.0)
+    elif distribution == "uniform":
+        value = rng.uniform(spec.get("min", 0.0), spec.get("max", 1.0))
+    elif distribution == "normal":
+        value = rng.gauss(spec.get("mean", 1.0), spec.get("stddev", 0.2))
+    elif distribution == "lognormal":
+        value = rng.lognormvariate(math.log(spec.get("median", 1.0)), spec.get("sigma", 0.5))
+    elif distribution == "exponential":
+        value = rng.expovariate(1.0 / spec.get("mean", 1.0))
+    else:
+        raise ValueError(f"Distribution de latence inconnue : {distribution}")
+    return max(0.0, min(value, spec.get("max_value", value)))
+
+
+def _prompt_rng(*parts):
+    """Générateur déterministe dérivé du contenu du prompt"""
+    digest = hashlib.sha256("\x00".join(str(p) for p in parts).encode("utf-8")).hexdigest()
+    return random.Random(int(digest[:16], 16))
+
+
+class _SimulatedProvider:
+    """Latence et taux d'erreur communs aux fournisseurs simulés"""
+
+    def __init__(self, latency=None, error_rate=0.0, seed=None):
+        self.latency = latency
+        self.error_rate = error_rate
+        self._rng = random.Random(seed)
+
+    def _simulate_call(self, timeout=None):
+        latency = sample_latency(self._rng, self.latency)
+        if timeout is not None and latency > timeout:
+            time.sleep(timeout)
+            raise ProviderTimeout(f"Timeout simulé du fournisseur {self.name}")
+        time.sleep(latency)
+        self._maybe_fail()
+
+    async def _asimulate_call(self, timeout=None):
+        latency = sample_latency(self._rng, self.latency)
+        if timeout is not None and latency > timeout:
+            await asyncio.sleep(timeout)
+            raise ProviderTimeout(f"Timeout simulé du fournisseur {self.name}")
+        await asyncio.sleep(latency)
+        self._maybe_fail()
+
+    def _maybe_fail(self):
+        if self.error_rate and self._rng.random() < self.error_rate:
+            raise ProviderError(f"Erreur simulée du fournisseur {self.name}")
+
+
+class FakeLLMProvider(_SimulatedProvider, LLMProvider):
+    """LLM local déterministe : même prompt, même réponse"""
+
+    # Noms distincts : disjoncteur et limiteur propres à chaque fournisseur simulé, comme en production
+    name = "fake-llm"
+    model_name = "fake-llm"
+
+    NAMES = ["Aiden", "Lyra", "Kael", "Nova", "Soren", "Mira", "Orin", "Vesna", "Darius", "Ilya"]
+    CLASSES = ["Guerrier", "Mage", "Éclaireur", "Ingénieur", "Voleur", "Mystique"]
+    PLACES = ["Citadelle", "Forêt", "Station", "Cité", "Abîme", "Sanctuaire", "Désert", "Archipel"]
+    ADJECTIVES = ["oubliée", "brisée", "éternelle", "silencieuse", "écarlate", "engloutie"]
+    ROLES = ["PROTAGONIST", "ALLY", "ANTAGONIST"]
+
+    def __init__(self, latency=None, error_rate=0.0, seed=None, stream_chunk_size=16, stream_chunk_delay=0.0):
+        super().__init__(latency=latency, error_rate=error_rate, seed=seed)
+        self.stream_chunk_size = stream_chunk_size
+        self.stream_chunk_delay = stream_chunk_delay
+
+    def generate(self, prompt, stage=None, timeout=None):
+        self._simulate_call(timeout)
+        return self._respond(prompt, stage)
+
+    async def agenerate(self, prompt, stage=None, timeout=None):
+        await self._asimulate_call(timeout)
+        return self._respond(prompt, stage)
+
+    def stream(self, prompt, stage=None, timeout=None):
+        # La latence simulée correspond au temps avant le premier morceau
+        self._simulate_call(timeout)
+        text = self._respond(prompt, stage)
+        for start in range(0, len(text), self.stream_chunk_size):
+            if start and self.stream_chunk_delay:
+                time.sleep(self.stream_chunk_delay)
+            yield text[start:start + self.stream_chunk_size]
+
+    def _respond(self, prompt, stage):
+        rng = _prompt_rng(stage, prompt)
+        genre = self._extract(prompt, "Genre") or "Aventure"
+        ambiance = self._extract(prompt, "Ambiance") or "Fantasy"
+        builders = {
+            "concept": self._concept,
+            "characters": self._characters,
+            "locations": self._locations,
+            "art_prompts": self._art_prompts,
+        }
+        builder = builders.get(stage, self._concept)
+        return builder(rng, genre, ambiance)
+
+    @staticmethod
+    def _extract(prompt, label):
+        match = re.search(rf"^\s*{label}\s*:\s*(.+)$", prompt, flags=re.MULTILINE)
+        return match.group(1).strip() if match else ""
+
+    def _place(self, rng):
+        return f"{rng.choice(self.PLACES)} {rng.choice(self.ADJECTIVES)}"
+
+    def _concept(self, rng, genre, ambiance):
+        place = self._place(rng)
+        return (
+            f"TITRE: Les Échos de la {place}\n"
+            f"DESCRIPTION: Un {genre} {ambiance.lower()} où chaque choix remodèle la {place.lower()}.\n"
+            f"UNIVERS: Un monde {ambiance.lower()} bâti sur les ruines d'une {self._place(rng).lower()}.\n"
+            f"HISTOIRE: {rng.choice(self.NAMES)} doit percer le secret de la {place.lower()} "
+            f"avant que {rng.choice(self.NAMES)} ne s'en empare.\n"
+            f"MECANIQUES: Exploration, artisanat et combats tactiques propres au {genre}."
+        )
+
+    def _characters(self, rng, genre, ambiance):
+        names = rng.sample(self.NAMES, 3)
+        return json.dumps([{
+            "name": name,
+            "role": role,
+            "character_class": rng.choice(self.CLASSES),
+            "background": f"{name} a grandi dans la {self._place(rng).lower()}. Son passé le rattrape.",
+            "abilities": f"Maîtrise des arts {ambiance.lower()}.",
+            "motivations": f"Protéger la {self._place(rng).lower()}.",
+            "appearance": f"Tenue typique d'un univers {ambiance.lower()}.",
+        } for name, role in zip(names, self.ROLES)], ensure_ascii=False)
+
+    def _locations(self, rng, genre, ambiance):
+        return json.dumps([{
+            "name": f"La {self._place(rng)}",
+            "description": f"Un lieu {ambiance.lower()} chargé d'histoire. Ses secrets attirent les aventuriers.",
+            "atmosphere": "Lourde et mystérieuse. Le silence y est trompeur.",
+            "gameplay_significance": f"Zone clé pour la progression du {genre}.",
+        } for _ in range(3)], ensure_ascii=False)
+
+    def _art_prompts(self, rng, genre, ambiance):
+        return json.dumps([
+            {"type": "CHARACTER", "prompt": f"Portrait de {rng.choice(self.NAMES)}, héros {ambiance.lower()}, concept art"},
+            {"type": "ENVIRONMENT", "prompt": f"Vue de la {self._place(rng).lower()}, paysage {ambiance.lower()}, concept art"},
+        ], ensure_ascii=False)
+
+
+class FakeImageProvider(_SimulatedProvider, ImageProvider):
+    """Générateur d'images local : dégradé déterministe dérivé du prompt"""
+
+    name = "fake-image"
+    model_name = "fake-image"
+
+    def __init__(self, latency=None, error_rate=0.0, seed=None, size=(512, 512), name=None):
+        super().__init__(latency=latency, error_rate=error_rate, seed=seed)
+        self.size = tuple(size)
+        if name:
+            self.name = name
+
+    def text_to_image(self, prompt, timeout=None):
+        self._simulate_call(timeout)
+        return self._render(prompt)
+
+    async def atext_to_image(self, prompt, timeout=None):
+        await self._asimulate_call(timeout)
+        return self._render(prompt)
+
+    def _render(self, prompt):
+        rng = _prompt_rng("image", prompt)
+        start = [rng.randrange(256) for _ in range(3)]
+        end = [rng.randrange(256) for _ in range(3)]
+        width, height = self.size
+        gradient = Image.new("RGB", (1, height))
+        for y in range(height):
+            ratio = y / max(height - 1, 1)
+            gradient.putpixel((0, y), tuple(int(s + (e - s) * ratio) for s, e in zip(start, end)))
+        return gradient.resize((width, height))
+
+
+# --------------------
+# Enregistrement / rejeu
+# --------------------
+class CassetteStore:
+    """Réponses de fournisseurs stockées sur disque, une entrée par prompt"""
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+
+    @staticmethod
+    def key(kind, model_name, prompt):
+        return hashlib.sha256(f"{kind}\x00{model_name}\x00{prompt}".encode("utf-8")).hexdigest()
+
+    def _path(self, kind, key, extension):
+        return self.directory / kind / f"{key}.{extension}"
+
+    def _write(self, path, data):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(f"{path.suffix}.{os.getpid()}.tmp")
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, path)
+
+    def get_text(self, model_name, prompt):
+        path = self._path("llm", self.key("llm", model_name, prompt), "json")
+        if not path.exists():
+            return None
+        return json.loads(path.read_text(encoding="utf-8"))["response"]
+
+    def put_text(self, model_name, prompt, response):
+        path = self._path("llm", self.key("llm", model_name, prompt), "json")
+        payload = {"model": model_name, "prompt": prompt, "response": response}
+        self._write(path, json.dumps(payload, ensure_ascii=False, indent=2).encode("utf-8"))
+
+    def get_image(self, model_name, prompt):
+        path = self._path("image", self.key("image", model_name, prompt), "png")
+        if not path.exists():
+            return None
+        with Image.open(path) as image:
+            return image.copy()
+
+    def put_image(self, model_name, prompt, image):
+        buffer = BytesIO()
+        image.save(buffer, format="PNG")
+        self._write(self._path("image", self.key("image", model_name, prompt), "png"), buffer.getvalue())
+
+
+class RecordingLLMProvider(LLMProvider):
+    """Appelle le fournisseur réel et enregistre chaque réponse"""
+
+    def __init__(self, inner, store):
+        self.inner = inner
+        self.store = store
+        self.name = f"record:{inner.name}"
+        self.model_name = inner.model_name
+
+    def model_for(self, stage):
+        return self.inner.model_for(stage)
+
+    def max_tokens_for(self, stage):
+        return self.inner.max_tokens_for(stage)
+
+    def generate(self, prompt, stage=None, timeout=None):
+        response = self.inner.generate(prompt, stage=stage, timeout=timeout)
+        self.store.put_text(self.model_for(stage), prompt, response)
+        return response
+
+    async def agenerate(self, prompt, stage=None, timeout=None):
+        response = await self.inner.agenerate(prompt, stage=stage, timeout=timeout)
+        self.store.put_text(self.model_for(stage), prompt, response)
+        return response
+
+
+class ReplayLLMProvider(LLMProvider):
+    """Rejoue les réponses enregistrées sans accès réseau (clé : modèle de l'étape + prompt)"""
+
+    name = "replay"
+
+    def __init__(self, store, stage_profiles=None):
+        self.store = store
+        self.stage_profiles = stage_profiles or {}
+        self.model_name = self.stage_profiles.get("default", {}).get("model_name", "")
+
+    def model_for(self, stage):
+        return self.stage_profiles.get(stage, {}).get("model_name", self.model_name)
+
+    def generate(self, prompt, stage=None, timeout=None):
+        response = self.store.get_text(self.model_for(stage), prompt)
+        if response is None:
+            raise CassetteMiss(f"Aucune réponse enregistrée pour l'étape {stage}")
+        return response
+
+
+class RecordingImageProvider(ImageProvider):
+    def __init__(self, inner, store):
+        self.inner = inner
+        self.store = store
+        self.name = f"record:{inner.name}"
+        self.model_name = inner.model_name
+        self.size = inner.size
+
+    def is_available(self):
+        return self.inner.is_available()
+
+    def text_to_image(self, prompt, timeout=None):
+        image = self.inner.text_to_image(prompt, timeout=timeout)
+        self.store.put_image(self.model_name, prompt, image)
+        return image
+
+    async def atext_to_image(self, prompt, timeout=None):
+        image = await self.inner.atext_to_image(prompt, timeout=timeout)
+        self.store.put_image(self.model_name, prompt, image)
+        return image
+
+
+class ReplayImageProvider(ImageProvider):
+    name = "replay"
+
+    def __init__(self, store, model_name):
+        self.store = store
+        self.model_name = model_name
+
+    def text_to_image(self, prompt, timeout=None):
+        image = self.store.get_image(self.model_name, prompt)
+        if image is None:
+            raise CassetteMiss("Aucune image enregistrée pour ce prompt")
+        return image
+
+
+# --------------------
+# Limitation de débit partagée
+# --------------------
+def _time_left(timeout, started):
+    """Timeout restant après l'attente dans la file du limiteur"""
+    if timeout is None:
+        return None
+    return max(0.001, timeout - (time.monotonic() - started))
+
+
+class RateLimitedLLMProvider(LLMProvider):
+    """Fait passer chaque appel par le limiteur partagé du fournisseur"""
+
+    def __init__(self, inner, limiter):
+        self.inner = inner
+        self.limiter = limiter
+        self.name = inner.name
+        self.model_name = inner.model_name
+
+    def model_for(self, stage):
+        return self.inner.model_for(stage)
+
+    def max_tokens_for(self, stage):
+        return self.inner.max_tokens_for(stage)
+
+    def _tokens(self, prompt, stage):
+        # Estimation prudente : ~4 caractères par token + réponse maximale de l'étape
+        return len(prompt) // 4 + self.inner.max_tokens_for(stage)
+
+    def generate(self, prompt, stage=None, timeout=None):
+        started = time.monotonic()
+        with self.limiter.slot(tokens=self._tokens(prompt, stage), max_wait=timeout):
+            return self.inner.generate(prompt, stage=stage, timeout=_time_left(timeout, started))
+
+    async def agenerate(self, prompt, stage=None, timeout=None):
+        started = time.monotonic()
+        async with self.limiter.aslot(tokens=self._tokens(prompt, stage), max_wait=timeout):
+            return await self.inner.agenerate(prompt, stage=stage, timeout=_time_left(timeout, started))
+
+    def stream(self, prompt, stage=None, timeout=None):
+        started = time.monotonic()
+        with self.limiter.slot(tokens=self._tokens(prompt, stage), max_wait=timeout):
+            yield from self.inner.stream(prompt, stage=stage, timeout=_time_left(timeout, started))
+
+
+class RateLimitedImageProvider(ImageProvider):
+    def __init__(self, inner, limiter):
+        self.inner = inner
+        self.limiter = limiter
+        self.name = inner.name
+        self.model_name = inner.model_name
+        self.size = inner.size
+
+    def is_available(self):
+        return self.inner.is_available()
+
+    def text_to_image(self, prompt, timeout=None):
+        started = time.monotonic()
+        with self.limiter.slot(max_wait=timeout):
+            return self.inner.text_to_image(prompt, timeout=_time_left(timeout, started))
+
+    async def atext_to_image(self, prompt, timeout=None):
+        started = time.monotonic()
+        async with self.limiter.aslot(max_wait=timeout):
+            return await self.inner.atext_to_image(prompt, timeout=_time_left(timeout, started))
+
+
+def _rate_limited(provider, wrapper_class):
+    limiter = ProviderLimiter.for_provider(provider.name)
+    return wrapper_class(provider, limiter) if limiter else provider
+
+
+# --------------------
+# Disjoncteur partagé
+# --------------------
+# Erreurs qui ne traduisent pas une panne du fournisseur
+_NOT_PROVIDER_FAILURES = (RateLimitExceeded, CassetteMiss)
+
+
+class _CircuitBreakerMixin:
+    def _setup_breaker(self, inner, breaker):
+        self.inner = inner
+        self.breaker = breaker
+        self.name = inner.name
+        self.model_name = inner.model_name
+
+    def is_available(self):
+        return self.breaker.allow_request() and self.inner.is_available()
+
+    def _check(self):
+        if not self.breaker.allow_request():
+            raise CircuitOpen(f"Fournisseur {self.name} indisponible (disjoncteur ouvert)")
+
+    async def _acheck(self):
+        if not await sync_to_async(self.breaker.allow_request, thread_sensitive=False)():
+            raise CircuitOpen(f"Fournisseur {self.name} indisponible (disjoncteur ouvert)")
+
+    def _call(self, func, *args, **kwargs):
+        self._check()
+        try:
+            result = func(*args, **kwargs)
+        except _NOT_PROVIDER_FAILURES:
+            raise
+        except Exception:
+            self.breaker.record_failure()
+            raise
+        self.breaker.record_success()
+        return result
+
+    async def _acall(self, func, *args, **kwargs):
+        await self._acheck()
+        try:
+            result = await func(*args, **kwargs)
+        except _NOT_PROVIDER_FAILURES:
+            raise
+        except Exception:
+            await sync_to_async(self.breaker.record_failure, thread_sensitive=False)()
+            raise
+        await sync_to_async(self.breaker.record_success, thread_sensitive=False)()
+        return result
+
+
+class CircuitBreakerLLMProvider(_CircuitBreakerMixin, LLMProvider):
+    def __init__(self, inner):
+        self._setup_breaker(inner, CircuitBreaker.for_provider(inner.name, probe=self._probe))
+
+    def _probe(self):
+        self.inner.generate("Réponds simplement OK.", stage="probe", timeout=settings.AI_CALL_TIMEOUT)
+
+    def model_for(self, stage):
+        return self.inner.model_for(stage)
+
+    def max_tokens_for(self, stage):
+        return self.inner.max_tokens_for(stage)
+
+    def generate(self, prompt, stage=None, timeout=None):
+        return self._call(self.inner.generate, prompt, stage=stage, timeout=timeout)
+
+    async def agenerate(self, prompt, stage=None, timeout=None):
+        return await self._acall(self.inner.agenerate, prompt, stage=stage, timeout=timeout)
+
+    def stream(self, prompt, stage=None, timeout=None):
+        self._check()
+        try:
+            yield from self.inner.stream(prompt, stage=stage, timeout=timeout)
+        except _NOT_PROVIDER_FAILURES:
+            raise
+        except Exception:
+            self.breaker.record_failure()
+            raise
+        # Un flux abandonné par le lecteur (GeneratorExit) ne compte ni comme succès ni comme échec
+        self.breaker.record_success()
+
+
+class CircuitBreakerImageProvider(_CircuitBreakerMixin, ImageProvider):
+    def __init__(self, inner):
+        self._setup_breaker(inner, CircuitBreaker.for_provider(inner.name, probe=self._probe))
+        self.size = inner.size
+
+    def _probe(self):
+        self.inner.text_to_image("probe", timeout=settings.AI_CALL_TIMEOUT)
+
+    def text_to_image(self, prompt, timeout=None):
+        return self._call(self.inner.text_to_image, prompt, timeout=timeout)
+
+    async def atext_to_image(self, prompt, timeout=None):
+        return await self._acall(self.inner.atext_to_image, prompt, timeout=timeout)
+
+
+def _guarded(provider, wrapper_class):
+    if not settings.AI_CIRCUIT_BREAKER.get("enabled", True):
+        return provider
+    return wrapper_class(provider)
+
+
+# --------------------
+# Sélection depuis les settings
+# --------------------
+LLM_PROVIDERS = {
+    "groq": "games.providers.GroqLLMProvider",
+    "fake": "games.providers.FakeLLMProvider",
+}
+
+IMAGE_PROVIDERS = {
+    "huggingface": "games.providers.HuggingFaceImageProvider",
+    "local": "games.providers.LocalDiffusionImageProvider",
+    "fake": "games.providers.FakeImageProvider",
+}
+
+
+def stage_timeout(stage):
+    """Timeout maximal d'un appel de l'étape ``stage`` (``None`` si non borné)"""
+    profiles = settings.AI_LLM_STAGE_PROFILES
+    return profiles.get(stage, {}).get("timeout", profiles.get("default", {}).get("timeout"))
+
+
+def _fake_options(*keys):
+    options = settings.AI_FAKE_PROVIDER
+    return {key: options[key] for key in keys if key in options}
+
+
+def _build_llm_provider(name):
+    if name == "groq":
+        if not settings.AI_API_KEY:
+            return None
+        return GroqLLMProvider(api_key=settings.AI_API_KEY, stage_profiles=settings.AI_LLM_STAGE_PROFILES)
+    if name == "fake":
+        options = _fake_options("error_rate", "seed", "stream_chunk_size", "stream_chunk_delay")
+        return FakeLLMProvider(latency=settings.AI_FAKE_PROVIDER.get("llm_latency"), **options)
+    return import_string(LLM_PROVIDERS.get(name, name))()
+
+
+def _build_image_provider(name, draft=False):
+    if name == "huggingface":
+        return HuggingFaceImageProvider(token=settings.HUGGINGFACE_API_KEY)
+    if name == "local":
+        return LocalDiffusionImageProvider(mode="draft" if draft else settings.AI_LOCAL_DIFFUSION["mode"])
+    if name == "fake":
+        options = _fake_options("error_rate", "seed", "size")
+        latency = settings.AI_FAKE_PROVIDER.get("image_latency")
+        if draft:
+            options["size"] = settings.AI_FAKE_PROVIDER.get("draft_size", (256, 256))
+            options["name"] = "fake-draft"
+            latency = settings.AI_FAKE_PROVIDER.get("draft_latency")
+        return FakeImageProvider(latency=latency, **options)
+    return import_string(IMAGE_PROVIDERS.get(name, name))()
+
+
+def _cassette_store():
+    return CassetteStore(settings.AI_CASSETTE_DIR)
+
+
+def get_llm_provider(name=None):
+    """Construit le fournisseur LLM configuré (``None`` si aucun n'est disponible)"""
+    name = name or settings.AI_LLM_PROVIDER
+    mode = settings.AI_CASSETTE_MODE
+    if mode == "replay":
+        return ReplayLLMProvider(_cassette_store(), stage_profiles=settings.AI_LLM_STAGE_PROFILES)
+    provider = _build_llm_provider(name)
+    if provider is not None:
+        provider = _guarded(_rate_limited(provider, RateLimitedLLMProvider), CircuitBreakerLLMProvider)
+    if provider is not None and mode == "record":
+        return RecordingLLMProvider(provider, _cassette_store())
+    return provider
+
+
+def get_image_provider(name=None):
+    """Construit le fournisseur d'images configuré"""
+    name = name or settings.AI_IMAGE_PROVIDER
+    mode = settings.AI_CASSETTE_MODE
+    if mode == "replay":
+        return ReplayImageProvider(_cassette_store(), model_name=settings.AI_CASSETTE_IMAGE_MODEL)
+    provider = _build_image_provider(name)
+    if provider is not None:
+        provider = _guarded(_rate_limited(provider, RateLimitedImageProvider), CircuitBreakerImageProvider)
+    if provider is not None and mode == "record":
+        return RecordingImageProvider(provider, _cassette_store())
+    return provider
+
+
+def get_draft_image_provider():
+    """Fournisseur des aperçus rapides (``None`` si le concept art progressif est désactivé)"""
+    name = settings.AI_DRAFT_IMAGE_PROVIDER
+    # Les aperçus ne sont ni enregistrés ni rejoués : seul le rendu complet compte
+    if not name or settings.AI_CASSETTE_MODE == "replay":
+        return None
+    provider = _build_image_provider(name, draft=True)
+    return _guarded(_rate_limited(provider, RateLimitedImageProvider), CircuitBreakerImageProvider)
@@ -0,0 +1,166 @@
+"""
+Limitation de débit partagée pour les fournisseurs IA.
+
+Chaque fournisseur dispose de deux seaux à jetons (requêtes/minute et
+tokens/minute) et d'un plafond d'appels simultanés, définis dans
+``AI_PROVIDER_LIMITS``. L'état vit dans la base partagée (voir
+``games.shared_state``) : tous les workers respectent le même plafond.
+Un appel au-delà de la limite attend brièvement son tour (``max_wait``)
+au lieu d'échouer immédiatement.
+"""
+import asyncio
+import time
+import uuid
+from contextlib import asynccontextmanager, contextmanager
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+
+from . import shared_state
+
+shared_state.register_schema(
+    "CREATE TABLE IF NOT EXISTS token_buckets ("
+    " key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated_at REAL NOT NULL)"
+)
+shared_state.register_schema(
+    "CREATE TABLE IF NOT EXISTS in_flight_leases ("
+    " lease TEXT PRIMARY KEY, key TEXT NOT NULL, expires_at REAL NOT NULL)"
+)
+
+
+class RateLimitExceeded(Exception):
+    """Le fournisseur est saturé et l'attente maximale est dépassée"""
+
+
+# Un seau se remplit entièrement en une minute : au-delà, sa ligne équivaut à une ligne absente
+BUCKET_REFILL_SECONDS = 60.0
+
+
+def prune_idle_buckets(prefix=''):
+    """Supprime les seaux pleins (inutilisés depuis une minute) dont la clé commence par ``prefix``"""
+    with shared_state.transaction() as conn:
+        cursor = conn.execute(
+            "DELETE FROM token_buckets WHERE substr(key, 1, ?) = ? AND updated_at < ?",
+            (len(prefix), prefix, time.time() - BUCKET_REFILL_SECONDS),
+        )
+        return cursor.rowcount
+
+
+class ProviderLimiter:
+    """Seaux à jetons + sémaphore partagés pour un fournisseur"""
+
+    POLL_INTERVAL = 0.05
+
+    def __init__(self, name, requests_per_minute=None, tokens_per_minute=None,
+                 max_in_flight=None, max_wait=10.0, lease_timeout=300.0):
+        self.name = name
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.max_in_flight = max_in_flight
+        self.max_wait = max_wait
+        self.lease_timeout = lease_timeout
+
+    @classmethod
+    def for_provider(cls, name):
+        """Limiteur configuré pour ce fournisseur, ``None`` s'il n'est pas limité"""
+        limits = settings.AI_PROVIDER_LIMITS.get(name)
+        if not limits:
+            return None
+        return cls(name, **limits)
+
+    # --------------------
+    # Opérations atomiques sur l'état partagé
+    # --------------------
+    def _buckets(self, tokens):
+        buckets = []
+        if self.requests_per_minute:
+            buckets.append((f"{self.name}:requests", self.requests_per_minute, 1))
+        if self.tokens_per_minute and tokens:
+            # Une demande plus grosse que le seau entier ne passerait jamais
+            buckets.append((f"{self.name}:tokens", self.tokens_per_minute, min(tokens, self.tokens_per_minute)))
+        return buckets
+
+    def _try_acquire(self, tokens, lease):
+        """Réserve jetons et place ; renvoie 0 en cas de succès, sinon l'attente conseillée"""
+        now = time.time()
+        with shared_state.transaction() as conn:
+            levels = []
+            wait = 0.0
+            for key, capacity, amount in self._buckets(tokens):
+                row = conn.execute("SELECT tokens, updated_at FROM token_buckets WHERE key = ?", (key,)).fetchone()
+                level = capacity if row is None else min(capacity, row[0] + (now - row[1]) * capacity / 60.0)
+                if level < amount:
+                    wait = max(wait, (amount - level) * 60.0 / capacity)
+                levels.append((key, level, amount))
+
+            if self.max_in_flight:
+                conn.execute("DELETE FROM in_flight_leases WHERE key = ? AND expires_at < ?", (self.name, now))
+                (in_flight,) = conn.execute(
+                    "SELECT COUNT(*) FROM in_flight_leases WHERE key = ?", (self.name,)
+                ).fetchone()
+                if in_flight >= self.max_in_flight:
+                    wait = max(wait, self.POLL_INTERVAL)
+
+            if wait:
+                return wait
+
+            for key, level, amount in levels:
+                conn.execute(
+                    "INSERT OR REPLACE INTO token_buckets (key, tokens, updated_at) VALUES (?, ?, ?)",
+                    (key, level - amount, now),
+                )
+            if self.max_in_flight:
+                conn.execute(
+                    "INSERT INTO in_flight_leases (lease, key, expires_at) VALUES (?, ?, ?)",
+                    (lease, self.name, now + self.lease_timeout),
+                )
+        return 0.0
+
+    def _release(self, lease):
+        if self.max_in_flight:
+            with shared_state.transaction() as conn:
+                conn.execute("DELETE FROM in_flight_leases WHERE lease = ?", (lease,))
+
+    def _next_wait(self, wait, deadline):
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise RateLimitExceeded(f"Limite du fournisseur {self.name} atteinte")
+        return min(max(wait, self.POLL_INTERVAL), remaining)
+
+    # --------------------
+    # API publique
+    # --------------------
+    def _wait_deadline(self, max_wait):
+        if max_wait is None:
+            max_wait = self.max_wait
+        return time.monotonic() + min(max_wait, self.max_wait)
+
+    @contextmanager
+    def slot(self, tokens=0, max_wait=None):
+        """Attend une place (au plus ``max_wait`` secondes) pendant la durée de l'appel"""
+        lease = uuid.uuid4().hex
+        deadline = self._wait_deadline(max_wait)
+        while True:
+            wait = self._try_acquire(tokens, lease)
+            if not wait:
+                break
+            time.sleep(self._next_wait(wait, deadline))
+        try:
+            yield
+        finally:
+            self._release(lease)
+
+    @asynccontextmanager
+    async def aslot(self, tokens=0, max_wait=None):
+        lease = uuid.uuid4().hex
+        deadline = self._wait_deadline(max_wait)
+        try_acquire = sync_to_async(self._try_acquire, thread_sensitive=False)
+        while True:
+            wait = await try_acquire(tokens, lease)
+            if not wait:
+                break
+            await asyncio.sleep(self._next_wait(wait, deadline))
+        try:
+            yield
+        finally:
+            await sync_to_async(self._release, thread_sensitive=False)(lease)
@@ -0,0 +1,154 @@
+"""
+Recommandations « jeux similaires » à partir des favoris.
+
+Les favoris forment une matrice creuse utilisateurs × jeux ; son produit
+transposé donne les co-occurrences jeu × jeu, normalisées en similarité
+cosinus (NumPy/SciPy). Les ``top_k`` meilleurs jeux publics de chaque jeu
+sont matérialisés dans ``GameRecommendation`` : la page d'un jeu n'a plus
+qu'une lecture indexée à faire. Chaque favori ajouté ou retiré marque son
+jeu à recalculer dans la base partagée (``games.shared_state``) ; la
+commande ``refresh_recommendations`` ne réécrit ensuite que les jeux
+touchés et leurs voisins.
+"""
+import time
+
+from django.conf import settings
+from django.db import transaction
+
+from . import http_cache, shared_state
+from .models import Favorite, Game, GameRecommendation
+
+shared_state.register_schema(
+    "CREATE TABLE IF NOT EXISTS recommendation_dirty ("
+    " game_id INTEGER PRIMARY KEY, marked_at REAL NOT NULL)"
+)
+
+
+def _options():
+    return settings.GAME_RECOMMENDATIONS
+
+
+# --------------------
+# Jeux à recalculer
+# --------------------
+def mark_dirty(game_id):
+    with shared_state.transaction() as conn:
+        conn.execute(
+            "INSERT OR REPLACE INTO recommendation_dirty (game_id, marked_at) VALUES (?, ?)",
+            (game_id, time.time()),
+        )
+
+
+def _take_dirty():
+    with shared_state.transaction() as conn:
+        rows = conn.execute("SELECT game_id FROM recommendation_dirty").fetchall()
+        conn.execute("DELETE FROM recommendation_dirty")
+    return {game_id for (game_id,) in rows}
+
+
+def _restore_dirty(game_ids):
+    now = time.time()
+    with shared_state.transaction() as conn:
+        conn.executemany(
+            "INSERT OR REPLACE INTO recommendation_dirty (game_id, marked_at) VALUES (?, ?)",
+            [(game_id, now) for game_id in game_ids],
+        )
+
+
+# --------------------
+# Calcul
+# --------------------
+def similarity_matrix():
+    """Identifiants des jeux et matrice creuse (CSR) des similarités cosinus entre eux"""
+    import numpy as np
+    from scipy import sparse
+
+    pairs = np.array(list(Favorite.objects.values_list('user_id', 'game_id').iterator(chunk_size=5000)),
+                     dtype=np.int64).reshape(-1, 2)
+    users, user_index = np.unique(pairs[:, 0], return_inverse=True)
+    games, game_index = np.unique(pairs[:, 1], return_inverse=True)
+    favorites = sparse.csr_matrix(
+        (np.ones(len(pairs), dtype=np.float32), (user_index, game_index)), shape=(len(users), len(games))
+    )
+
+    co_occurrences = (favorites.T @ favorites).tocsr()
+    # La diagonale est le nombre de favoris de chaque jeu
+    inverse_norms = sparse.diags(1.0 / np.sqrt(co_occurrences.diagonal()))
+    min_common = _options()['min_common']
+    if min_common > 1:
+        co_occurrences.data[co_occurrences.data < min_common] = 0
+    co_occurrences.setdiag(0)
+    co_occurrences.eliminate_zeros()
+    return games, (inverse_norms @ co_occurrences @ inverse_norms).tocsr()
+
+
+def _top_k(games, similarities, rows, public):
+    """Recommandations des lignes ``rows`` : ``{game_id: [(recommended_id, score), ...]}``"""
+    import numpy as np
+
+    top_k = _options()['top_k']
+    recommendations = {}
+    for row in rows:
+        start, end = similarities.indptr[row], similarities.indptr[row + 1]
+        columns = similarities.indices[start:end]
+        scores = similarities.data[start:end]
+        keep = public[columns]
+        columns, scores = columns[keep], scores[keep]
+        # Tri stable : à score égal, l'ordre des identifiants départage
+        best = np.argsort(-scores, kind='stable')[:top_k]
+        recommendations[int(games[row])] = [(int(games[columns[i]]), float(scores[i])) for i in best]
+    return recommendations
+
+
+def _write(game_ids, recommendations):
+    with transaction.atomic():
+        GameRecommendation.objects.filter(game_id__in=game_ids).delete()
+        GameRecommendation.objects.bulk_create(
+            (
+                GameRecommendation(game_id=game_id, recommended_id=recommended_id, rank=rank, score=score)
+                for game_id, items in recommendations.items()
+                for rank, (recommended_id, score) in enumerate(items)
+            ),
+            batch_size=1000,
+        )
+
+
+def refresh(full=False):
+    """Recalcule les recommandations des jeux touchés (ou de tous) ; renvoie le nombre de jeux réécrits"""
+    import numpy as np
+
+    dirty = _take_dirty()
+    if not full and not dirty:
+        return 0
+    try:
+        games, similarities = similarity_matrix()
+        public = np.isin(games, np.fromiter(Game.objects.filter(is_public=True).values_list('pk', flat=True),
+                                            dtype=np.int64))
+        if full:
+            rows = np.arange(len(games))
+            targets = set(GameRecommendation.objects.values_list('game_id', flat=True).distinct())
+        else:
+            # Les voisins d'un jeu touché voient leurs scores changer, ceux qui le recommandaient aussi
+            targets = dirty | set(
+                GameRecommendation.objects.filter(recommended_id__in=dirty).values_list('game_id', flat=True)
+            )
+            dirty_rows = np.flatnonzero(np.isin(games, list(dirty)))
+            neighbours = similarities[dirty_rows].indices if len(dirty_rows) else np.array([], dtype=np.int64)
+            rows = np.union1d(np.flatnonzero(np.isin(games, list(targets))), neighbours)
+        recommendations = _top_k(games, similarities, rows, public)
+        targets |= set(recommendations)
+        _write(targets, recommendations)
+        http_cache.bump()
+    except BaseException:
+        _restore_dirty(dirty)
+        raise
+    return len(targets)
+
+
+def related_games(game):
+    """Jeux publics recommandés pour ``game`` : une seule lecture indexée"""
+    return [
+        recommendation.recommended
+        for recommendation in GameRecommendation.objects.filter(game=game, recommended__is_public=True)
+        .select_related('recommended')[:_options()['top_k']]
+    ]
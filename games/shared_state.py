@@ -0,0 +1,59 @@
+"""
+État partagé entre les workers d'un même serveur.
+
+Une petite base SQLite locale (``GAMEFORGE_SHARED_STATE_DB``) sert de mémoire
+commune aux processus : chaque opération s'exécute dans une transaction
+``BEGIN IMMEDIATE``, ce qui sérialise les lectures-modifications entre workers.
+Les modules qui en ont besoin déclarent leurs tables avec ``register_schema``.
+"""
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+from django.conf import settings
+
+_schemas = []
+_local = threading.local()
+
+
+def register_schema(sql):
+    """Déclare une table (``CREATE TABLE IF NOT EXISTS ...``) créée à la connexion"""
+    if sql not in _schemas:
+        _schemas.append(sql)
+
+
+def _connection():
+    conn = getattr(_local, "connection", None)
+    if conn is None:
+        conn = sqlite3.connect(
+            str(settings.GAMEFORGE_SHARED_STATE_DB),
+            timeout=settings.GAMEFORGE_SHARED_STATE_TIMEOUT,
+            isolation_level=None,
+        )
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        _local.connection = conn
+        _local.schemas = 0
+    if _local.schemas < len(_schemas):
+        for sql in _schemas[_local.schemas:]:
+            conn.execute(sql)
+        _local.schemas = len(_schemas)
+    return conn
+
+
+@contextmanager
+def transaction():
+    """Transaction exclusive en écriture sur l'état partagé"""
+    conn = _connection()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        yield conn
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    conn.execute("COMMIT")
+
+
+def query(sql, params=()):
+    """Lecture simple (sans verrou d'écriture), renvoie la première ligne"""
+    return _connection().execute(sql, params).fetchone()
@@ -1,7 +1,8 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save, pre_delete
 from django.dispatch import receiver
 from django.contrib.auth.models import User
-from .models import UserProfile
+from . import design_document, http_cache, near_duplicates, recommendations, trending
+from .models import Character, Favorite, Game, Location, UserProfile
 
 
 @receiver(post_save, sender=User)
@@ -9,6 +10,8 @@ def create_user_profile(sender, instance, created, **kwargs):
     """Crée automatiquement un profil utilisateur lors de la création d'un utilisateur"""
     if created:
         UserProfile.objects.create(user=instance)
+        # Le nombre de créateurs est affiché sur l'accueil
+        http_cache.bump()
 
 
 @receiver(post_save, sender=User)
@@ -16,3 +19,42 @@ def save_user_profile(sender, instance, **kwargs):
     """Sauvegarde le profil utilisateur lors de la sauvegarde de l'utilisateur"""
     if hasattr(instance, 'profile'):
         instance.profile.save()
+
+
+@receiver(pre_delete, sender=Game)
+def materialize_remixes(sender, instance, **kwargs):
+    """Les remix qui partagent encore le contenu du jeu supprimé en reçoivent une copie"""
+    for section in ('characters', 'locations'):
+        instance.materialize_remixes(section)
+
+
+@receiver(post_delete, sender=Game)
+def delete_orphan_rows(sender, instance, **kwargs):
+    """Copies faites pour un remix supprimé dans la même opération que sa source"""
+    Character.objects.filter(game_id=instance.pk).delete()
+    Location.objects.filter(game_id=instance.pk).delete()
+    design_document.discard(instance.pk)
+
+
+@receiver(post_save, sender=Game)
+def index_concept(sender, instance, update_fields=None, **kwargs):
+    """Met à jour l'index des concepts quasi identiques"""
+    if not near_duplicates.enabled():
+        return
+    # Un simple compteur de vues ne change pas la signature
+    if update_fields is not None and not set(update_fields) & set(near_duplicates.INDEXED_FIELDS):
+        return
+    near_duplicates.index_game(instance)
+
+
+@receiver(post_save, sender=Favorite)
+@receiver(post_delete, sender=Favorite)
+def mark_recommendations_dirty(sender, instance, **kwargs):
+    """Les recommandations du jeu seront recalculées par refresh_recommendations"""
+    recommendations.mark_dirty(instance.game_id)
+
+
+@receiver(post_save, sender=Favorite)
+def record_favorite_trend(sender, instance, created, **kwargs):
+    if created:
+        trending.record(instance.game_id, trending.FAVORITE)
@@ -0,0 +1,132 @@
+"""
+Regroupement (« single-flight ») des appels identiques en cours.
+
+Quand plusieurs requêtes demandent la même chose au même moment (même
+préréglage genre/ambiance/mots-clés), seul le premier appelant — le meneur —
+interroge le fournisseur ; les autres attendent son résultat dans la base
+partagée (``games.shared_state``), quel que soit leur processus. Un résultat
+reste disponible ``result_ttl`` secondes pour les retardataires. Si le meneur
+échoue, le premier suiveur à le constater devient meneur à son tour.
+"""
+import asyncio
+import hashlib
+import time
+import uuid
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+
+from . import shared_state
+
+shared_state.register_schema(
+    "CREATE TABLE IF NOT EXISTS single_flight ("
+    " key TEXT PRIMARY KEY, owner TEXT NOT NULL, state TEXT NOT NULL,"
+    " result TEXT, expires_at REAL NOT NULL)"
+)
+
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+
+class SingleFlightError(Exception):
+    """L'appel partagé n'a pas abouti à temps"""
+
+
+def make_key(*parts):
+    """Clé du texte exact : deux prompts qui diffèrent d'une majuscule n'ont pas la même réponse"""
+    return hashlib.sha256("\x00".join(str(part) for part in parts).encode("utf-8")).hexdigest()
+
+
+def _options():
+    return settings.AI_SINGLE_FLIGHT
+
+
+def _join(key, owner):
+    """Devient meneur, ou renvoie l'état de l'appel déjà en cours pour cette clé"""
+    now = time.time()
+    with shared_state.transaction() as conn:
+        conn.execute("DELETE FROM single_flight WHERE expires_at < ?", (now - 60,))
+        row = conn.execute("SELECT state, result, expires_at FROM single_flight WHERE key = ?", (key,)).fetchone()
+        if row is not None and row[2] >= now and row[0] in (RUNNING, DONE):
+            return row[0], row[1]
+        conn.execute(
+            "INSERT OR REPLACE INTO single_flight (key, owner, state, result, expires_at) VALUES (?, ?, ?, NULL, ?)",
+            (key, owner, RUNNING, now + _options()["lease_timeout"]),
+        )
+    return None, None
+
+
+def _publish(key, owner, state, result=None):
+    ttl = _options()["result_ttl"] if state == DONE else 0
+    with shared_state.transaction() as conn:
+        conn.execute(
+            "UPDATE single_flight SET state = ?, result = ?, expires_at = ? WHERE key = ? AND owner = ?",
+            (state, result, time.time() + ttl, key, owner),
+        )
+
+
+def _poll(key):
+    row = shared_state.query("SELECT state, result FROM single_flight WHERE key = ?", (key,))
+    return row or (FAILED, None)
+
+
+def _follower_deadline(wait):
+    limit = _options()["wait"]
+    return time.monotonic() + (limit if wait is None else min(wait, limit))
+
+
+def do(key, func, wait=None):
+    """Exécute ``func()`` une seule fois pour tous les appelants concurrents de ``key``"""
+    if not _options().get("enabled", True):
+        return func()
+    owner = uuid.uuid4().hex
+    deadline = _follower_deadline(wait)
+    while True:
+        state, result = _join(key, owner)
+        if state is None:
+            try:
+                result = func()
+            except BaseException:
+                _publish(key, owner, FAILED)
+                raise
+            _publish(key, owner, DONE, result)
+            return result
+
+        while state == RUNNING:
+            if time.monotonic() >= deadline:
+                raise SingleFlightError("Délai dépassé en attendant l'appel partagé")
+            time.sleep(_options()["poll_interval"])
+            state, result = _poll(key)
+        if state == DONE:
+            return result
+        # Le meneur a échoué : on tente de reprendre l'appel plutôt que d'échouer avec lui
+
+
+async def ado(key, coroutine_func, wait=None):
+    """Version asynchrone de ``do`` : ``coroutine_func()`` renvoie une coroutine"""
+    if not _options().get("enabled", True):
+        return await coroutine_func()
+    owner = uuid.uuid4().hex
+    deadline = _follower_deadline(wait)
+    join = sync_to_async(_join, thread_sensitive=False)
+    publish = sync_to_async(_publish, thread_sensitive=False)
+    poll = sync_to_async(_poll, thread_sensitive=False)
+    while True:
+        state, result = await join(key, owner)
+        if state is None:
+            try:
+                result = await coroutine_func()
+            except BaseException:
+                await publish(key, owner, FAILED)
+                raise
+            await publish(key, owner, DONE, result)
+            return result
+
+        while state == RUNNING:
+            if time.monotonic() >= deadline:
+                raise SingleFlightError("Délai dépassé en attendant l'appel partagé")
+            await asyncio.sleep(_options()["poll_interval"])
+            state, result = await poll(key)
+        if state == DONE:
+            return result
@@ -0,0 +1,96 @@
+"""
+Profil SQLite « production » : pragmas posés à l'ouverture de chaque connexion.
+
+Avec ``SQLITE_PROFILE = 'production'``, chaque connexion Django à une base
+SQLite reçoit ``SQLITE_PRODUCTION_PRAGMAS`` (WAL, ``synchronous=NORMAL``,
+attente des verrous, mmap, cache de pages, tables temporaires en mémoire).
+Le vérificateur système ``check_pragmas`` affiche au démarrage les valeurs
+réellement appliquées par SQLite et signale celles qui diffèrent du profil
+(par exemple un ``mmap_size`` plafonné à la compilation).
+
+Une base qui fixe son propre ``OPTIONS['timeout']`` (les réplicas) garde cette
+attente comme ``busy_timeout`` ; les réplicas, ouverts en lecture seule,
+conservent aussi le mode de journal de leur fichier.
+"""
+from django.conf import settings
+from django.core import checks
+from django.db import DatabaseError, connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+# Valeurs numériques renvoyées par SQLite pour les pragmas nommés
+_NAMED_VALUES = {
+    'synchronous': {'off': 0, 'normal': 1, 'full': 2, 'extra': 3},
+    'temp_store': {'default': 0, 'file': 1, 'memory': 2},
+}
+
+
+def enabled():
+    return settings.SQLITE_PROFILE == 'production'
+
+
+def _pragmas(connection):
+    """Pragmas du profil pour cette connexion"""
+    pragmas = dict(settings.SQLITE_PRODUCTION_PRAGMAS)
+    timeout = connection.settings_dict.get('OPTIONS', {}).get('timeout')
+    if timeout is not None:
+        pragmas['busy_timeout'] = int(timeout * 1000)
+    if connection.alias in settings.DATABASE_REPLICAS:
+        pragmas.pop('journal_mode', None)
+    return pragmas
+
+
+@receiver(connection_created)
+def apply_pragmas(sender, connection, **kwargs):
+    """Pose les pragmas du profil sur une connexion SQLite qui vient d'être ouverte"""
+    if connection.vendor != 'sqlite' or not enabled():
+        return
+    with connection.cursor() as cursor:
+        for name, value in _pragmas(connection).items():
+            cursor.execute(f"PRAGMA {name} = {value}")
+
+
+def effective_pragmas(connection):
+    """Valeurs actuelles des pragmas du profil sur ``connection``"""
+    values = {}
+    with connection.cursor() as cursor:
+        for name in _pragmas(connection):
+            cursor.execute(f"PRAGMA {name}")
+            row = cursor.fetchone()
+            values[name] = row[0] if row else None
+    return values
+
+
+def _expected(name, value):
+    if isinstance(value, str):
+        value = value.lower()
+        return _NAMED_VALUES.get(name, {}).get(value, value)
+    return value
+
+
+@checks.register()
+def check_pragmas(app_configs=None, **kwargs):
+    """Rapporte les pragmas effectifs de chaque base SQLite quand le profil est actif"""
+    if not enabled():
+        return []
+    messages = []
+    for alias in connections:
+        connection = connections[alias]
+        if connection.vendor != 'sqlite':
+            continue
+        try:
+            values = effective_pragmas(connection)
+        except DatabaseError as e:
+            messages.append(checks.Warning(f"SQLite « {alias} » : pragmas illisibles ({e})", id='games.W002'))
+            continue
+        summary = ", ".join(f"{name}={value}" for name, value in values.items())
+        messages.append(checks.Info(f"SQLite « {alias} » : {summary}", id='games.I001'))
+        for name, value in _pragmas(connection).items():
+            actual = values[name].lower() if isinstance(values[name], str) else values[name]
+            if actual != _expected(name, value):
+                messages.append(checks.Warning(
+                    f"SQLite « {alias} » : {name} vaut {values[name]} au lieu de {value}",
+                    hint="Base en mémoire, système de fichiers réseau ou limite fixée à la compilation de SQLite ?",
+                    id='games.W001',
+                ))
+    return messages
@@ -0,0 +1,42 @@
+"""
+Tâches d'arrière-plan exécutées dans le processus web.
+
+Un pool de threads (``GAMEFORGE_BACKGROUND_WORKERS``) exécute le travail qui ne
+doit pas bloquer une requête : sondes de reprise des fournisseurs, rendus
+différés... Les tâches périodiques passent par des commandes ``manage.py``.
+"""
+import threading
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections
+
+_executor = None
+_lock = threading.Lock()
+
+
+def _get_executor():
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.GAMEFORGE_BACKGROUND_WORKERS,
+                thread_name_prefix="gameforge-bg",
+            )
+    return _executor
+
+
+def submit(func, *args, **kwargs):
+    """Planifie ``func`` en arrière-plan et renvoie le ``Future`` associé"""
+    def run():
+        close_old_connections()
+        try:
+            return func(*args, **kwargs)
+        except Exception:
+            traceback.print_exc()
+            raise
+        finally:
+            close_old_connections()
+
+    return _get_executor().submit(run)
@@ -0,0 +1,55 @@
+import tempfile
+from pathlib import Path
+
+from django.test import override_settings
+
+from games import shared_state
+from games.models import Game
+
+
+def make_game(user, **fields):
+    fields = {'title': "Source", 'description': "d", 'genre': 'RPG', 'ambiance': 'DARK_FANTASY',
+              'keywords': "donjon", **fields}
+    return Game.objects.create(creator=user, **fields)
+
+
+def character_row(name):
+    return {'name': name, 'role': 'PROTAGONIST', 'character_class': "Guerrier", 'background': "b",
+            'abilities': "a", 'motivations': "m", 'appearance': "p"}
+
+
+class IsolatedSharedStateMixin:
+    """État partagé (seaux, verrous, tendances) vide pour chaque test
+
+    Le lanceur de tests (``games.tests.runner``) isole déjà la suite de la vraie base ;
+    ce mixin isole en plus les tests les uns des autres.
+    """
+
+    def setUp(self):
+        super().setUp()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        override = override_settings(GAMEFORGE_SHARED_STATE_DB=Path(directory.name) / 'shared_state.sqlite3')
+        override.enable()
+        self.addCleanup(override.disable)
+        self._reset_connection()
+        self.addCleanup(self._reset_connection)
+
+    @staticmethod
+    def _reset_connection():
+        conn = getattr(shared_state._local, 'connection', None)
+        if conn is not None:
+            conn.close()
+            shared_state._local.connection = None
+
+
+class TemporaryMediaMixin:
+    """Fichiers téléversés (concept art, cache d'images) écrits dans un dossier temporaire"""
+
+    def setUp(self):
+        super().setUp()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        override = override_settings(MEDIA_ROOT=directory.name)
+        override.enable()
+        self.addCleanup(override.disable)
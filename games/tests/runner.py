@@ -0,0 +1,31 @@
+import tempfile
+from pathlib import Path
+
+from django.conf import settings
+from django.test.runner import DiscoverRunner
+
+from games import shared_state
+
+
+def _close_shared_state():
+    conn = getattr(shared_state._local, 'connection', None)
+    if conn is not None:
+        conn.close()
+        shared_state._local.connection = None
+
+
+class SharedStateTestRunner(DiscoverRunner):
+    """Lance les tests avec une base d'état partagé temporaire : la vraie n'est jamais touchée"""
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self._shared_state_dir = tempfile.TemporaryDirectory()
+        self._shared_state_db = settings.GAMEFORGE_SHARED_STATE_DB
+        _close_shared_state()
+        settings.GAMEFORGE_SHARED_STATE_DB = Path(self._shared_state_dir.name) / 'shared_state.sqlite3'
+
+    def teardown_test_environment(self, **kwargs):
+        _close_shared_state()
+        settings.GAMEFORGE_SHARED_STATE_DB = self._shared_state_db
+        self._shared_state_dir.cleanup()
+        super().teardown_test_environment(**kwargs)
@@ -0,0 +1,82 @@
+from django.contrib.auth.models import User
+from django.db.models import F
+from django.test import TestCase
+from django.urls import reverse
+
+from games.models import Character, Game
+from games.tests.helpers import IsolatedSharedStateMixin, character_row, make_game
+
+
+class SectionEtagTests(IsolatedSharedStateMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.owner = User.objects.create_user('owner')
+        self.source = make_game(self.owner, is_public=True)
+        Character.objects.create(game=self.source, **character_row("Héros"))
+        self.remix = self.source.remix(User.objects.create_user('fan'))
+        Game.objects.filter(pk=self.remix.pk).update(is_public=True)
+
+    def test_remix_section_etag_follows_source_game(self):
+        url = reverse('api_game_characters', args=[self.remix.pk])
+        etag = self.client.get(url)['ETag']
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        Character.objects.filter(game=self.source).update(name="Renommé")
+        self.source.save()
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['results'][0]['name'], "Renommé")
+
+
+class GameListTests(IsolatedSharedStateMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        owner = User.objects.create_user('owner')
+        self.games = [make_game(owner, title=f"Jeu {index}", is_public=True) for index in range(5)]
+        make_game(owner, title="Privé", is_public=False)
+        self.url = reverse('api_game_list')
+
+    def test_cursor_walks_every_public_game_once(self):
+        titles, url = [], f"{self.url}?limit=2&fields=id,title"
+        while url:
+            payload = self.client.get(url).json()
+            self.assertTrue(all(set(item) == {'id', 'title'} for item in payload['results']))
+            titles.extend(item['title'] for item in payload['results'])
+            url = payload['next']
+        self.assertEqual(titles, [game.title for game in reversed(self.games)])
+
+    def test_invalid_parameters_are_rejected(self):
+        for query in ("cursor=%%%", "limit=beaucoup", "fields=mot_de_passe", "genre=JEU_DE_DAMES"):
+            response = self.client.get(f"{self.url}?{query}")
+            self.assertEqual(response.status_code, 400, query)
+            self.assertIn('error', response.json())
+
+    def test_list_etag_changes_when_a_game_is_updated(self):
+        etag = self.client.get(self.url)['ETag']
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        self.games[0].title = "Renommé"
+        self.games[0].save()
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_views_count_enters_etag_only_when_requested(self):
+        counted, plain = f"{self.url}?fields=id,views_count", f"{self.url}?fields=id,title"
+        counted_response, plain_response = self.client.get(counted), self.client.get(plain)
+        self.assertNotIn('Last-Modified', counted_response)
+        Game.objects.filter(pk=self.games[0].pk).update(views_count=F('views_count') + 1)
+
+        self.assertEqual(self.client.get(counted, HTTP_IF_NONE_MATCH=counted_response['ETag']).status_code, 200)
+        self.assertEqual(self.client.get(plain, HTTP_IF_NONE_MATCH=plain_response['ETag']).status_code, 304)
+
+    def test_detail_etag_follows_views_count(self):
+        url = reverse('api_game_detail', args=[self.games[0].pk])
+        etag = self.client.get(url)['ETag']
+        Game.objects.filter(pk=self.games[0].pk).update(views_count=F('views_count') + 1)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['views_count'], self.games[0].views_count + 1)
+
+    def test_private_game_is_not_found(self):
+        private = Game.objects.get(title="Privé")
+        response = self.client.get(reverse('api_game_detail', args=[private.pk]))
+        self.assertEqual(response.status_code, 404)
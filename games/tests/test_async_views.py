@@ -0,0 +1,75 @@
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.urls import reverse
+
+from games.models import Character, Favorite
+from games.tests.helpers import character_row, make_game
+
+
+class AsyncViewTests(TestCase):
+    """Vues asynchrones servies par l'AsyncClient, comme sous ASGI"""
+
+    def setUp(self):
+        self.owner = User.objects.create_user('owner')
+        self.fan = User.objects.create_user('fan')
+        self.public = make_game(self.owner, title="Public", is_public=True)
+        self.private = make_game(self.owner, title="Privé", is_public=False)
+        Character.objects.create(game=self.public, **character_row("Héros"))
+
+    async def login(self, user):
+        await sync_to_async(self.async_client.force_login)(user)
+
+    async def test_status_reports_generation_progress(self):
+        response = await self.async_client.get(reverse('game_status', args=[self.public.pk]))
+        self.assertEqual(response.status_code, 200)
+        payload = response.json()
+        self.assertEqual((payload['title'], payload['characters_count'], payload['locations_count']),
+                         ("Public", 1, 0))
+        self.assertIsNone(payload['concept_art_character'])
+
+    async def test_private_status_is_only_visible_to_its_creator(self):
+        url = reverse('game_status', args=[self.private.pk])
+        self.assertEqual((await self.async_client.get(url)).status_code, 404)
+        await self.login(self.fan)
+        self.assertEqual((await self.async_client.get(url)).status_code, 404)
+        await self.login(self.owner)
+        self.assertEqual((await self.async_client.get(url)).status_code, 200)
+
+    async def test_login_is_required(self):
+        for url in (reverse('favorites'), reverse('create_game'), reverse('toggle_favorite', args=[self.public.pk])):
+            response = await self.async_client.get(url)
+            self.assertEqual(response.status_code, 302, url)
+            self.assertIn(reverse('login'), response.url)
+
+    async def test_toggle_favorite_adds_then_removes(self):
+        await self.login(self.fan)
+        url = reverse('toggle_favorite', args=[self.public.pk])
+        response = await self.async_client.post(url, headers={'X-Requested-With': 'XMLHttpRequest'})
+        self.assertEqual(response.json(), {'is_favorited': True, 'favorites_count': 1})
+        self.assertTrue(await Favorite.objects.filter(user=self.fan, game=self.public).aexists())
+
+        response = await self.async_client.post(url, headers={'X-Requested-With': 'XMLHttpRequest'})
+        self.assertEqual(response.json(), {'is_favorited': False, 'favorites_count': 0})
+
+    async def test_favorites_page_lists_the_user_favorites(self):
+        await Favorite.objects.acreate(user=self.fan, game=self.public)
+        await self.login(self.fan)
+        response = await self.async_client.get(reverse('favorites'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([favorite.game.title for favorite in response.context['page_obj']], ["Public"])
+
+    async def test_list_pages_show_only_public_games(self):
+        response = await self.async_client.get(reverse('home'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([game.title for game in response.context['recent_games']], ["Public"])
+        self.assertEqual(response.context['total_users'], 2)
+
+        response = await self.async_client.get(reverse('game_list'), {'genre': 'RPG'})
+        self.assertEqual([game.title for game in response.context['games']], ["Public"])
+
+    async def test_create_form_is_rendered(self):
+        await self.login(self.fan)
+        response = await self.async_client.get(reverse('create_game'))
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('form', response.context)
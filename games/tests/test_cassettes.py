@@ -0,0 +1,55 @@
+import tempfile
+
+from django.test import SimpleTestCase, override_settings
+
+from games.providers import (
+    CassetteMiss, CassetteStore, GroqLLMProvider, RecordingLLMProvider, ReplayLLMProvider,
+    get_draft_image_provider, get_image_provider, get_llm_provider,
+)
+
+STAGE_PROFILES = {
+    'default': {'model_name': "gros-modele"},
+    'art_prompts': {'model_name': "petit-modele"},
+}
+
+
+class _Answers(GroqLLMProvider):
+    """Fournisseur Groq sans réseau : répond avec le modèle de l'étape"""
+
+    def generate(self, prompt, stage=None, timeout=None):
+        return f"{self.model_for(stage)}:{prompt}"
+
+
+class CassetteTests(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        self.store = CassetteStore(self.directory)
+
+    def test_replay_uses_the_model_each_stage_was_recorded_with(self):
+        recorder = RecordingLLMProvider(_Answers(api_key="x", stage_profiles=STAGE_PROFILES), self.store)
+        recorder.generate("concept", stage='concept')
+        recorder.generate("prompt", stage='art_prompts')
+
+        with override_settings(AI_CASSETTE_MODE='replay', AI_CASSETTE_DIR=self.directory,
+                               AI_LLM_STAGE_PROFILES=STAGE_PROFILES):
+            replay = get_llm_provider()
+        self.assertIsInstance(replay, ReplayLLMProvider)
+        self.assertEqual(replay.generate("concept", stage='concept'), "gros-modele:concept")
+        self.assertEqual(replay.generate("prompt", stage='art_prompts'), "petit-modele:prompt")
+
+    def test_replay_misses_when_the_stage_model_changed(self):
+        recorder = RecordingLLMProvider(_Answers(api_key="x", stage_profiles=STAGE_PROFILES), self.store)
+        recorder.generate("prompt", stage='art_prompts')
+        replay = ReplayLLMProvider(self.store, stage_profiles={'default': {'model_name': "gros-modele"}})
+        with self.assertRaises(CassetteMiss):
+            replay.generate("prompt", stage='art_prompts')
+
+
+class FakeProviderNameTests(SimpleTestCase):
+    @override_settings(AI_CASSETTE_MODE='off', AI_DRAFT_IMAGE_PROVIDER='fake')
+    def test_each_fake_has_its_own_breaker(self):
+        providers = [get_llm_provider('fake'), get_image_provider('fake'), get_draft_image_provider()]
+        self.assertEqual([provider.name for provider in providers], ["fake-llm", "fake-image", "fake-draft"])
+        self.assertEqual(len({provider.breaker.name for provider in providers}), 3)
@@ -0,0 +1,75 @@
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from games.ai_service import AIGameGenerator
+from games.circuit_breaker import CLOSED, OPEN, CircuitBreaker
+from games.providers import CircuitBreakerLLMProvider, CircuitOpen, FakeImageProvider, FakeLLMProvider
+from games.tests.helpers import IsolatedSharedStateMixin
+
+
+def run_now(func, *args, **kwargs):
+    return func(*args, **kwargs)
+
+
+class CircuitBreakerTests(IsolatedSharedStateMixin, SimpleTestCase):
+    def open_breaker(self, probe):
+        breaker = CircuitBreaker('sonde', probe=probe, failure_threshold=2, reset_timeout=0)
+        for _ in range(2):
+            breaker.record_failure()
+        self.assertEqual(breaker.state, OPEN)
+        return breaker
+
+    def test_failures_open_the_breaker_and_calls_fail_fast(self):
+        provider = CircuitBreakerLLMProvider(FakeLLMProvider(latency=0, error_rate=1.0))
+        for _ in range(provider.breaker.failure_threshold):
+            with self.assertRaises(Exception):
+                provider.generate("prompt", stage='concept')
+        self.assertEqual(provider.breaker.state, OPEN)
+        self.assertFalse(provider.is_available())
+        with self.assertRaises(CircuitOpen):
+            provider.generate("prompt", stage='concept')
+
+    def test_successful_probe_closes_the_breaker(self):
+        breaker = self.open_breaker(probe=lambda: None)
+        with mock.patch('games.circuit_breaker.tasks.submit', run_now):
+            # La requête qui déclenche la sonde n'attend pas son résultat
+            self.assertFalse(breaker.allow_request())
+        self.assertEqual(breaker.state, CLOSED)
+        self.assertTrue(breaker.allow_request())
+
+    def test_failed_probe_reopens_the_breaker(self):
+        def probe():
+            raise RuntimeError("toujours en panne")
+
+        breaker = self.open_breaker(probe)
+        with mock.patch('games.circuit_breaker.tasks.submit', run_now):
+            breaker.allow_request()
+        self.assertEqual(breaker.state, OPEN)
+
+    def test_generator_falls_back_to_templates_while_open(self):
+        provider = CircuitBreakerLLMProvider(FakeLLMProvider(latency=0, error_rate=1.0))
+        for _ in range(provider.breaker.failure_threshold):
+            with self.assertRaises(Exception):
+                provider.generate("prompt", stage='concept')
+        generator = AIGameGenerator(llm=provider, image_provider=FakeImageProvider(size=(8, 8)))
+        self.assertIsNone(generator._generate_with_chain("{sujet}", {'sujet': "donjon"}, stage='concept'))
+
+
+class StreamingBreakerTests(IsolatedSharedStateMixin, SimpleTestCase):
+    def test_failing_streams_open_the_breaker(self):
+        provider = CircuitBreakerLLMProvider(FakeLLMProvider(latency=0, error_rate=1.0))
+        for _ in range(provider.breaker.failure_threshold):
+            with self.assertRaises(Exception):
+                list(provider.stream("prompt", stage='concept'))
+        self.assertEqual(provider.breaker.state, OPEN)
+        with self.assertRaises(CircuitOpen):
+            list(provider.stream("prompt", stage='concept'))
+
+    def test_complete_stream_resets_failures(self):
+        failing = CircuitBreakerLLMProvider(FakeLLMProvider(latency=0, error_rate=1.0))
+        with self.assertRaises(Exception):
+            list(failing.stream("prompt", stage='concept'))
+        provider = CircuitBreakerLLMProvider(FakeLLMProvider(latency=0))
+        self.assertTrue("".join(provider.stream("prompt", stage='concept')))
+        self.assertEqual(provider.breaker._read()[:2], (CLOSED, 0))
@@ -0,0 +1,132 @@
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+
+from games.ai_service import AIGameGenerator
+from games.models import ConceptArtCache, Game, GameContent
+from games.providers import FakeImageProvider, FakeLLMProvider
+from games.tests.helpers import TemporaryMediaMixin, make_game
+
+
+class UnavailableImageProvider(FakeImageProvider):
+    def is_available(self):
+        return False
+
+
+class ConceptArtPromptTests(TestCase):
+    def setUp(self):
+        self.game = make_game(User.objects.create_user('owner'))
+        self.generator = AIGameGenerator(llm=FakeLLMProvider(latency=0), image_provider=UnavailableImageProvider())
+
+    def assertPromptsSaved(self):
+        content = GameContent.objects.get(game=self.game)
+        self.assertTrue(content.concept_art_character_prompt)
+        self.assertTrue(content.concept_art_environment_prompt)
+
+    def test_prompts_are_saved_when_images_are_skipped(self):
+        self.generator.create_concept_art_for_game(self.game)
+        self.assertPromptsSaved()
+
+    def test_prompts_are_saved_when_images_are_skipped_async(self):
+        async_to_sync(self.generator.acreate_concept_art_for_game)(self.game)
+        self.assertPromptsSaved()
+
+
+class ConceptArtCacheTests(TemporaryMediaMixin, TestCase):
+    """Politique de réutilisation : prompts de repli seulement, fichier partagé ou copié"""
+
+    def setUp(self):
+        super().setUp()
+        owner = User.objects.create_user('owner')
+        self.first, self.second = make_game(owner, title="Premier"), make_game(owner, title="Second")
+        self.image_provider = FakeImageProvider(latency=0, size=(8, 8))
+        self.generator = AIGameGenerator(llm=FakeLLMProvider(latency=0), image_provider=self.image_provider)
+        self.prompt = AIGameGenerator._fallback_art_prompts(self.first)[0]
+        self.target = (self.prompt, 'concept_art_character', 'character.png')
+
+    def store(self, game, prompt):
+        image = self.image_provider.text_to_image(prompt)
+        self.generator._store_image(game, 'concept_art_character', 'character.png', image, prompt)
+
+    def test_fallback_prompt_is_reused_by_reference(self):
+        self.store(self.first, self.prompt)
+        entry = ConceptArtCache.objects.get()
+
+        self.assertEqual(self.generator._reuse_cached_art(self.second, [self.target]), [])
+        self.assertEqual(self.second.concept_art_character.name, entry.image.name)
+        self.assertEqual(ConceptArtCache.objects.get().hits, 1)
+
+    def test_copy_mode_duplicates_the_cached_file(self):
+        self.store(self.first, self.prompt)
+        entry = ConceptArtCache.objects.get()
+
+        with override_settings(AI_IMAGE_CACHE={**settings.AI_IMAGE_CACHE, 'mode': 'copy'}):
+            self.generator._reuse_cached_art(self.second, [self.target])
+        field = self.second.concept_art_character
+        self.assertNotEqual(field.name, entry.image.name)
+        with field.open('rb') as copy, entry.image.open('rb') as cached:
+            self.assertEqual(copy.read(), cached.read())
+
+    def test_generated_prompts_are_never_cached(self):
+        prompt = "Chevalier aux ailes de cendre, peinture à l'huile"
+        self.store(self.first, prompt)
+        self.assertFalse(ConceptArtCache.objects.exists())
+        self.assertTrue(self.first.concept_art_character.name)
+
+        target = (prompt, 'concept_art_character', 'character.png')
+        self.assertEqual(self.generator._reuse_cached_art(self.second, [target]), [target])
+
+    def test_entry_without_its_file_is_dropped(self):
+        self.store(self.first, self.prompt)
+        entry = ConceptArtCache.objects.get()
+        entry.image.storage.delete(entry.image.name)
+
+        self.assertEqual(self.generator._reuse_cached_art(self.second, [self.target]), [self.target])
+        self.assertFalse(ConceptArtCache.objects.exists())
+
+
+class FailingImageProvider(FakeImageProvider):
+    def text_to_image(self, prompt, timeout=None):
+        raise RuntimeError("modèle surchargé")
+
+
+class ConceptArtRefinementTests(TemporaryMediaMixin, TestCase):
+    """Aperçu puis rendu complet : l'échange n'écrase jamais une image remplacée entre-temps"""
+
+    PROMPT = "Chevalier aux ailes de cendre, peinture à l'huile"
+
+    def setUp(self):
+        super().setUp()
+        self.game = make_game(User.objects.create_user('owner'))
+        self.generator = AIGameGenerator(llm=FakeLLMProvider(latency=0),
+                                         image_provider=FakeImageProvider(latency=0, size=(8, 8)))
+        draft = FakeImageProvider(latency=0, size=(2, 2)).text_to_image(self.PROMPT)
+        self.generator._attach_draft(self.game, 'concept_art_character', 'character.png', draft)
+        self.game.save()
+        self.draft_name = self.game.concept_art_character.name
+        self.storage = self.game.concept_art_character.storage
+
+    def refine(self, generator=None):
+        refinement = (self.PROMPT, 'concept_art_character', 'character.png', self.draft_name)
+        (generator or self.generator)._refine_concept_art(self.game.pk, [refinement])
+        return Game.objects.get(pk=self.game.pk).concept_art_character.name
+
+    def test_draft_is_swapped_for_the_full_render(self):
+        final = self.refine()
+        self.assertNotEqual(final, self.draft_name)
+        self.assertTrue(self.storage.exists(final))
+        self.assertFalse(self.storage.exists(self.draft_name))
+
+    def test_image_replaced_meanwhile_is_kept(self):
+        Game.objects.filter(pk=self.game.pk).update(concept_art_character='concept_art/manuelle.png')
+        before = self.storage.listdir('concept_art/characters')[1]
+
+        self.assertEqual(self.refine(), 'concept_art/manuelle.png')
+        # Le rendu complet devenu inutile est supprimé aussitôt
+        self.assertEqual(self.storage.listdir('concept_art/characters')[1], before)
+
+    def test_failed_render_keeps_the_draft(self):
+        generator = AIGameGenerator(llm=FakeLLMProvider(latency=0), image_provider=FailingImageProvider(latency=0))
+        self.assertEqual(self.refine(generator), self.draft_name)
+        self.assertTrue(self.storage.exists(self.draft_name))
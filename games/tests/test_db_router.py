@@ -0,0 +1,100 @@
+import tempfile
+import threading
+import time
+from io import StringIO
+from pathlib import Path
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connections
+from django.test import TransactionTestCase, override_settings
+from django.urls import reverse
+
+from games import db_router
+from games.models import Game
+from games.tests.helpers import make_game
+
+REPLICA = 'replica_test'
+
+
+class ReplicaRoutingTests(TransactionTestCase):
+    """Réplica de test : un fichier SQLite recopié depuis la base de test par ``sync_replicas``
+
+    ``TransactionTestCase`` : la copie (API backup de SQLite) attend que la base principale
+    n'ait plus de transaction d'écriture ouverte.
+    """
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = Path(directory.name) / 'replica.sqlite3'
+        # Alias ajouté après la préparation de la classe : la base de test n'en crée pas de copie
+        connections.settings[REPLICA] = connections.configure_settings({
+            'default': connections.settings['default'],
+            REPLICA: {'ENGINE': 'django.db.backends.sqlite3', 'NAME': f"{self.path.as_uri()}?mode=ro",
+                      'OPTIONS': {'timeout': settings.DATABASE_REPLICA_TIMEOUT}},
+        })[REPLICA]
+        self.addCleanup(self._drop_replica)
+        override = override_settings(DATABASE_REPLICAS={REPLICA: self.path}, DATABASE_REPLICA_PIN_SECONDS=10)
+        override.enable()
+        self.addCleanup(override.disable)
+
+        self.owner = User.objects.create_user('owner', password='secret')
+        make_game(self.owner, title="Répliqué", is_public=True)
+        self.sync()
+        make_game(self.owner, title="Pas encore répliqué", is_public=True)
+
+    def _drop_replica(self):
+        connections[REPLICA].close()
+        del connections[REPLICA]
+        del connections.settings[REPLICA]
+
+    def sync(self):
+        call_command('sync_replicas', stdout=StringIO())
+
+    def api_titles(self):
+        return sorted(game['title'] for game in self.client.get(reverse('api_game_list')).json()['results'])
+
+    def test_sync_copies_the_primary_into_the_replica(self):
+        self.assertEqual(list(Game.objects.using(REPLICA).values_list('title', flat=True)), ["Répliqué"])
+        self.sync()
+        self.assertEqual(Game.objects.using(REPLICA).count(), 2)
+
+    def test_page_reads_go_to_the_replica(self):
+        self.assertEqual(self.api_titles(), ["Répliqué"])
+        # Hors requête, tout reste sur la base principale
+        self.assertEqual(Game.objects.count(), 2)
+
+    def test_reads_after_a_write_are_pinned_to_the_primary(self):
+        response = self.client.post(reverse('login'), {'username': 'owner', 'password': 'secret'})
+        self.assertIn(db_router.PIN_COOKIE, response.cookies)
+        self.assertEqual(self.api_titles(), ["Pas encore répliqué", "Répliqué"])
+
+        # Une fois la fenêtre écoulée, le navigateur revient sur le réplica
+        later = time.time() + 11
+        with mock.patch.object(db_router.time, 'time', return_value=later):
+            self.assertEqual(self.api_titles(), ["Répliqué"])
+
+    def test_reader_keeps_working_during_in_place_syncs(self):
+        errors, stop = [], threading.Event()
+
+        def read():
+            try:
+                while not stop.is_set():
+                    Game.objects.using(REPLICA).count()
+            except Exception as e:
+                errors.append(e)
+            finally:
+                connections[REPLICA].close()
+
+        reader = threading.Thread(target=read)
+        reader.start()
+        try:
+            for _ in range(20):
+                self.sync()
+        finally:
+            stop.set()
+            reader.join()
+        self.assertEqual(errors, [])
@@ -0,0 +1,39 @@
+from unittest import mock
+
+from django.test import SimpleTestCase, override_settings
+
+from games.deadline import Deadline
+
+
+@override_settings(AI_STAGE_TIMEOUT_SHARES={'concept': 0.4, 'image': 0.5}, AI_STAGE_MIN_BUDGET={'image': 4})
+class DeadlineTests(SimpleTestCase):
+    def setUp(self):
+        patcher = mock.patch('games.deadline.time.monotonic', return_value=1000.0)
+        self.clock = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.deadline = Deadline(20)
+
+    def advance(self, seconds):
+        self.clock.return_value += seconds
+
+    def test_stage_timeout_is_its_share_of_the_budget(self):
+        self.assertEqual(self.deadline.timeout_for('concept'), 8.0)
+        # Étape sans part configurée : tout le budget
+        self.assertEqual(self.deadline.timeout_for('characters'), 20.0)
+
+    def test_stage_timeout_never_exceeds_the_remaining_time(self):
+        self.advance(17)
+        self.assertEqual(self.deadline.timeout_for('concept'), 3.0)
+
+    def test_optional_stage_needs_its_minimum_budget(self):
+        self.advance(15)
+        self.assertTrue(self.deadline.allows('image'))
+        self.advance(2)
+        self.assertFalse(self.deadline.allows('image'))
+        self.assertTrue(self.deadline.allows('characters'))
+
+    def test_expired_deadline_leaves_no_time(self):
+        self.advance(25)
+        self.assertTrue(self.deadline.expired())
+        self.assertEqual(self.deadline.remaining(), 0.0)
+        self.assertEqual(self.deadline.timeout_for('concept'), 0.0)
@@ -0,0 +1,77 @@
+import tempfile
+import time
+from pathlib import Path
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from games import design_document, shared_state
+from games.models import Game
+from games.tests.helpers import IsolatedSharedStateMixin, make_game
+
+
+class PdfClaimTests(IsolatedSharedStateMixin, TestCase):
+    """202 + Retry-After tant que le PDF n'est pas prêt, un seul rendu par version"""
+
+    def setUp(self):
+        super().setUp()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        override = override_settings(GAME_PDF={**settings.GAME_PDF, 'cache_dir': Path(directory.name)})
+        override.enable()
+        self.addCleanup(override.disable)
+        self.game = make_game(User.objects.create_user('owner'), is_public=True)
+        self.url = reverse('game_pdf', args=[self.game.pk])
+        self.submitted = []
+        patcher = mock.patch('games.design_document.tasks.submit',
+                             lambda func, *args: self.submitted.append((func, args)))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def run_submitted(self):
+        while self.submitted:
+            func, args = self.submitted.pop(0)
+            func(*args)
+
+    def test_missing_pdf_is_rendered_once_then_served(self):
+        for _ in range(2):
+            response = self.client.get(self.url)
+            self.assertEqual(response.status_code, 202)
+            self.assertEqual(response['Retry-After'], str(settings.GAME_PDF['retry_after']))
+        self.assertEqual(len(self.submitted), 1)
+
+        self.run_submitted()
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/pdf')
+        self.assertTrue(b"".join(response.streaming_content).startswith(b"%PDF"))
+
+    def test_new_version_replaces_the_previous_file(self):
+        self.client.get(self.url)
+        self.run_submitted()
+        previous = design_document.cached_path(self.game)
+
+        self.game.title = "Renommé"
+        self.game.save()
+        self.game = Game.objects.get(pk=self.game.pk)
+        self.assertEqual(self.client.get(self.url).status_code, 202)
+        self.run_submitted()
+
+        self.assertTrue(design_document.cached_path(self.game).exists())
+        self.assertFalse(previous.exists())
+
+    def test_stale_claim_is_taken_over(self):
+        key = design_document.cached_path(self.game).name
+        with shared_state.transaction() as conn:
+            conn.execute("INSERT INTO pdf_renders (key, started_at) VALUES (?, ?)",
+                         (key, time.time() - settings.GAME_PDF['render_timeout'] - 1))
+        self.client.get(self.url)
+        self.assertEqual(len(self.submitted), 1)
+
+    def test_private_game_pdf_is_not_found(self):
+        Game.objects.filter(pk=self.game.pk).update(is_public=False)
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+        self.assertEqual(self.submitted, [])
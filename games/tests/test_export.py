@@ -0,0 +1,36 @@
+import json
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from games.tests.helpers import make_game
+
+
+@override_settings(GAME_EXPORT={'chunk_size': 2})
+class ExportViewTests(TestCase):
+    def setUp(self):
+        self.staff = User.objects.create_user('staff', is_staff=True)
+        self.games = [make_game(self.staff, title=f"Jeu {index}", is_public=True) for index in range(5)]
+
+    async def test_asgi_export_streams_one_chunk_per_batch(self):
+        await sync_to_async(self.async_client.force_login)(self.staff)
+        response = await self.async_client.get(reverse('export_games'))
+        self.assertEqual(response.status_code, 200)
+        # Un itérateur synchrone serait d'abord lu en entier par Django
+        self.assertTrue(response.is_async)
+        chunks = [chunk async for chunk in response.streaming_content]
+        self.assertEqual(len(chunks), 3)
+        rows = [json.loads(line) for line in b"".join(chunks).decode().splitlines()]
+        self.assertEqual(sorted(row['title'] for row in rows), [game.title for game in self.games])
+
+    def test_wsgi_export_streams_too(self):
+        self.client.force_login(self.staff)
+        response = self.client.get(reverse('export_games'), {'format': 'jsonl'})
+        self.assertGreater(len(list(response.streaming_content)), 1)
+
+    def test_unknown_format_is_rejected(self):
+        self.client.force_login(self.staff)
+        response = self.client.get(reverse('export_games'), {'format': 'xml'})
+        self.assertEqual(response.status_code, 400)
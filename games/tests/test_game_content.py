@@ -0,0 +1,58 @@
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import TestCase, TransactionTestCase
+
+from games.models import Game, GameContent
+from games.tests.helpers import make_game
+
+
+class GameCreateTests(TestCase):
+    def setUp(self):
+        self.owner = User.objects.create_user('owner')
+
+    def test_content_fields_go_to_their_own_row(self):
+        game = make_game(self.owner, main_story="Il était une fois", cultural_references="Zelda")
+        content = GameContent.objects.get(game=game)
+        self.assertEqual((content.main_story, content.cultural_references), ("Il était une fois", "Zelda"))
+        self.assertEqual(Game.objects.get(pk=game.pk).get_content().main_story, "Il était une fois")
+
+    def test_game_is_not_created_without_its_content(self):
+        with mock.patch.object(GameContent, 'save', side_effect=RuntimeError("disque plein")):
+            with self.assertRaises(RuntimeError):
+                make_game(self.owner)
+        self.assertFalse(Game.objects.exists())
+
+
+class GameContentMigrationTests(TransactionTestCase):
+    """0011 déplace les textes longs dans GameContent, et les remet en place au retour"""
+
+    before = [('games', '0010_game_trending_score')]
+    after = [('games', '0011_game_content')]
+
+    def migrate(self, targets):
+        executor = MigrationExecutor(connection)
+        executor.loader.build_graph()
+        executor.migrate(targets)
+        return executor.loader.project_state(targets).apps
+
+    def tearDown(self):
+        self.migrate(MigrationExecutor(connection).loader.graph.leaf_nodes())
+
+    def test_content_moves_forward_and_back(self):
+        apps = self.migrate(self.before)
+        owner = apps.get_model('auth', 'User').objects.create(username='owner')
+        game = apps.get_model('games', 'Game').objects.create(
+            creator=owner, title="Ancien", description="d", genre='RPG', ambiance='DARK_FANTASY',
+            keywords="donjon", main_story="Il était une fois", concept_art_character_prompt="héros",
+        )
+
+        apps = self.migrate(self.after)
+        content = apps.get_model('games', 'GameContent').objects.get(game_id=game.pk)
+        self.assertEqual((content.main_story, content.concept_art_character_prompt), ("Il était une fois", "héros"))
+
+        apps = self.migrate(self.before)
+        restored = apps.get_model('games', 'Game').objects.get(pk=game.pk)
+        self.assertEqual((restored.main_story, restored.concept_art_character_prompt), ("Il était une fois", "héros"))
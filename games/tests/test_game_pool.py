@@ -0,0 +1,78 @@
+import threading
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+
+from games.models import PooledConcept
+
+
+def pooled(**fields):
+    fields = {'genre': 'RPG', 'ambiance': 'DARK_FANTASY', 'concept': {'game': {'title': "Réserve"}}, **fields}
+    return PooledConcept.objects.create(**fields)
+
+
+class PoolClaimTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('joueur')
+
+    def test_claim_takes_the_oldest_matching_concept(self):
+        newer = pooled()
+        oldest = pooled(created_at=timezone.now() - timedelta(hours=1))
+        pooled(ambiance='CYBERPUNK', created_at=timezone.now() - timedelta(days=1))
+
+        claimed = PooledConcept.claim(self.user, 'RPG', 'DARK_FANTASY')
+        self.assertEqual(claimed.pk, oldest.pk)
+        self.assertEqual(claimed.claimed_by, self.user)
+        self.assertIsNotNone(claimed.claim_token)
+        self.assertEqual(PooledConcept.claim(self.user, 'RPG', 'DARK_FANTASY').pk, newer.pk)
+        self.assertIsNone(PooledConcept.claim(self.user, 'RPG', 'DARK_FANTASY'))
+
+
+class PoolClaimRaceTests(TransactionTestCase):
+    """Réservations simultanées : chaque concept ne part qu'une fois"""
+
+    def test_concurrent_claims_never_share_a_concept(self):
+        users = [User.objects.create_user(f'joueur{index}') for index in range(6)]
+        concepts = {pooled().pk for _ in range(3)}
+        barrier = threading.Barrier(len(users))
+        results, lock = [], threading.Lock()
+
+        def claim(user):
+            barrier.wait()
+            try:
+                concept = PooledConcept.claim(user)
+                with lock:
+                    results.append(concept.pk if concept else None)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=claim, args=(user,)) for user in users]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        claimed = [pk for pk in results if pk is not None]
+        self.assertEqual(len(results), len(users))
+        self.assertEqual(sorted(claimed), sorted(concepts))
+        self.assertEqual(PooledConcept.available().count(), 0)
+
+
+@override_settings(GAME_POOL_CLAIMED_RETENTION_DAYS=7)
+class PoolPurgeTests(TestCase):
+    def test_refill_purges_concepts_claimed_past_the_retention(self):
+        user = User.objects.create_user('joueur')
+        stale = pooled(claimed_by=user, claimed_at=timezone.now() - timedelta(days=8))
+        recent = pooled(claimed_by=user, claimed_at=timezone.now() - timedelta(days=1))
+        available = pooled()
+
+        call_command('refill_game_pool', depth=0, force=True, stdout=StringIO())
+
+        remaining = set(PooledConcept.objects.values_list('pk', flat=True))
+        self.assertEqual(remaining, {recent.pk, available.pk})
+        self.assertNotIn(stale.pk, remaining)
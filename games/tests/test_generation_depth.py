@@ -0,0 +1,80 @@
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from games.ai_service import AIGameGenerator
+from games.models import Game
+from games.providers import FakeImageProvider, FakeLLMProvider
+from games.tests.helpers import TemporaryMediaMixin, make_game
+
+
+class ApiCreditTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('joueur')
+        self.profile = self.user.profile
+        self.profile.daily_api_limit = 5
+        self.profile.api_usage_count = 3
+        self.profile.last_api_reset = timezone.now().date()
+        self.profile.save()
+
+    def test_cost_must_fit_in_the_remaining_credits(self):
+        self.assertTrue(self.profile.can_use_api())
+        self.assertTrue(self.profile.can_use_api(2))
+        self.assertFalse(self.profile.can_use_api(3))
+
+    def test_a_new_day_restores_the_credits(self):
+        self.profile.last_api_reset = timezone.now().date() - timedelta(days=1)
+        self.profile.save()
+        self.assertTrue(self.profile.can_use_api(5))
+        self.profile.refresh_from_db()
+        self.assertEqual(self.profile.api_usage_count, 0)
+
+    def test_depth_beyond_the_remaining_credits_is_refused(self):
+        self.client.force_login(self.user)
+        response = self.client.post(reverse('create_game'), {
+            'genre': 'RPG', 'ambiance': 'DARK_FANTASY', 'keywords': "donjon", 'generation_depth': 'full',
+            'generate_anyway': '1',
+        })
+        self.assertRedirects(response, reverse('dashboard'), fetch_redirect_response=False)
+        self.assertFalse(Game.objects.exists())
+        self.profile.refresh_from_db()
+        self.assertEqual(self.profile.api_usage_count, 3)
+
+
+class GenerationDepthTests(TemporaryMediaMixin, TestCase):
+    """Chaque profondeur ne lance que ses propres étapes"""
+
+    def setUp(self):
+        super().setUp()
+        self.owner = User.objects.create_user('owner')
+        self.generator = AIGameGenerator(llm=FakeLLMProvider(latency=0),
+                                         image_provider=FakeImageProvider(latency=0, size=(8, 8)))
+
+    def complete(self, depth):
+        game = make_game(self.owner, generation_depth=depth)
+        self.generator.complete_game(game)
+        return Game.objects.get(pk=game.pk)
+
+    def test_quick_stops_after_the_concept(self):
+        game = self.complete('quick')
+        self.assertFalse(game.get_characters().exists())
+        self.assertFalse(game.get_locations().exists())
+
+    def test_standard_adds_characters_and_locations_without_images(self):
+        game = self.complete('standard')
+        self.assertTrue(game.get_characters().exists())
+        self.assertTrue(game.get_locations().exists())
+        self.assertFalse(game.concept_art_character)
+
+    def test_full_adds_concept_art(self):
+        game = self.complete('full')
+        self.assertTrue(game.get_characters().exists())
+        self.assertTrue(game.concept_art_character)
+        self.assertTrue(game.concept_art_environment)
+
+    def test_presets_cost_more_as_they_go_deeper(self):
+        costs = [AIGameGenerator.depth_preset(depth)['cost'] for depth in ('quick', 'standard', 'full')]
+        self.assertEqual(costs, sorted(set(costs)))
@@ -0,0 +1,41 @@
+from django.contrib.auth.models import AnonymousUser, User
+from django.http import HttpResponse
+from django.middleware.csrf import get_token
+from django.test import RequestFactory, TestCase
+from django.urls import reverse
+
+from games import http_cache
+from games.tests.helpers import make_game
+
+
+class PageCacheTests(TestCase):
+    def setUp(self):
+        self.owner = User.objects.create_user('owner', password='secret')
+        self.game = make_game(self.owner, is_public=True)
+
+    def test_anonymous_pages_are_public_without_csrf_cookie(self):
+        for url in (reverse('home'), reverse('game_detail', args=[self.game.pk])):
+            response = self.client.get(url)
+            self.assertIn('public', response['Cache-Control'])
+            self.assertNotIn('csrftoken', response.cookies)
+            self.assertNotContains(response, 'name="csrf-token"')
+
+    def test_member_pages_are_private(self):
+        self.client.login(username='owner', password='secret')
+        response = self.client.get(reverse('game_detail', args=[self.game.pk]))
+        self.assertIn('private', response['Cache-Control'])
+        self.assertContains(response, 'name="csrf-token"')
+
+    def test_response_with_csrf_token_is_private(self):
+        request = RequestFactory().get('/')
+        request.user = AnonymousUser()
+        get_token(request)
+        response = http_cache.finalize(request, HttpResponse(), None, None, max_age=60)
+        self.assertIn('private', response['Cache-Control'])
+        self.assertNotIn('public', response['Cache-Control'])
+
+    def test_detail_etag_ignores_view_counter(self):
+        url = reverse('game_detail', args=[self.game.pk])
+        etag = self.client.get(url)['ETag']
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
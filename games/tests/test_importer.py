@@ -0,0 +1,67 @@
+import json
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+
+from games.importer import CreatorMap, RecordError, import_lines
+from games.models import Character, Game, GameContent
+from games.tests.helpers import IsolatedSharedStateMixin, character_row
+
+
+def record(**fields):
+    return json.dumps({'title': "Importé", 'description': "d", 'genre': 'RPG', 'ambiance': 'DARK_FANTASY',
+                       'keywords': ["donjon", "dragon"], 'creator': 'owner', 'main_story': "Histoire",
+                       'characters': [character_row("Héros")], **fields})
+
+
+class ImporterTests(IsolatedSharedStateMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.owner = User.objects.create_user('owner')
+        self.creators = CreatorMap()
+
+    def import_one(self, line, **options):
+        return import_lines([line], self.creators, **options)
+
+    def test_valid_record_is_imported_with_its_rows(self):
+        report = self.import_one(record())
+        self.assertEqual((report.imported, report.characters, report.errors), (1, 1, []))
+        game = Game.objects.get(title="Importé")
+        self.assertEqual(game.creator, self.owner)
+        self.assertEqual(game.keywords, "donjon, dragon")
+        self.assertEqual(GameContent.objects.get(game=game).main_story, "Histoire")
+        self.assertEqual(list(Character.objects.filter(game=game).values_list('name', flat=True)), ["Héros"])
+
+    def test_invalid_records_are_reported_and_skipped(self):
+        lines = [
+            "{pas du json",
+            "[1, 2]",
+            record(genre='JEU_DE_DAMES'),
+            record(title="x" * 500),
+            record(creator='inconnu'),
+            record(characters=[{**character_row("Héros"), 'role': 'FIGURANT'}]),
+            record(created_at="hier"),
+            record(created_at=1700000000),
+            record(created_at="2024-13-45T10:00:00"),
+            record(),
+        ]
+        report = import_lines(lines, self.creators)
+        self.assertEqual(report.read, 10)
+        self.assertEqual(report.imported, 1)
+        self.assertEqual([line for line, _ in report.errors], [1, 2, 3, 4, 5, 6, 7, 8, 9])
+        self.assertIn("genre", report.errors[2][1])
+        self.assertIn("Créateur inconnu : inconnu", report.errors[4][1])
+        self.assertTrue(report.errors[5][1].startswith("characters[0]"))
+        self.assertTrue(all(message.startswith("created_at") for _, message in report.errors[6:9]))
+        self.assertEqual(Game.objects.count(), 1)
+
+    def test_dry_run_writes_nothing(self):
+        report = self.import_one(record(), dry_run=True)
+        self.assertEqual((report.read, report.imported, report.errors), (1, 0, []))
+        self.assertFalse(Game.objects.exists())
+
+    def test_unknown_creators_fall_back_to_the_default(self):
+        report = import_lines([record(creator='ailleurs')], CreatorMap(default='owner'))
+        self.assertEqual(report.imported, 1)
+        with self.assertRaises(RecordError):
+            CreatorMap(default='personne')
@@ -0,0 +1,48 @@
+from django.contrib.auth.models import User
+from django.test import TestCase
+
+from games import near_duplicates
+from games.tests.helpers import make_game
+
+
+class MinHashTests(TestCase):
+    def test_words_ignore_case_accents_and_stop_words(self):
+        self.assertEqual(near_duplicates._words("Le Château des ÉLÉMENTS, pour les mages"),
+                         ['chateau', 'elements', 'mages'])
+
+    def test_signature_is_deterministic(self):
+        tokens = near_duplicates.concept_tokens('RPG', 'DARK_FANTASY', "donjon, dragon")
+        self.assertEqual(near_duplicates.signature(tokens), near_duplicates.signature(set(tokens)))
+
+    def test_estimated_similarity_tracks_jaccard(self):
+        base = {f'kw:mot{i}' for i in range(20)}
+        close = base - {'kw:mot0', 'kw:mot1'} | {'kw:autre0', 'kw:autre1'}   # Jaccard = 18/22
+        unrelated = {f'kw:autre{i}' for i in range(20)}
+        signature = near_duplicates.signature(base)
+        self.assertEqual(near_duplicates.estimated_similarity(signature, signature), 1.0)
+        self.assertGreater(near_duplicates.estimated_similarity(signature, near_duplicates.signature(close)), 0.6)
+        self.assertLess(near_duplicates.estimated_similarity(signature, near_duplicates.signature(unrelated)), 0.2)
+
+    def test_band_keys_cover_the_whole_signature(self):
+        options = near_duplicates._options()
+        keys = near_duplicates.band_keys('c', near_duplicates.signature({'genre:RPG'}))
+        self.assertEqual(len(keys), options['bands'])
+        self.assertTrue(all(key.startswith('c') for key in keys))
+
+
+class FindSimilarTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('owner')
+        self.twin = make_game(self.user, is_public=True, keywords="donjon, dragon, trésor, chevalier")
+        self.other = make_game(self.user, is_public=True, genre='STRATEGY', ambiance='SCI_FI',
+                               keywords="flotte, planète, empire, commerce")
+        self.hidden = make_game(self.user, is_public=False, keywords="donjon, dragon, trésor, chevalier")
+
+    def test_public_near_duplicate_is_found(self):
+        found = near_duplicates.find_similar('RPG', 'DARK_FANTASY', "Dragon, donjon, trésor, chevalier")
+        self.assertEqual([game for game, _ in found], [self.twin])
+        self.assertEqual(found[0][1], 1.0)
+
+    def test_excluded_game_is_not_its_own_duplicate(self):
+        found = near_duplicates.find_similar('RPG', 'DARK_FANTASY', self.twin.keywords, exclude=self.twin.pk)
+        self.assertEqual(found, [])
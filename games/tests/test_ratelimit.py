@@ -0,0 +1,61 @@
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from games import ratelimit, shared_state
+from games.ratelimit import ProviderLimiter, RateLimitExceeded
+from games.tests.helpers import IsolatedSharedStateMixin
+
+
+class TokenBucketTests(IsolatedSharedStateMixin, SimpleTestCase):
+    def test_idle_client_buckets_are_pruned(self):
+        for name in ('api:ip:1', 'api:ip:2', 'groq'):
+            with ProviderLimiter(name, requests_per_minute=60, max_wait=0).slot():
+                pass
+        later = ratelimit.time.time() + ratelimit.BUCKET_REFILL_SECONDS + 1
+        with mock.patch.object(ratelimit.time, 'time', return_value=later):
+            self.assertEqual(ratelimit.prune_idle_buckets('api:'), 2)
+        keys = [row[0] for row in shared_state._connection().execute("SELECT key FROM token_buckets")]
+        self.assertEqual(keys, ['groq:requests'])
+
+    def test_recent_buckets_are_kept(self):
+        limiter = ProviderLimiter('api:ip:1', requests_per_minute=1, max_wait=0)
+        with limiter.slot():
+            pass
+        self.assertEqual(ratelimit.prune_idle_buckets('api:'), 0)
+        with self.assertRaises(RateLimitExceeded):
+            with limiter.slot():
+                pass
+
+    def test_bucket_allows_a_burst_then_refills(self):
+        limiter = ProviderLimiter('groq', requests_per_minute=3, max_wait=0)
+        for _ in range(3):
+            with limiter.slot():
+                pass
+        with self.assertRaises(RateLimitExceeded):
+            with limiter.slot():
+                pass
+        # Un jeton revient toutes les 20 secondes
+        later = ratelimit.time.time() + 21
+        with mock.patch.object(ratelimit.time, 'time', return_value=later):
+            with limiter.slot():
+                pass
+
+    def test_token_bucket_counts_tokens(self):
+        limiter = ProviderLimiter('groq', tokens_per_minute=1000, max_wait=0)
+        with limiter.slot(tokens=700):
+            pass
+        with self.assertRaises(RateLimitExceeded):
+            with limiter.slot(tokens=700):
+                pass
+        with limiter.slot(tokens=200):
+            pass
+
+    def test_in_flight_cap_is_released_after_the_call(self):
+        limiter = ProviderLimiter('groq', max_in_flight=1, max_wait=0)
+        with limiter.slot():
+            with self.assertRaises(RateLimitExceeded):
+                with limiter.slot():
+                    pass
+        with limiter.slot():
+            pass
@@ -0,0 +1,55 @@
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+
+from games import recommendations
+from games.models import Favorite, GameRecommendation
+from games.tests.helpers import IsolatedSharedStateMixin, make_game
+
+
+class RecommendationRefreshTests(IsolatedSharedStateMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        owner = User.objects.create_user('owner')
+        self.a, self.b, self.c, self.d = (make_game(owner, title=title, is_public=True) for title in "ABCD")
+        self.users = [User.objects.create_user(f'joueur{index}') for index in range(3)]
+        self.favorite(0, self.a, self.b)
+        self.favorite(1, self.a, self.b, self.c)
+        self.favorite(2, self.d)
+
+    def favorite(self, user, *games):
+        for game in games:
+            Favorite.objects.create(user=self.users[user], game=game)
+
+    def test_full_refresh_ranks_games_by_shared_favorites(self):
+        recommendations.refresh(full=True)
+        self.assertEqual(recommendations.related_games(self.a), [self.b, self.c])
+        self.assertEqual(recommendations.related_games(self.d), [])
+
+    def test_nothing_to_do_without_new_favorites(self):
+        recommendations.refresh(full=True)
+        self.assertEqual(recommendations.refresh(), 0)
+
+    def test_new_favorite_updates_the_game_and_its_neighbours(self):
+        recommendations.refresh(full=True)
+        self.favorite(2, self.c)
+
+        self.assertGreater(recommendations.refresh(), 0)
+        self.assertIn(self.d, recommendations.related_games(self.c))
+        self.assertIn(self.c, recommendations.related_games(self.d))
+        self.assertEqual(recommendations.related_games(self.a), [self.b, self.c])
+
+    def test_private_games_are_never_recommended(self):
+        self.c.is_public = False
+        self.c.save()
+        recommendations.refresh(full=True)
+        self.assertEqual(recommendations.related_games(self.a), [self.b])
+        self.assertFalse(GameRecommendation.objects.filter(recommended=self.c).exists())
+
+    def test_failed_refresh_keeps_games_marked(self):
+        with mock.patch.object(recommendations, '_write', side_effect=RuntimeError("disque plein")):
+            with self.assertRaises(RuntimeError):
+                recommendations.refresh()
+        self.assertGreater(recommendations.refresh(), 0)
+        self.assertEqual(recommendations.related_games(self.a), [self.b, self.c])
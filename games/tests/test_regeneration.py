@@ -0,0 +1,87 @@
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import User
+from django.core.files.base import ContentFile
+from django.db import IntegrityError
+from django.test import TestCase
+from django.urls import reverse
+
+from games.ai_service import AIGameGenerator
+from games.models import Character, Game, GameContent
+from games.providers import FakeImageProvider, FakeLLMProvider
+from games.tests.helpers import TemporaryMediaMixin, character_row, make_game
+
+
+class RegenerateSectionTests(TemporaryMediaMixin, TestCase):
+    """Régénération d'une partie : l'ancienne version reste en place tant que la nouvelle n'est pas prête"""
+
+    def setUp(self):
+        super().setUp()
+        self.owner = User.objects.create_user('owner')
+        self.game = make_game(self.owner)
+        Character.objects.create(game=self.game, **character_row("Ancien"))
+        self.generator = AIGameGenerator(llm=FakeLLMProvider(latency=0),
+                                         image_provider=FakeImageProvider(latency=0, size=(8, 8)))
+
+    def regenerate(self, section):
+        async_to_sync(self.generator.aregenerate_section)(self.game, section)
+
+    def names(self, game):
+        return list(game.get_characters().values_list('name', flat=True))
+
+    def test_characters_are_replaced(self):
+        before = Game.objects.get(pk=self.game.pk).updated_at
+        self.regenerate('characters')
+        game = Game.objects.get(pk=self.game.pk)
+        self.assertNotIn("Ancien", self.names(game))
+        self.assertTrue(self.names(game))
+        self.assertGreater(game.updated_at, before)
+
+    def test_failed_write_keeps_the_old_rows(self):
+        async def broken_rows(game):
+            return [{**character_row("Nouveau"), 'name': None}]
+
+        self.generator._agenerate_characters_data = broken_rows
+        with self.assertRaises(IntegrityError):
+            self.regenerate('characters')
+        self.assertEqual(self.names(self.game), ["Ancien"])
+
+    def test_remix_gets_its_own_rows_and_leaves_the_source_alone(self):
+        remix = self.game.remix(User.objects.create_user('fan'))
+        async_to_sync(self.generator.aregenerate_section)(remix, 'characters')
+
+        remix.refresh_from_db()
+        self.assertIsNone(remix.characters_source_id)
+        self.assertTrue(Character.objects.filter(game=remix).exists())
+        self.assertEqual(self.names(self.game), ["Ancien"])
+
+    def test_art_is_swapped_and_the_old_file_released(self):
+        self.game.concept_art_character.save("character.png", ContentFile(b"old"), save=True)
+        previous = self.game.concept_art_character.name
+        storage = self.game.concept_art_character.storage
+
+        self.regenerate('concept_art_character')
+        game = Game.objects.get(pk=self.game.pk)
+        self.assertNotEqual(game.concept_art_character.name, previous)
+        self.assertTrue(storage.exists(game.concept_art_character.name))
+        self.assertFalse(storage.exists(previous))
+        # Le prompt manquant a été recréé puis gardé avec le jeu
+        self.assertTrue(GameContent.objects.get(game=self.game).concept_art_character_prompt)
+
+    def test_unknown_section_is_rejected(self):
+        with self.assertRaises(ValueError):
+            self.regenerate('histoire')
+
+
+class RegenerateSectionViewTests(TestCase):
+    def setUp(self):
+        self.owner = User.objects.create_user('owner')
+        self.game = make_game(self.owner)
+
+    def test_only_the_creator_can_regenerate_a_known_section(self):
+        self.client.force_login(User.objects.create_user('fan'))
+        url = reverse('regenerate_section', args=[self.game.pk, 'characters'])
+        self.assertEqual(self.client.post(url).status_code, 404)
+
+        self.client.force_login(self.owner)
+        url = reverse('regenerate_section', args=[self.game.pk, 'histoire'])
+        self.assertEqual(self.client.post(url).status_code, 404)
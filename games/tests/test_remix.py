@@ -0,0 +1,63 @@
+from django.contrib.auth.models import User
+from django.core.files.base import ContentFile
+from django.test import TestCase
+from PIL import Image
+
+from games.ai_service import AIGameGenerator
+from games.models import Character, Location
+from games.providers import FakeImageProvider, FakeLLMProvider
+from games.tests.helpers import character_row, make_game
+
+
+class RemixCopyOnWriteTests(TestCase):
+    def setUp(self):
+        self.owner = User.objects.create_user('owner')
+        self.fan = User.objects.create_user('fan')
+        self.source = make_game(self.owner)
+        Character.objects.create(game=self.source, **character_row("Héros"))
+        Location.objects.create(game=self.source, name="Salle", description="d", atmosphere="a",
+                                gameplay_significance="g")
+
+    def test_remix_shares_rows_until_written(self):
+        remix = self.source.remix(self.fan)
+        self.assertEqual(remix.characters_source_id, self.source.pk)
+        self.assertEqual(list(remix.get_characters().values_list('name', flat=True)), ["Héros"])
+        self.assertFalse(Character.objects.filter(game=remix).exists())
+
+    def test_remix_keeps_rows_when_source_regenerates(self):
+        remix = self.source.remix(self.fan)
+        AIGameGenerator._replace_rows(self.source, 'characters', Character, [character_row("Nouveau")])
+
+        remix.refresh_from_db()
+        self.assertIsNone(remix.characters_source_id)
+        self.assertEqual(list(remix.get_characters().values_list('name', flat=True)), ["Héros"])
+        self.assertEqual(list(self.source.get_characters().values_list('name', flat=True)), ["Nouveau"])
+        # Les lieux, non régénérés, restent partagés
+        self.assertEqual(remix.locations_source_id, self.source.pk)
+
+    def test_remix_of_remix_points_to_row_owner(self):
+        remix = self.source.remix(self.fan)
+        second = remix.remix(self.owner)
+        self.assertEqual(second.characters_source_id, self.source.pk)
+
+    def test_remix_keeps_rows_when_source_is_deleted(self):
+        remix = self.source.remix(self.fan)
+        self.source.delete()
+        remix.refresh_from_db()
+        self.assertEqual(list(remix.get_characters().values_list('name', flat=True)), ["Héros"])
+
+    def test_remix_keeps_art_file_when_source_swaps_it(self):
+        generator = AIGameGenerator(llm=FakeLLMProvider(), image_provider=FakeImageProvider(size=(8, 8)))
+        self.source.concept_art_character.save("character.png", ContentFile(b"old"), save=True)
+        previous = self.source.concept_art_character.name
+        remix = self.source.remix(self.fan)
+        storage = self.source.concept_art_character.storage
+        try:
+            generator._swap_art(self.source, 'concept_art_character', Image.new('RGB', (8, 8)), "prompt")
+            remix.refresh_from_db()
+            self.assertEqual(remix.concept_art_character.name, previous)
+            self.assertNotEqual(self.source.concept_art_character.name, previous)
+            self.assertTrue(storage.exists(previous))
+        finally:
+            storage.delete(previous)
+            storage.delete(self.source.concept_art_character.name)
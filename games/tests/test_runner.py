@@ -0,0 +1,7 @@
+from django.conf import settings
+from django.test import SimpleTestCase
+
+
+class SharedStateRunnerTests(SimpleTestCase):
+    def test_suite_never_uses_the_real_shared_state(self):
+        self.assertNotEqual(settings.GAMEFORGE_SHARED_STATE_DB, settings.BASE_DIR / 'shared_state.sqlite3')
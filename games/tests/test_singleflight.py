@@ -0,0 +1,64 @@
+import threading
+import time
+
+from django.test import SimpleTestCase, override_settings
+
+from games import singleflight
+from games.tests.helpers import IsolatedSharedStateMixin
+
+FAST = {'enabled': True, 'wait': 5, 'result_ttl': 5, 'lease_timeout': 30, 'poll_interval': 0.01}
+
+
+@override_settings(AI_SINGLE_FLIGHT=FAST)
+class SingleFlightTests(IsolatedSharedStateMixin, SimpleTestCase):
+    def test_keys_hash_the_exact_prompt(self):
+        self.assertEqual(singleflight.make_key("concept", "Un Donjon"), singleflight.make_key("concept", "Un Donjon"))
+        self.assertNotEqual(singleflight.make_key("concept", "Un Donjon"), singleflight.make_key("concept", "un donjon"))
+
+    def test_concurrent_callers_share_one_call(self):
+        calls = []
+
+        def slow_call():
+            calls.append(1)
+            time.sleep(0.2)
+            return "réponse"
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(singleflight.do("clé", slow_call)))
+                   for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(results, ["réponse"] * 4)
+        self.assertEqual(len(calls), 1)
+
+    def test_follower_takes_over_when_the_leader_fails(self):
+        leader_joined, release_leader = threading.Event(), threading.Event()
+        outcome = {}
+
+        def failing_call():
+            leader_joined.set()
+            release_leader.wait(5)
+            raise RuntimeError("fournisseur en panne")
+
+        def leader():
+            try:
+                singleflight.do("clé", failing_call)
+            except RuntimeError as e:
+                outcome['leader'] = e
+
+        def follower():
+            outcome['follower'] = singleflight.do("clé", lambda: "reprise")
+
+        threads = [threading.Thread(target=leader)]
+        threads[0].start()
+        leader_joined.wait(5)
+        threads.append(threading.Thread(target=follower))
+        threads[1].start()
+        time.sleep(0.05)
+        release_leader.set()
+        for thread in threads:
+            thread.join()
+        self.assertIsInstance(outcome['leader'], RuntimeError)
+        self.assertEqual(outcome['follower'], "reprise")
@@ -0,0 +1,52 @@
+import tempfile
+from pathlib import Path
+
+from django.db import connections
+from django.db.backends.sqlite3.base import DatabaseWrapper
+from django.test import SimpleTestCase, override_settings
+
+from games import sqlite
+
+PRAGMAS = {'journal_mode': 'wal', 'synchronous': 'normal', 'busy_timeout': 5000, 'temp_store': 'memory'}
+
+
+@override_settings(SQLITE_PROFILE='production', SQLITE_PRODUCTION_PRAGMAS=PRAGMAS)
+class ProductionProfileTests(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = Path(directory.name) / 'base.sqlite3'
+
+    def open(self, alias, **settings_dict):
+        connection = DatabaseWrapper({**connections['default'].settings_dict, 'NAME': str(self.path),
+                                      'OPTIONS': {}, **settings_dict}, alias)
+        connection.ensure_connection()
+        self.addCleanup(connection.close)
+        return connection
+
+    def pragma(self, connection, name):
+        with connection.cursor() as cursor:
+            cursor.execute(f"PRAGMA {name}")
+            return cursor.fetchone()[0]
+
+    def test_new_connections_receive_the_profile(self):
+        connection = self.open('profil')
+        self.assertEqual(self.pragma(connection, 'journal_mode'), 'wal')
+        self.assertEqual(self.pragma(connection, 'synchronous'), 1)
+        self.assertEqual(self.pragma(connection, 'busy_timeout'), 5000)
+        self.assertEqual(self.pragma(connection, 'temp_store'), 2)
+        # Posé par Django lui-même sur chaque connexion SQLite
+        self.assertEqual(self.pragma(connection, 'foreign_keys'), 1)
+        self.assertEqual(sqlite.effective_pragmas(connection)['busy_timeout'], 5000)
+
+    def test_replica_keeps_its_own_timeout(self):
+        self.open('profil').close()
+        with override_settings(DATABASE_REPLICAS={'replica_test': self.path}):
+            replica = self.open('replica_test', NAME=f"{self.path.as_uri()}?mode=ro", OPTIONS={'timeout': 20})
+            self.assertEqual(self.pragma(replica, 'busy_timeout'), 20000)
+            self.assertEqual(self.pragma(replica, 'journal_mode'), 'wal')
+
+    @override_settings(SQLITE_PROFILE='default')
+    def test_default_profile_leaves_connections_alone(self):
+        connection = self.open('profil')
+        self.assertEqual(self.pragma(connection, 'journal_mode'), 'delete')
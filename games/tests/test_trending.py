@@ -0,0 +1,53 @@
+import math
+import time
+
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+
+from games import trending
+from games.models import Game
+from games.tests.helpers import IsolatedSharedStateMixin, make_game
+
+HALF_LIFE_HOURS = 48
+HALF_LIFE = HALF_LIFE_HOURS * 3600
+
+
+@override_settings(GAME_TRENDING={'half_life_hours': HALF_LIFE_HOURS, 'weights': {'view': 1.0, 'favorite': 5.0},
+                                  'batch_size': 2, 'home_count': 6})
+class TrendingDecayTests(IsolatedSharedStateMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        user = User.objects.create_user('owner')
+        self.fresh = make_game(user, title="Récent")
+        self.old = make_game(user, title="Ancien")
+        self.now = time.time()
+
+    def score(self, game):
+        return Game.objects.get(pk=game.pk).trending_score
+
+    def test_an_event_loses_half_its_weight_per_half_life(self):
+        trending.record(self.fresh.pk, trending.VIEW, at=self.now)
+        trending.record(self.old.pk, trending.VIEW, at=self.now - HALF_LIFE)
+        self.assertEqual(trending.process(), 2)
+        self.assertAlmostEqual(self.score(self.fresh) - self.score(self.old), math.log(2), places=6)
+
+    def test_old_favorite_ranks_below_recent_views(self):
+        # 5 × 2^-3 = 0,625 contre 2 vues récentes
+        trending.record(self.old.pk, trending.FAVORITE, at=self.now - 3 * HALF_LIFE)
+        for _ in range(2):
+            trending.record(self.fresh.pk, trending.VIEW, at=self.now)
+        trending.process()
+        ranking = list(Game.objects.order_by('-trending_score').values_list('pk', flat=True))
+        self.assertEqual(ranking, [self.fresh.pk, self.old.pk])
+
+    def test_batches_add_up_to_a_single_pass(self):
+        moments = [self.now - 3600 * hours for hours in (0, 5, 30, 90, 200)]
+        for moment in moments:
+            trending.record(self.fresh.pk, trending.VIEW, at=moment)
+        # batch_size = 2 : trois lots
+        self.assertEqual(trending.process(), len(moments))
+        for moment in moments:
+            trending.record(self.old.pk, trending.VIEW, at=moment)
+        self.assertEqual(trending.process(batch_size=100), len(moments))
+        self.assertAlmostEqual(self.score(self.fresh), self.score(self.old), places=6)
+        self.assertEqual(trending.process(), 0)
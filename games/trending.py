@@ -0,0 +1,102 @@
+"""
+Classement « tendances » des jeux avec décroissance exponentielle.
+
+Une vue ou un favori de poids ``w`` survenu à l'instant ``t`` vaut
+``w·e^(-λ·(maintenant - t))``, avec ``λ = ln 2 / demi-vie``. Le facteur
+``e^(-λ·maintenant)`` est commun à tous les jeux : il suffit donc de stocker
+``log Σ w·e^(λ·t)`` (``Game.trending_score``), qui ne change qu'à l'arrivée
+d'un nouvel événement et se trie directement via un index. Les événements
+sont tamponnés dans la base partagée (``games.shared_state``) au fil des
+requêtes, puis ajoutés aux scores par ``process_trending_events``.
+"""
+import math
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.db.models import Count
+
+from . import http_cache, shared_state
+from .models import Game
+
+shared_state.register_schema(
+    "CREATE TABLE IF NOT EXISTS trending_events ("
+    " id INTEGER PRIMARY KEY AUTOINCREMENT, game_id INTEGER NOT NULL, kind TEXT NOT NULL, at REAL NOT NULL)"
+)
+
+VIEW = "view"
+FAVORITE = "favorite"
+
+
+def _options():
+    return settings.GAME_TRENDING
+
+
+def _rate():
+    """λ en s⁻¹"""
+    return math.log(2) / (_options()['half_life_hours'] * 3600)
+
+
+def log_weight(weight, at):
+    return math.log(weight) + _rate() * at
+
+
+def _logaddexp(a, b):
+    high, low = max(a, b), min(a, b)
+    return high + math.log1p(math.exp(low - high))
+
+
+def record(game_id, kind, at=None):
+    """Tamponne un événement ; rien n'est écrit dans la table des jeux"""
+    with shared_state.transaction() as conn:
+        conn.execute(
+            "INSERT INTO trending_events (game_id, kind, at) VALUES (?, ?, ?)",
+            (game_id, kind, time.time() if at is None else at),
+        )
+
+
+def process(batch_size=None):
+    """Ajoute les événements tamponnés aux scores ; renvoie le nombre d'événements traités"""
+    batch_size = batch_size or _options()['batch_size']
+    weights = _options()['weights']
+    processed = 0
+    while True:
+        with shared_state.transaction() as conn:
+            events = conn.execute(
+                "SELECT id, game_id, kind, at FROM trending_events ORDER BY id LIMIT ?", (batch_size,)
+            ).fetchall()
+        if not events:
+            if processed:
+                # Le classement affiché sur l'accueil et les listes a changé
+                http_cache.bump()
+            return processed
+
+        increments = defaultdict(lambda: -math.inf)
+        for _, game_id, kind, at in events:
+            if weights.get(kind):
+                increments[game_id] = _logaddexp(increments[game_id], log_weight(weights[kind], at))
+
+        games = list(Game.objects.filter(pk__in=list(increments)).only('pk', 'trending_score'))
+        for game in games:
+            game.trending_score = _logaddexp(game.trending_score, increments[game.pk])
+        # bulk_update ne touche pas updated_at : la tendance ne modifie pas le contenu du jeu
+        Game.objects.bulk_update(games, ['trending_score'], batch_size=500)
+
+        # Retirés seulement une fois appliqués : un échec les laisse pour le passage suivant
+        with shared_state.transaction() as conn:
+            conn.execute("DELETE FROM trending_events WHERE id <= ?", (events[-1][0],))
+        processed += len(events)
+
+
+def seed():
+    """Score initial à partir des compteurs existants, daté de la création de chaque jeu"""
+    weights = _options()['weights']
+    games = list(
+        Game.objects.annotate(favorites=Count('favorited_by')).only('pk', 'created_at', 'views_count')
+    )
+    for game in games:
+        total = game.views_count * weights[VIEW] + game.favorites * weights[FAVORITE]
+        game.trending_score = log_weight(total, game.created_at.timestamp()) if total else 0.0
+    Game.objects.bulk_update(games, ['trending_score'], batch_size=500)
+    http_cache.bump()
+    return len(games)
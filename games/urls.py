@@ -1,13 +1,14 @@
 from django.urls import path
 from django.contrib.auth import views as auth_views
-from django.views.generic import TemplateView
-from . import views
+from . import api, views
 
 urlpatterns = [
     # Pages principales
     path('', views.HomeView.as_view(), name='home'),
     path('games/', views.GameListView.as_view(), name='game_list'),
     path('games/<int:pk>/', views.GameDetailView.as_view(), name='game_detail'),
+    path('games/<int:pk>/status/', views.game_status_view, name='game_status'),
+    path('games/<int:pk>/pdf/', views.game_pdf_view, name='game_pdf'),
     
     # Authentification
     path('signup/', views.signup_view, name='signup'),
@@ -22,11 +23,22 @@ urlpatterns = [
     path('create/', views.create_game_view, name='create_game'),
     path('games/<int:pk>/edit/', views.edit_game_view, name='edit_game'),
     path('games/<int:pk>/delete/', views.delete_game_view, name='delete_game'),
+    path('games/<int:pk>/regenerate/<str:section>/', views.regenerate_section_view, name='regenerate_section'),
+    path('games/<int:pk>/remix/', views.remix_game_view, name='remix_game'),
     
     # Favoris
     path('favorites/', views.favorites_view, name='favorites'),
     path('games/<int:pk>/toggle-favorite/', views.toggle_favorite_view, name='toggle_favorite'),
     
+
+    # Export du catalogue (staff)
+    path('exports/games/', views.export_games_view, name='export_games'),
+
+    # API publique en lecture seule
+    path('api/v1/games/', api.game_list, name='api_game_list'),
+    path('api/v1/games/<int:pk>/', api.game_detail, name='api_game_detail'),
+    path('api/v1/games/<int:pk>/characters/', api.game_characters, name='api_game_characters'),
+    path('api/v1/games/<int:pk>/locations/', api.game_locations, name='api_game_locations'),
     
     # Réinitialisation de mot de passe
     path('password-reset/', 
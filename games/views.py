@@ -1,45 +1,115 @@
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth import login
+from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth.decorators import login_required
-from django.contrib.auth.mixins import LoginRequiredMixin
+from django.contrib.auth.views import redirect_to_login
 from django.contrib import messages
-from django.views.generic import ListView, DetailView, CreateView, UpdateView
-from django.db.models import Q
-from django.http import JsonResponse, Http404
+from django.views import View
+from django.views.generic import DetailView
+from django.db.models import Count, F, Max, Q
+from django.http import FileResponse, JsonResponse, Http404, StreamingHttpResponse
+from django.core.handlers.asgi import ASGIRequest
 from django.core.paginator import Paginator
-from django.urls import reverse_lazy
-from django.views.decorators.csrf import csrf_exempt
+from django.utils.text import slugify
 from django.middleware.csrf import get_token
 
-from .models import Game, Character, Location, Favorite, UserProfile
+from .models import Game, Favorite, UserProfile
 from .forms import CustomUserCreationForm, GameCreationForm, GameUpdateForm, UserProfileForm, GameSearchForm
+from . import design_document, export, http_cache, near_duplicates, recommendations, trending
 from .ai_service import AIGameGenerator
+from .deadline import Deadline
+
+
+# --------------------
+# Utilitaires pour les vues asynchrones
+# --------------------
+def async_login_required(view_func):
+    """Équivalent de login_required pour les vues asynchrones"""
+    @wraps(view_func)
+    async def _wrapped_view(request, *args, **kwargs):
+        # request.user est chargé paresseusement (requête synchrone) : on le résout dans un thread
+        if not await sync_to_async(lambda: request.user.is_authenticated)():
+            return redirect_to_login(request.get_full_path())
+        return await view_func(request, *args, **kwargs)
+    return _wrapped_view
+
+
+async def _aget_object_or_404(queryset, **kwargs):
+    try:
+        return await queryset.aget(**kwargs)
+    except queryset.model.DoesNotExist:
+        raise Http404("Aucun objet ne correspond à la requête.")
+
+
+async def _apaginate(queryset, page_number, per_page):
+    """Pagine un queryset avec l'ORM asynchrone ; la page renvoyée est déjà évaluée"""
+    paginator = Paginator(queryset, per_page)
+    paginator.count = await queryset.acount()
+    page = paginator.get_page(page_number)
+    page.object_list = [obj async for obj in page.object_list]
+    return page
+
+
+def _list_validators(request, queryset):
+    """Validateurs d'une page de liste : jeux listés, paramètres et version globale"""
+    state = queryset.aggregate(updated_at=Max('updated_at'), total=Count('pk'))
+    return http_cache.validators(request, request.get_full_path(), state['total'], updated_at=state['updated_at'])
+
+
+def _page_context(page, object_name):
+    return {
+        object_name: page.object_list,
+        'page_obj': page,
+        'paginator': page.paginator,
+        'is_paginated': page.has_other_pages(),
+    }
 
 
-class HomeView(ListView):
-    model = Game
+async def _arender(request, template_name, context=None):
+    # Le rendu peut encore déclencher des requêtes paresseuses (créateur, session...)
+    return await sync_to_async(render)(request, template_name, context)
+
+
+class ConditionalListView(View):
+    """Liste de jeux publics : 304 si rien n'a changé, mise en cache courte pour les anonymes"""
+
+    async def get(self, request, *args, **kwargs):
+        etag, last_modified = await sync_to_async(_list_validators)(request, self.get_queryset())
+        response = http_cache.not_modified(request, etag, last_modified) or await self._render(request)
+        return await sync_to_async(http_cache.finalize)(
+            request, response, etag, last_modified, max_age=settings.GAMEFORGE_PAGE_CACHE['list_max_age']
+        )
+
+
+class HomeView(ConditionalListView):
     template_name = 'games/home.html'
-    context_object_name = 'recent_games'
     paginate_by = 6
 
     def get_queryset(self):
-        return Game.objects.filter(is_public=True).order_by('-created_at')
+        return Game.objects.filter(is_public=True).select_related('creator').order_by('-created_at')
 
-    def get_context_data(self, **kwargs):
-        context = super().get_context_data(**kwargs)
-        context['total_games'] = Game.objects.filter(is_public=True).count()
-        context['total_users'] = UserProfile.objects.count()
-        return context
+    async def _render(self, request):
+        page = await _apaginate(self.get_queryset(), request.GET.get('page'), self.paginate_by)
+        context = _page_context(page, 'recent_games')
+        context['trending_games'] = [
+            game async for game in Game.objects.filter(is_public=True, trending_score__gt=0)
+            .select_related('creator').order_by('-trending_score')[:settings.GAME_TRENDING['home_count']]
+        ]
+        context['total_games'] = page.paginator.count
+        context['total_users'] = await UserProfile.objects.acount()
+        return await _arender(request, self.template_name, context)
 
 
-class GameListView(ListView):
-    model = Game
+class GameListView(ConditionalListView):
     template_name = 'games/game_list.html'
-    context_object_name = 'games'
     paginate_by = 12
 
     def get_queryset(self):
-        queryset = Game.objects.filter(is_public=True)
+        queryset = Game.objects.filter(is_public=True).select_related('creator')
         form = GameSearchForm(self.request.GET)
         
         if form.is_valid():
@@ -76,10 +146,11 @@ class GameListView(ListView):
 
         return queryset
 
-    def get_context_data(self, **kwargs):
-        context = super().get_context_data(**kwargs)
-        context['search_form'] = GameSearchForm(self.request.GET)
-        return context
+    async def _render(self, request):
+        page = await _apaginate(self.get_queryset(), request.GET.get('page'), self.paginate_by)
+        context = _page_context(page, 'games')
+        context['search_form'] = GameSearchForm(request.GET)
+        return await _arender(request, self.template_name, context)
 
 
 class GameDetailView(DetailView):
@@ -87,26 +158,41 @@ class GameDetailView(DetailView):
     template_name = 'games/game_detail.html'
     context_object_name = 'game'
 
-    def get_object(self):
-        game = get_object_or_404(Game, pk=self.kwargs['pk'])
-        
+    def get(self, request, *args, **kwargs):
+        """Page du jeu, validée par ``updated_at`` : le compteur de vues affiché n'entre pas dans l'ETag
+
+        Chaque visite l'incrémente ; l'inclure changerait l'ETag à chaque requête et aucune copie
+        ne serait jamais réutilisée. Le compteur d'une copie en cache peut donc être en retard.
+        """
+        # Seules les colonnes utiles aux validateurs : un 304 ne charge rien d'autre
+        game = get_object_or_404(Game.objects.only('is_public', 'creator_id', 'updated_at'), pk=self.kwargs['pk'])
+
         # Vérifier si le jeu est public ou si l'utilisateur est le créateur
-        if not game.is_public and (not self.request.user.is_authenticated or game.creator != self.request.user):
+        if not game.is_public and (not request.user.is_authenticated or game.creator_id != request.user.pk):
             raise Http404("Ce jeu n'est pas accessible.")
-        
-        # Incrémenter le compteur de vues
-        game.views_count += 1
-        game.save(update_fields=['views_count'])
-        
-        return game
+
+        is_favorited = request.user.is_authenticated and Favorite.objects.filter(user=request.user, game=game).exists()
+        etag, last_modified = http_cache.validators(request, game.pk, is_favorited, updated_at=game.updated_at)
+
+        # Incrémenter le compteur de vues, y compris quand le navigateur réutilise sa copie
+        Game.objects.filter(pk=game.pk).update(views_count=F('views_count') + 1)
+        trending.record(game.pk, trending.VIEW)
+
+        response = http_cache.not_modified(request, etag, last_modified) or super().get(request, *args, **kwargs)
+        return http_cache.finalize(request, response, etag, last_modified)
+
+    def get_object(self):
+        return get_object_or_404(Game.objects.select_related('content'), pk=self.kwargs['pk'])
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
+        context['content'] = self.object.get_content()
         if self.request.user.is_authenticated:
             context['is_favorited'] = Favorite.objects.filter(
                 user=self.request.user,
                 game=self.object
             ).exists()
+        context['related_games'] = recommendations.related_games(self.object)
         return context
 
 
@@ -125,74 +211,191 @@ def dashboard_view(request):
     return render(request, 'games/dashboard.html', context)
 
 
-@login_required
-def create_game_view(request):
-    if not request.user.profile.can_use_api():
+@async_login_required
+async def create_game_view(request):
+    profile = await UserProfile.objects.aget(user=request.user)
+    if not await sync_to_async(profile.can_use_api)():
         messages.error(request, "Vous avez atteint votre limite quotidienne de génération de jeux.")
         return redirect('dashboard')
 
-    if request.method == 'POST':
+    if request.method == 'POST' and 'random' in request.POST:
+        # Génération aléatoire : concept pris dans la réserve pré-générée, sans validation du formulaire
+        genre = request.POST.get('genre')
+        ambiance = request.POST.get('ambiance')
+        # Un jeu aléatoire est complet (personnages, lieux et concept art)
+        cost = AIGameGenerator.depth_preset('full')['cost']
+        if not await sync_to_async(profile.can_use_api)(cost):
+            messages.error(request, "Crédits quotidiens insuffisants pour cette profondeur de génération.")
+            return redirect('dashboard')
+        try:
+            generator = AIGameGenerator(deadline=Deadline.for_profile('interactive'), defer_images=True)
+            game = await generator.acreate_random_game(
+                request.user,
+                genre=genre if genre in dict(Game.GENRE_CHOICES) else None,
+                ambiance=ambiance if ambiance in dict(Game.AMBIANCE_CHOICES) else None,
+            )
+            await sync_to_async(profile.increment_api_usage)(cost)
+            messages.success(request, f"Le jeu '{game.title}' a été généré avec succès !")
+            return redirect('game_detail', pk=game.pk)
+        except Exception as e:
+            messages.error(request, f"Erreur lors de la génération : {str(e)}")
+            form = GameCreationForm()
+
+    elif request.method == 'POST':
         form = GameCreationForm(request.POST)
-        if form.is_valid():
-            # Vérifier à nouveau la limite API
-            if not request.user.profile.can_use_api():
-                messages.error(request, "Vous avez atteint votre limite quotidienne de génération de jeux.")
+        if await sync_to_async(form.is_valid)():
+            depth = form.cleaned_data['generation_depth']
+            preset = AIGameGenerator.depth_preset(depth)
+
+            # Un concept public quasi identique existe peut-être déjà : le proposer avant de dépenser des crédits
+            if near_duplicates.enabled() and 'generate_anyway' not in request.POST:
+                similar_games = await sync_to_async(near_duplicates.find_similar)(
+                    form.cleaned_data['genre'], form.cleaned_data['ambiance'], form.cleaned_data['keywords']
+                )
+                if similar_games:
+                    return await _arender(request, 'games/create_game.html', {
+                        'form': form,
+                        'similar_games': similar_games,
+                        'csrf_token': get_token(request),
+                    })
+
+            # Vérifier à nouveau la limite API, au coût de la profondeur choisie
+            await profile.arefresh_from_db()
+            if not await sync_to_async(profile.can_use_api)(preset['cost']):
+                messages.error(request, "Crédits quotidiens insuffisants pour cette profondeur de génération.")
                 return redirect('dashboard')
 
             try:
-                # Générer le jeu avec l'IA
-                generator = AIGameGenerator()
-                
-                if 'random' in request.POST:
-                    # Génération aléatoire
-                    game_data = generator.generate_random_game()
-                else:
-                    # Génération basée sur les paramètres du formulaire
-                    game_data = generator.generate_game(
-                        genre=form.cleaned_data['genre'],
-                        ambiance=form.cleaned_data['ambiance'],
-                        keywords=form.cleaned_data['keywords'],
-                        cultural_references=form.cleaned_data['cultural_references']
-                    )
+                # Générer le jeu avec l'IA, dans le budget de temps de la profondeur (aperçus d'abord)
+                generator = AIGameGenerator(
+                    deadline=Deadline.for_profile(preset['deadline']), defer_images=True, progressive=True
+                )
+                game_data = await generator.agenerate_game(
+                    genre=form.cleaned_data['genre'],
+                    ambiance=form.cleaned_data['ambiance'],
+                    keywords=form.cleaned_data['keywords'],
+                    cultural_references=form.cleaned_data['cultural_references']
+                )
 
                 # Créer le jeu
-                game = Game.objects.create(
+                game = await Game.objects.acreate(
                     creator=request.user,
+                    generation_depth=depth,
                     **game_data
                 )
                 
-                generator.create_characters_for_game(game)
-                generator.create_locations_for_game(game)
-                generator.create_concept_art_for_game(game)
+                # Personnages, lieux et concept art selon la profondeur choisie
+                await generator.acomplete_game(game)
 
-                # Incrémenter l'utilisation de l'API
-                request.user.profile.increment_api_usage()
+                # Décompter les crédits de l'API
+                await sync_to_async(profile.increment_api_usage)(preset['cost'])
 
                 messages.success(request, f"Le jeu '{game.title}' a été généré avec succès !")
                 return redirect('game_detail', pk=game.pk)
 
             except Exception as e:
                 messages.error(request, f"Erreur lors de la génération : {str(e)}")
-                return render(request, 'games/create_game.html', {'form': form})
+                return await _arender(request, 'games/create_game.html', {'form': form})
     else:
         form = GameCreationForm()
 
     # S'assurer que le token CSRF est disponible
     csrf_token = get_token(request)
-    return render(request, 'games/create_game.html', {'form': form, 'csrf_token': csrf_token})
+    return await _arender(request, 'games/create_game.html', {'form': form, 'csrf_token': csrf_token})
 
 
-@login_required
-def toggle_favorite_view(request, pk):
+@async_login_required
+async def regenerate_section_view(request, pk, section):
+    """Régénère une seule partie (personnages, lieux ou une image) d'un jeu du créateur"""
+    if section not in AIGameGenerator.REGENERABLE_SECTIONS:
+        raise Http404("Section inconnue.")
+    game = await _aget_object_or_404(Game.objects.select_related('content'), pk=pk, creator=request.user)
+    if request.method != 'POST':
+        return redirect('game_detail', pk=pk)
+
+    cost = settings.GAME_REGENERATION_COSTS[section]
+    profile = await UserProfile.objects.aget(user=request.user)
+    if not await sync_to_async(profile.can_use_api)(cost):
+        messages.error(request, "Crédits quotidiens insuffisants pour cette régénération.")
+        return redirect('game_detail', pk=pk)
+
+    try:
+        generator = AIGameGenerator(deadline=Deadline.for_profile('interactive'))
+        await generator.aregenerate_section(game, section)
+        await sync_to_async(profile.increment_api_usage)(cost)
+        messages.success(request, "La section a été régénérée avec succès !")
+    except Exception as e:
+        messages.error(request, f"Erreur lors de la régénération : {str(e)}")
+    return redirect('game_detail', pk=pk)
+
+
+@async_login_required
+async def remix_game_view(request, pk):
+    """Crée une variante d'un jeu public (ou à soi) sans aucun appel IA"""
+    source = await _aget_object_or_404(Game.objects.select_related('content'), pk=pk)
+    if not source.is_public and source.creator_id != request.user.pk:
+        raise Http404("Ce jeu n'est pas accessible.")
+    if request.method != 'POST':
+        return redirect('game_detail', pk=pk)
+
+    remix = await sync_to_async(source.remix)(request.user)
+    messages.success(request, f"Remix de '{source.title}' créé : modifiez-le à votre guise !")
+    return redirect('game_detail', pk=remix.pk)
+
+
+async def game_status_view(request, pk):
+    """État de génération d'un jeu (JSON) pour le suivi côté client"""
+    game = await _aget_object_or_404(Game.objects.all(), pk=pk)
+    if not game.is_public:
+        is_authenticated = await sync_to_async(lambda: request.user.is_authenticated)()
+        if not is_authenticated or game.creator_id != request.user.pk:
+            raise Http404("Ce jeu n'est pas accessible.")
+
+    return JsonResponse({
+        'id': game.pk,
+        'title': game.title,
+        'updated_at': game.updated_at.isoformat(),
+        'characters_count': await game.get_characters().acount(),
+        'locations_count': await game.get_locations().acount(),
+        'concept_art_character': game.concept_art_character.url if game.concept_art_character else None,
+        'concept_art_environment': game.concept_art_environment.url if game.concept_art_environment else None,
+    })
+
+
+async def game_pdf_view(request, pk):
+    """Document de conception PDF : servi depuis le cache, sinon rendu en arrière-plan"""
+    game = await _aget_object_or_404(Game.objects.all(), pk=pk)
+    if not game.is_public:
+        is_authenticated = await sync_to_async(lambda: request.user.is_authenticated)()
+        if not is_authenticated or game.creator_id != request.user.pk:
+            raise Http404("Ce jeu n'est pas accessible.")
+
+    path = design_document.cached_path(game)
+    if path.exists():
+        return FileResponse(path.open('rb'), as_attachment=True, filename=f"{slugify(game.title) or 'jeu'}.pdf",
+                            content_type='application/pdf')
+
+    await sync_to_async(design_document.schedule, thread_sensitive=False)(game)
+    response = await _arender(request, 'games/pdf_pending.html', {
+        'game': game,
+        'retry_after': settings.GAME_PDF['retry_after'],
+    })
+    response.status_code = 202
+    response['Retry-After'] = str(settings.GAME_PDF['retry_after'])
+    return response
+
+
+@async_login_required
+async def toggle_favorite_view(request, pk):
     if request.method == 'POST':
-        game = get_object_or_404(Game, pk=pk)
-        favorite, created = Favorite.objects.get_or_create(
+        game = await _aget_object_or_404(Game.objects.all(), pk=pk)
+        favorite, created = await Favorite.objects.aget_or_create(
             user=request.user,
             game=game
         )
         
         if not created:
-            favorite.delete()
+            await favorite.adelete()
             is_favorited = False
         else:
             is_favorited = True
@@ -200,7 +403,7 @@ def toggle_favorite_view(request, pk):
         if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
             return JsonResponse({
                 'is_favorited': is_favorited,
-                'favorites_count': game.favorited_by.count()
+                'favorites_count': await game.favorited_by.acount()
             })
         
         return redirect('game_detail', pk=pk)
@@ -208,14 +411,12 @@ def toggle_favorite_view(request, pk):
     return redirect('game_detail', pk=pk)
 
 
-@login_required
-def favorites_view(request):
-    favorites = Favorite.objects.filter(user=request.user).select_related('game').order_by('-created_at')
-    paginator = Paginator(favorites, 12)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+@async_login_required
+async def favorites_view(request):
+    favorites = Favorite.objects.filter(user=request.user).select_related('game', 'game__creator').order_by('-created_at')
+    page_obj = await _apaginate(favorites, request.GET.get('page'), 12)
     
-    return render(request, 'games/favorites.html', {'page_obj': page_obj})
+    return await _arender(request, 'games/favorites.html', {'page_obj': page_obj})
 
 
 def signup_view(request):
@@ -274,3 +475,29 @@ def delete_game_view(request, pk):
         return redirect('dashboard')
     
     return render(request, 'games/delete_game.html', {'game': game})
+
+
+@staff_member_required
+def export_games_view(request):
+    """Export en flux du catalogue (JSONL ou Parquet), réservé au staff"""
+    fmt = request.GET.get('format', 'jsonl')
+    try:
+        queryset, watermark = export.select_games(
+            public_only=request.GET.get('public') in ('1', 'true'),
+            created_after=request.GET.get('created_after'),
+            created_before=request.GET.get('created_before'),
+            creator=request.GET.get('creator'),
+            updated_after=request.GET.get('updated_after'),
+        )
+        chunks = export.stream(queryset, fmt)
+    except export.ExportError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+    if isinstance(request, ASGIRequest):
+        chunks = export.aiterate(chunks)
+
+    response = StreamingHttpResponse(chunks, content_type=export.CONTENT_TYPES[fmt])
+    response['Content-Disposition'] = f'attachment; filename="games.{fmt}"'
+    # À repasser en updated_after pour l'export incrémental suivant
+    if watermark is not None:
+        response['X-Export-Watermark'] = watermark.isoformat()
+    return response